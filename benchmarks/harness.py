@@ -0,0 +1,139 @@
+"""
+Baseline — Benchmark Harness
+
+Times callables, summarizes per-op latency (p50/p99) and throughput, saves
+results as JSON, and compares a run against a stored baseline.
+
+Operations of PER_CALL_MIN or more are timed one call per sample, so p50/p99
+are per-call latencies. Faster ones are timed in batches (`inner` calls per
+sample, recorded in the result) so timer overhead stays negligible; their
+p50/p99 are percentiles of batch means — per call on average, but a slow
+call's tail is spread over its batch.
+"""
+
+import json
+import math
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+PER_CALL_MIN = 20e-6  # seconds; a perf_counter() pair is <1% of a call this long
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    k = math.ceil(q / 100 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(k, len(sorted_values) - 1))]
+
+
+def measure(fn, min_time: float = 0.5, min_samples: int = 30, sample_time: float = 2e-3,
+            per_call_min: float = PER_CALL_MIN) -> dict:
+    """Run fn() repeatedly and summarize latency.
+
+    A call taking at least `per_call_min` seconds is timed on its own
+    (inner = 1). Faster calls are grouped into samples of `inner` calls, with
+    `inner` picked so a sample takes about `sample_time` seconds, and p50/p99
+    are then over those batch means. Sampling continues until both `min_time`
+    has elapsed and `min_samples` samples were taken.
+    """
+    clock = time.perf_counter
+    fn()  # warm caches / lazy loads outside the timed region
+
+    probes = []
+    for _ in range(5):  # median of a few, so one cold call doesn't pick per-call timing
+        start = clock()
+        fn()
+        probes.append(clock() - start)
+    once = statistics.median(probes)
+    if once >= per_call_min:
+        inner = 1
+    else:
+        inner = max(1, int(sample_time / once)) if once > 0 else 1000
+
+    samples = []
+    total_calls = 0
+    began = clock()
+    while len(samples) < min_samples or clock() - began < min_time:
+        t0 = clock()
+        for _ in range(inner):
+            fn()
+        samples.append((clock() - t0) / inner)
+        total_calls += inner
+    elapsed = sum(samples) * inner
+
+    samples.sort()
+    return {
+        "ops_per_sec": total_calls / elapsed if elapsed > 0 else float("inf"),
+        "p50_us": _percentile(samples, 50) * 1e6,
+        "p99_us": _percentile(samples, 99) * 1e6,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "calls": total_calls,
+        "samples": len(samples),
+        "inner": inner,
+    }
+
+
+def environment() -> dict:
+    info = {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def save(results: dict, path) -> None:
+    with open(path, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+        f.write("\n")
+
+
+def load(path) -> dict:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Benchmarks whose p50 latency grew by more than `threshold` (0.25 = 25%) over baseline.
+
+    Benchmarks missing from either side are ignored.
+    """
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("p50_us"):
+            continue
+        change = current["p50_us"] / base["p50_us"] - 1
+        if change > threshold:
+            regressions.append({
+                "name": name,
+                "baseline_p50_us": base["p50_us"],
+                "p50_us": current["p50_us"],
+                "change": change,
+            })
+    return regressions
+
+
+def format_row(name: str, r: dict, base: dict = None) -> str:
+    line = f"  {name:<34} {r['ops_per_sec']:>12,.0f} ops/s   p50 {_us(r['p50_us']):>9}   p99 {_us(r['p99_us']):>9}"
+    line += f"   mean of {r['inner']:<5,}" if r.get("inner", 1) > 1 else " " * 17  # p50/p99 over batch means
+    if base and base.get("p50_us"):
+        line += f"   {r['p50_us'] / base['p50_us'] - 1:+7.1%} vs baseline"
+    return line
+
+
+def _us(value: float) -> str:
+    if value >= 1e6:
+        return f"{value / 1e6:.2f}s"
+    if value >= 1e3:
+        return f"{value / 1e3:.2f}ms"
+    return f"{value:.2f}us"
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Baseline — Benchmark Suite
+
+Offline benchmarks for the hot paths: scoring (assess, score_profile,
+score_many, standing targets, a scoring-daemon round trip), NHANES
+percentile lookup (table and parametric backends) and its inverse, lab
+report parsing and Garmin aggregation. Inputs are synthetic profiles, generated Quest report text and
+recorded Garmin payloads (see synthetic.py) — no network, no PDFs.
+
+Usage:
+    python3 benchmarks/run.py                          # run all, compare to benchmarks/baseline.json if present
+    python3 benchmarks/run.py --only scoring garmin    # subset of groups
+    python3 benchmarks/run.py --output results.json    # save this run
+    python3 benchmarks/run.py --save-baseline          # store this run as the baseline
+    python3 benchmarks/run.py --threshold 0.10         # fail on >10% p50 regression (default 25%)
+
+Exits 1 when any benchmark's p50 latency regresses past the threshold.
+Baselines are machine-specific — record one per machine/CI runner.
+"""
+
+import contextlib
+import io
+import itertools
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks import harness, synthetic  # noqa: E402
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+BENCHMARKS = {}  # name -> (group, setup); setup() returns the zero-arg callable to time
+
+
+def benchmark(group: str, name: str):
+    def register(setup):
+        BENCHMARKS[name] = (group, setup)
+        return setup
+    return register
+
+
+def _cycle(items):
+    """Zero-arg callable returning the next item, round-robin (spreads inputs across calls)."""
+    return itertools.cycle(items).__next__
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+@benchmark("scoring", "assess.nhanes")
+def _assess_nhanes():
+    import score
+    demo = score.Demographics(age=42, sex="M")
+    nxt = _cycle([p.ldl_c for p in synthetic.profiles(500) if p.ldl_c is not None])
+    return lambda: score.assess(nxt(), score.LDL_C, demo, nhanes_key="ldl_c")
+
+
+@benchmark("scoring", "assess.cutoffs")
+def _assess_cutoffs():
+    import score
+    demo = score.Demographics(age=42, sex="M")
+    nxt = _cycle([p.vo2_max for p in synthetic.profiles(500) if p.vo2_max is not None])
+    return lambda: score.assess(nxt(), score.VO2_MAX, demo)
+
+
+@benchmark("scoring", "score_profile")
+def _score_profile():
+    import score
+    nxt = _cycle(synthetic.profiles(500))
+    return lambda: score.score_profile(nxt())
+
+
+@benchmark("scoring", "score_many.1000")
+def _score_many():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return None
+    import score
+    profiles = synthetic.profiles(1000)
+    return lambda: score.score_many(profiles)
+
+
+@benchmark("scoring", "standing_targets")
+def _standing_targets():
+    import score
+    nxt = _cycle(synthetic.profiles(500))
+    return lambda: score.standing_targets(nxt())
+
+
+@benchmark("scoring", "daemon.roundtrip")
+def _daemon_roundtrip():
+    """One profile scored by a `score.py --serve` subprocess, over a persistent connection."""
+    import atexit
+    import dataclasses
+    import os
+    import subprocess
+    import tempfile
+    import time
+    import score_daemon
+
+    path = os.path.join(tempfile.mkdtemp(), "score.sock")
+    server = subprocess.Popen([sys.executable, str(PROJECT_ROOT / "score.py"), "--serve", "--socket", path],
+                              stderr=subprocess.DEVNULL)
+    atexit.register(server.terminate)
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            client = score_daemon.Client(path)
+            break
+        except OSError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                server.terminate()
+                return None
+            time.sleep(0.05)
+    atexit.register(client.close)
+    nxt = _cycle([dataclasses.asdict(p) for p in synthetic.profiles(500)])
+    return lambda: client.score(nxt())
+
+
+# ---------------------------------------------------------------------------
+# Percentile lookup
+# ---------------------------------------------------------------------------
+
+@benchmark("percentile", "nhanes.get_percentile")
+def _get_percentile():
+    import score
+    if not score.NHANES_AVAILABLE:
+        return None
+    buckets = ("20-29", "30-39", "40-49", "50-59", "60-69", "70+")
+    cases = [(p.hba1c, buckets[i % 6], p.demographics.sex)
+             for i, p in enumerate(synthetic.profiles(500)) if p.hba1c is not None]
+    nxt = _cycle(cases)
+
+    def run():
+        value, bucket, sex = nxt()
+        return score.nhanes_percentile("hba1c", value, bucket, sex)
+    return run
+
+
+@benchmark("percentile", "nhanes.get_percentile_at_age")
+def _get_percentile_at_age():
+    import score
+    if not score.NHANES_AVAILABLE:
+        return None
+    cases = [(p.hba1c, p.demographics.age, p.demographics.sex)
+             for p in synthetic.profiles(500) if p.hba1c is not None]
+    nxt = _cycle(cases)
+
+    def run():
+        value, age, sex = nxt()
+        return score.nhanes_percentile_at_age("hba1c", value, age, sex)
+    return run
+
+
+@benchmark("percentile", "nhanes.get_percentiles.10000")
+def _get_percentiles():
+    import score
+    if not score.NHANES_AVAILABLE:
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    rng = np.random.default_rng(0)
+    values = rng.normal(120, 30, 10_000).round()
+    buckets = rng.integers(0, 6, 10_000)
+    sexes = rng.integers(0, 2, 10_000)
+    return lambda: score.nhanes_percentiles("ldl_c", values, buckets, sexes)
+
+
+@benchmark("percentile", "nhanes.get_percentiles_at_age.10000")
+def _get_percentiles_at_age():
+    import score
+    if not score.NHANES_AVAILABLE:
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    rng = np.random.default_rng(0)
+    values = rng.normal(120, 30, 10_000).round()
+    ages = rng.integers(20, 86, 10_000)
+    sexes = rng.integers(0, 2, 10_000)
+    return lambda: score.nhanes_percentiles_at_age("ldl_c", values, ages, sexes)
+
+
+def _parametric(metric: str):
+    """Switch `metric` to the parametric backend; False if there's no current fit."""
+    from nhanes import percentile_lookup
+    try:
+        percentile_lookup.set_backend(metric, "parametric")
+    except ValueError:
+        return False
+    return True
+
+
+@benchmark("percentile", "nhanes.parametric.at_age")
+def _parametric_at_age():
+    import score
+    if not score.NHANES_AVAILABLE or not _parametric("triglycerides"):
+        return None
+    cases = [(p.triglycerides, p.demographics.age, p.demographics.sex)
+             for p in synthetic.profiles(500) if p.triglycerides is not None]
+    nxt = _cycle(cases)
+
+    def run():
+        value, age, sex = nxt()
+        return score.nhanes_percentile_at_age("triglycerides", value, age, sex)
+    return run
+
+
+@benchmark("percentile", "nhanes.parametric.at_age.10000")
+def _parametric_at_age_many():
+    import score
+    if not score.NHANES_AVAILABLE:
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    if not _parametric("triglycerides"):
+        return None
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(4.6, 0.5, 10_000).round()
+    ages = rng.integers(20, 86, 10_000)
+    sexes = rng.integers(0, 2, 10_000)
+    return lambda: score.nhanes_percentiles_at_age("triglycerides", values, ages, sexes)
+
+
+@benchmark("percentile", "nhanes.values_at_percentiles.10000")
+def _get_values_at_percentiles():
+    import score
+    if not score.NHANES_AVAILABLE:
+        return None
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    rng = np.random.default_rng(0)
+    pcts = rng.choice([85.0, 65.0, 35.0, 15.0], 10_000)
+    ages = rng.integers(20, 86, 10_000)
+    sexes = rng.integers(0, 2, 10_000)
+    return lambda: score.nhanes_values_at_percentiles("ldl_c", pcts, ages, sexes)
+
+
+# ---------------------------------------------------------------------------
+# Lab parsing
+# ---------------------------------------------------------------------------
+
+@benchmark("parsing", "parse_quest_text")
+def _parse_quest_text():
+    import parse_quest
+    nxt = _cycle([synthetic.lab_report(seed) for seed in range(20)])
+    return lambda: parse_quest.parse_quest_text(nxt())
+
+
+# ---------------------------------------------------------------------------
+# Garmin aggregation (recorded / synthetic payloads, no rate limit)
+# ---------------------------------------------------------------------------
+
+def _garmin(pull, client=None, **kwargs):
+    import garmin_import
+    from garmin_fetch import Fetcher
+    client = client or synthetic.ReplayGarmin()
+    fn = getattr(garmin_import, pull)
+    return lambda: fn(Fetcher(client, rate=None), **kwargs)
+
+
+@benchmark("garmin", "pull_resting_hr.30d")
+def _pull_rhr():
+    return _garmin("pull_resting_hr", days=30)
+
+
+@benchmark("garmin", "pull_sleep_regularity.30d")
+def _pull_sleep():
+    return _garmin("pull_sleep_regularity", days=30)
+
+
+@benchmark("garmin", "pull_daily_series.90d")
+def _pull_series():
+    return _garmin("pull_daily_series", days=90, path=None)
+
+
+@benchmark("garmin", "pull_workouts.30d")
+def _pull_workouts():
+    pull = _garmin("pull_workouts", days=30, known=())
+    return lambda: sum(len(page) for page in pull())  # a generator of pages: drain it
+
+
+@benchmark("garmin", "import.synthetic_2y")
+def _import_2y():
+    import garmin_replay
+    from garmin_fetch import Fetcher
+    client = garmin_replay.ReplayGarmin(garmin_replay.synthetic_account(years=2))
+    return lambda: garmin_replay.run_import(Fetcher(client, rate=None), days=730)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def run(groups=None, min_time: float = 0.5) -> dict:
+    results = {}
+    for name, (group, setup) in BENCHMARKS.items():
+        if groups and group not in groups:
+            continue
+        fn = setup()
+        if fn is None:
+            print(f"  {name:<34} skipped (dependency or data not available)")
+            continue
+        # The pull_* functions print progress; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = harness.measure(fn, min_time=min_time)
+        result["group"] = group
+        results[name] = result
+        print(harness.format_row(name, result))
+    return results
+
+
+def main():
+    import argparse
+    groups = sorted({group for group, _ in BENCHMARKS.values()})
+    parser = argparse.ArgumentParser(description="Baseline benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=groups, help="Benchmark groups to run")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed p50 slowdown vs baseline before failing (default: 0.25 = 25%%)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to sample each benchmark")
+    args = parser.parse_args()
+
+    print(f"\nRunning benchmarks ({', '.join(args.only or groups)})...\n")
+    results = run(args.only, min_time=args.min_time)
+
+    if args.output:
+        harness.save(results, args.output)
+        print(f"\nSaved results to {args.output}")
+    if args.save_baseline:
+        harness.save(results, args.baseline)
+        print(f"\nSaved baseline to {args.baseline}")
+        return
+
+    if not Path(args.baseline).exists():
+        print(f"\nNo baseline at {args.baseline} — run with --save-baseline to record one.")
+        return
+
+    baseline = harness.load(args.baseline)
+    print(f"\nCompared to baseline ({args.baseline}):\n")
+    for name, result in results.items():
+        print(harness.format_row(name, result, baseline.get(name)))
+    regressions = harness.compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nFAIL: {len(regressions)} benchmark(s) regressed more than {args.threshold:.0%}:")
+        for r in regressions:
+            print(f"  {r['name']}: p50 {r['baseline_p50_us']:.2f}us → {r['p50_us']:.2f}us ({r['change']:+.1%})")
+        sys.exit(1)
+    print(f"\nOK: no regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Baseline — Synthetic Benchmark Inputs
+
+Deterministic, offline inputs for the benchmark suite:
+  - profiles(n)        UserProfiles with realistic, clustered lab + wearable values
+  - lab_report()       Quest-style report text for parse_quest.parse_quest_text
+  - ReplayGarmin       Garmin client stand-in serving recorded API payloads
+                       from fixtures/garmin_payloads.json (see garmin_replay.py)
+"""
+
+import random
+
+from garmin_replay import GARMIN_PAYLOADS, ReplayGarmin  # noqa: F401 — re-exported for the suite
+from score import Demographics, UserProfile
+
+
+# ---------------------------------------------------------------------------
+# Profiles
+# ---------------------------------------------------------------------------
+
+# field → (mean, sd, decimals, fraction of profiles that have it)
+PROFILE_DISTRIBUTIONS = {
+    "systolic": (122, 14, 0, 0.8),
+    "diastolic": (78, 9, 0, 0.8),
+    "ldl_c": (118, 32, 0, 0.9),
+    "hdl_c": (52, 14, 0, 0.9),
+    "triglycerides": (120, 55, 0, 0.9),
+    "apob": (95, 24, 0, 0.4),
+    "fasting_glucose": (96, 11, 0, 0.9),
+    "hba1c": (5.5, 0.4, 1, 0.7),
+    "fasting_insulin": (9.0, 4.5, 1, 0.3),
+    "sleep_regularity_stddev": (38, 15, 1, 0.5),
+    "sleep_duration_avg": (7.0, 0.8, 1, 0.5),
+    "daily_steps_avg": (7500, 2800, 0, 0.7),
+    "resting_hr": (62, 8, 0, 0.7),
+    "waist_circumference": (36, 4.5, 1, 0.4),
+    "lpa": (45, 60, 0, 0.2),
+    "hscrp": (1.8, 1.5, 1, 0.4),
+    "alt": (26, 11, 0, 0.8),
+    "ggt": (28, 15, 0, 0.4),
+    "tsh": (1.9, 0.9, 2, 0.6),
+    "vitamin_d": (31, 11, 0, 0.5),
+    "ferritin": (140, 90, 0, 0.4),
+    "hemoglobin": (14.6, 1.3, 1, 0.8),
+    "vo2_max": (41, 8, 1, 0.4),
+    "hrv_rmssd_avg": (45, 16, 0, 0.4),
+    "weight_lbs": (180, 35, 1, 0.6),
+    "phq9_score": (4, 4, 0, 0.2),
+    "zone2_min_per_week": (110, 80, 0, 0.3),
+}
+
+
+def profiles(n: int, seed: int = 0) -> list[UserProfile]:
+    """n UserProfiles with values drawn around population means, rounded like lab reports."""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        fields = {}
+        for field, (mean, sd, decimals, present) in PROFILE_DISTRIBUTIONS.items():
+            if rng.random() < present:
+                fields[field] = round(max(abs(rng.gauss(mean, sd)), 0.1), decimals or None)
+        for flag in ("has_family_history", "has_medication_list"):
+            if rng.random() < 0.5:
+                fields[flag] = rng.random() < 0.5
+        demo = Demographics(age=rng.randint(20, 85), sex=rng.choice("MF"))
+        out.append(UserProfile(demographics=demo, **fields))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Lab report text
+# ---------------------------------------------------------------------------
+
+# (report label, mean, sd, decimals, unit, reference range)
+LAB_LINES = (
+    ("CHOLESTEROL, TOTAL", 190, 35, 0, "mg/dL", "<200"),
+    ("HDL CHOLESTEROL", 52, 14, 0, "mg/dL", "> OR = 40"),
+    ("TRIGLYCERIDES", 120, 55, 0, "mg/dL", "<150"),
+    ("LDL-CHOLESTEROL", 118, 32, 0, "mg/dL (calc)", "<100"),
+    ("APOLIPOPROTEIN B", 95, 24, 0, "mg/dL", "<90"),
+    ("LIPOPROTEIN (a)", 45, 40, 0, "nmol/L", "<75"),
+    ("GLUCOSE", 96, 11, 0, "mg/dL", "65-99"),
+    ("HEMOGLOBIN A1c", 5.5, 0.4, 1, "% of total Hgb", "<5.7"),
+    ("INSULIN", 9.0, 4.5, 1, "uIU/mL", "2.0-19.6"),
+    ("HS CRP", 1.8, 1.5, 1, "mg/L", "<1.0"),
+    ("ALT", 26, 11, 0, "U/L", "9-46"),
+    ("AST", 24, 8, 0, "U/L", "10-40"),
+    ("GGT", 28, 15, 0, "U/L", "3-70"),
+    ("ALKALINE PHOSPHATASE", 70, 18, 0, "U/L", "36-130"),
+    ("TSH", 1.9, 0.9, 2, "mIU/L", "0.40-4.50"),
+    ("T4, FREE", 1.2, 0.2, 1, "ng/dL", "0.8-1.8"),
+    ("VITAMIN D,25-OH,TOTAL,IA", 31, 11, 0, "ng/mL", "30-100"),
+    ("FERRITIN", 140, 90, 0, "ng/mL", "38-380"),
+    ("WHITE BLOOD CELL COUNT", 6.2, 1.5, 1, "Thousand/uL", "3.8-10.8"),
+    ("RED BLOOD CELL COUNT", 4.9, 0.4, 2, "Million/uL", "4.20-5.80"),
+    ("HEMOGLOBIN", 14.6, 1.3, 1, "g/dL", "13.2-17.1"),
+    ("HEMATOCRIT", 43.5, 3.5, 1, "%", "38.5-50.0"),
+    ("PLATELET COUNT", 250, 55, 0, "Thousand/uL", "140-400"),
+    ("RDW", 12.9, 0.8, 1, "%", "11.0-15.0"),
+    ("CREATININE", 1.0, 0.2, 2, "mg/dL", "0.60-1.29"),
+    ("EGFR", 95, 15, 0, "mL/min/1.73m2", "> OR = 60"),
+    ("UREA NITROGEN (BUN)", 15, 4, 0, "mg/dL", "7-25"),
+    ("TESTOSTERONE, TOTAL, MS", 550, 180, 0, "ng/dL", "250-1100"),
+    ("HOMOCYSTEINE", 9.5, 2.5, 1, "umol/L", "<11.4"),
+    ("VITAMIN B12", 520, 180, 0, "pg/mL", "200-1100"),
+)
+
+LAB_NOISE = (
+    "Quest Diagnostics Incorporated          Page 1 of 4",
+    "Patient Information            Specimen Information          Client Information",
+    "DOB: 01/01/1988  AGE: 36       Specimen: KX123456X            Client #: 12345678",
+    "Collected: 06/11/2024 / 07:42 EDT   Received: 06/11/2024 / 14:10 EDT",
+    "Test Name                      In Range   Out Of Range   Reference Range   Lab",
+    "Fasting: YES",
+    "For patients >49 years of age, the reference limit for LDL-C is <70 mg/dL",
+    "Reference range: <100 Desirable range <100 mg/dL for primary prevention;",
+    "Risk: Optimal <90 Moderate 90-129 High >129",
+    "This test was performed using the Roche cobas platform.",
+)
+
+
+def lab_report(seed: int = 0, panels: int = 3) -> str:
+    """Quest-style report text: header noise, one result line per test, repeated for `panels` draws."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(panels):
+        lines.extend(LAB_NOISE[:5])
+        for label, mean, sd, decimals, unit, ref in LAB_LINES:
+            value = round(max(abs(rng.gauss(mean, sd)), 0.1), decimals or None)
+            flag = rng.choice(("", "", "", " H", " L"))
+            lines.append(f"{label:<32}{value}{flag:<4}  {ref:<14}{unit}   KS")
+            if rng.random() < 0.2:
+                lines.append(rng.choice(LAB_NOISE[5:]))
+    return "\n".join(lines)
@@ -0,0 +1,808 @@
+"""
+Baseline — Vectorized Cohort Scoring
+
+Column-oriented counterpart to score.score_profile for scoring thousands of
+profiles in one pass (clinic cohorts, nightly batch runs).
+
+Profiles are laid out as column arrays — one float64 array per profile field,
+NaN for missing — and every metric is assessed with NumPy array operations
+instead of per-value assess() calls. Results match score_profile exactly:
+same standings, same rounded percentiles, same coverage and tier sub-scores.
+
+Throughput depends on the input. The 50x target over looping score_profile
+(100k profiles) holds for columnar input only: ProfileTable, record_columns
+and --batch measure roughly 58-63x. A list of UserProfile measures roughly
+20-21x, because profile_columns converts ~30 Python attributes per profile to
+floats one at a time. Load large cohorts with ProfileTable.from_jsonl /
+from_csv. tests/test_score_many.py checks both layouts against score_profile.
+
+Install: pip3 install numpy
+
+Usage:
+    python3 score.py --batch cohort.jsonl --output scores.jsonl
+    from score import score_many
+    scores = score_many(profiles)          # list of UserProfile
+    scores = score_many(columns)           # dict of column arrays
+    table = ProfileTable.from_jsonl(path)  # columnar storage; table[i] reads like a UserProfile
+    scores = score_many(table)
+    print_report(scores[0])                # score_profile-compatible view
+    scores.metric_dicts(0)                 # MetricResult.to_dict() rows, no objects
+"""
+
+import csv
+import json
+import operator
+from collections.abc import Mapping
+
+import numpy as np
+
+import score
+from score import (
+    Demographics, MetricResult, Standing, UserProfile,
+    TIER1_WEIGHTS, TIER2_WEIGHTS, NHANES_KEY_MAP,
+)
+
+
+# ---------------------------------------------------------------------------
+# Encodings
+# ---------------------------------------------------------------------------
+
+AGE_BUCKETS = score.AGE_BUCKETS
+AGE_EDGES = np.array([30, 40, 50, 60, 70])
+BUCKET_CENTERS = np.array([25, 35, 45, 55, 65, 75])  # age at which the continuous-age curve equals the bucket's
+SEXES = ("M", "F")  # any other value maps to index 2 (universal cutoffs only)
+
+STANDINGS = tuple(Standing)
+STANDING_CODE = {s: i for i, s in enumerate(STANDINGS)}
+UNKNOWN = STANDING_CODE[Standing.UNKNOWN]
+GOOD = STANDING_CODE[Standing.GOOD]
+
+# Band index (number of cutoffs strictly below the value) → standing / percentile.
+# Mirrors the if/elif ladders in score.assess.
+_BANDS = {
+    True: (  # lower is better
+        np.array([STANDING_CODE[s] for s in (Standing.OPTIMAL, Standing.GOOD, Standing.AVERAGE,
+                                             Standing.BELOW_AVG, Standing.CONCERNING)], dtype=np.int8),
+        np.array([90, 70, 50, 25, 10], dtype=np.float64),
+    ),
+    False: (  # higher is better
+        np.array([STANDING_CODE[s] for s in (Standing.CONCERNING, Standing.BELOW_AVG, Standing.AVERAGE,
+                                             Standing.GOOD, Standing.OPTIMAL)], dtype=np.int8),
+        np.array([10, 25, 50, 70, 90], dtype=np.float64),
+    ),
+}
+
+# percentile_to_standing boundaries: <15, <35, <65, <85, >=85
+_PCT_EDGES = np.array([15, 35, 65, 85])
+_PCT_STANDING = np.array([STANDING_CODE[s] for s in (Standing.CONCERNING, Standing.BELOW_AVG, Standing.AVERAGE,
+                                                     Standing.GOOD, Standing.OPTIMAL)], dtype=np.int8)
+
+
+def _round_half_up(x):
+    """score.round_half_up over an array (np.round goes to even)."""
+    return np.floor(x + 0.5)
+
+
+# ---------------------------------------------------------------------------
+# Metric layout — score.PLAN (compiled from score.METRICS), same order as
+# score_profile's results. Field indices are resolved back to column names.
+# ---------------------------------------------------------------------------
+
+PLAN = score.PLAN
+_FIELD = score.PROFILE_FIELDS
+
+METRIC_NAMES = tuple(step.name for step in PLAN)
+METRIC_TIERS = np.array([step.tier for step in PLAN], dtype=np.int8)
+METRIC_WEIGHTS = np.array([step.weight for step in PLAN], dtype=np.int64)
+
+# Every numeric profile field the plan reads (coverage, sources, unit details)
+FIELDS = tuple(dict.fromkeys(
+    [_FIELD[i] for step in PLAN for i in step.coverage]
+    + [_FIELD[src[0]] for step in PLAN for src in step.sources]
+    + [_FIELD[step.unit_detail] for step in PLAN if step.unit_detail is not None]
+))
+
+
+# ---------------------------------------------------------------------------
+# Columns
+# ---------------------------------------------------------------------------
+
+def profile_columns(profiles) -> dict:
+    """Lay out a sequence of UserProfile as column arrays.
+
+    Returns {"age", "sex", "ethnicity", <field>: float64 array (NaN = missing)}.
+    Booleans become 1.0/0.0 — only presence matters for coverage.
+    """
+    n = len(profiles)
+    demos = [p.demographics for p in profiles]
+    cols = {
+        "age": np.fromiter((d.age for d in demos), dtype=np.float64, count=n),
+        "sex": np.array([d.sex for d in demos], dtype=object),
+        "ethnicity": np.array([d.ethnicity for d in demos], dtype=object),
+    }
+    rows = list(map(operator.attrgetter(*FIELDS), profiles))
+    # None → NaN happens inside NumPy's float conversion
+    matrix = np.array(rows, dtype=np.float64).reshape(n, len(FIELDS))
+    for j, f in enumerate(FIELDS):
+        cols[f] = matrix[:, j]
+    return cols
+
+
+def record_columns(records) -> dict:
+    """Lay out profile dicts ({"demographics": {...}, field: value}) as column arrays.
+
+    Skips UserProfile construction entirely — this is the --batch JSONL path.
+    """
+    n = len(records)
+    demos = [r.get("demographics", {}) for r in records]
+    cols = {
+        "age": np.fromiter((d.get("age") for d in demos), dtype=np.float64, count=n),
+        "sex": np.array([d.get("sex") for d in demos], dtype=object),
+        "ethnicity": np.array([d.get("ethnicity", "white") for d in demos], dtype=object),
+    }
+    for f in FIELDS:
+        cols[f] = np.array([r.get(f) for r in records], dtype=np.float64)
+    return cols
+
+
+def _column(cols: Mapping, field: str, n: int) -> np.ndarray:
+    col = cols.get(field)
+    if col is None:
+        return np.full(n, np.nan)
+    return np.asarray(col, dtype=np.float64)
+
+
+# ---------------------------------------------------------------------------
+# ProfileTable — columnar cohort storage
+# ---------------------------------------------------------------------------
+
+BOOL_FIELDS = score.BOOL_FIELDS
+_BOOL_TEXT = {"true": 1.0, "yes": 1.0, "1": 1.0, "false": 0.0, "no": 0.0, "0": 0.0, "": np.nan}
+
+
+def _encode(labels, seed=()) -> tuple:
+    """Category labels → (int8 codes, labels tuple). Seeded labels get the first codes."""
+    index = {label: i for i, label in enumerate(seed)}
+    codes = np.fromiter((index.setdefault(label, len(index)) for label in labels),
+                        dtype=np.intp, count=len(labels))
+    dtype = np.int8 if len(index) <= np.iinfo(np.int8).max else np.int16
+    return codes.astype(dtype), tuple(index)
+
+
+def _ages(age) -> np.ndarray:
+    """Ages as int16, refusing what the cast would silently turn into a wrong age."""
+    try:
+        ages = np.asarray(age, dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"ProfileTable: every profile needs a numeric age ({e})") from None
+    info = np.iinfo(np.int16)
+    bad = np.flatnonzero(~((ages >= info.min) & (ages <= info.max)))  # NaN fails both
+    if len(bad):
+        rows = ", ".join(map(str, bad[:5])) + (", ..." if len(bad) > 5 else "")
+        raise ValueError(f"ProfileTable: missing or invalid age in {len(bad)} profile(s), rows {rows}")
+    return ages.astype(np.int16)
+
+
+class ProfileTable:
+    """Many profiles as columns: one float64 array per UserProfile field (NaN = missing).
+
+    Demographics are compact codes — age int16, sex and ethnicity int8 into
+    sex_labels / ethnicity_labels (M and F always codes 0 and 1). Fields
+    absent from the source share one read-only NaN column.
+
+    table[i] is a zero-copy ProfileRow that score_profile accepts in place of
+    a UserProfile; score_many(table) scores the columns directly.
+    """
+
+    __slots__ = ("age", "sex", "sex_labels", "ethnicity", "ethnicity_labels", "data")
+
+    def __init__(self, age, sex, ethnicity, data: Mapping):
+        """age: ints. sex, ethnicity: labels. data: {field: values, None/NaN = missing}.
+
+        Raises ValueError if an age is missing, not a number or outside int16.
+        """
+        self.age = _ages(age)
+        n = len(self.age)
+        self.sex, self.sex_labels = _encode(sex, seed=SEXES)
+        self.ethnicity, self.ethnicity_labels = _encode(ethnicity)
+        missing = np.full(n, np.nan)
+        missing.flags.writeable = False
+        self.data = {}
+        for f in score.PROFILE_FIELDS:
+            col = data.get(f)
+            self.data[f] = missing if col is None else np.asarray(col, dtype=np.float64).reshape(n)
+
+    def __len__(self) -> int:
+        return len(self.age)
+
+    def __getitem__(self, i: int) -> "ProfileRow":
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return ProfileRow(self, i % len(self))
+
+    def __iter__(self):
+        return (ProfileRow(self, i) for i in range(len(self)))
+
+    def columns(self) -> dict:
+        """Column mapping for score_columns (field arrays are shared, not copied)."""
+        return {
+            "age": self.age,
+            "sex": np.array(self.sex_labels, dtype=object)[self.sex],
+            "ethnicity": np.array(self.ethnicity_labels, dtype=object)[self.ethnicity],
+            **self.data,
+        }
+
+    # --- loaders ---
+
+    @classmethod
+    def from_profiles(cls, profiles) -> "ProfileTable":
+        demos = [p.demographics for p in profiles]
+        rows = list(map(score.profile_row, profiles))
+        matrix = np.array(rows, dtype=np.float64).reshape(len(rows), len(score.PROFILE_FIELDS))
+        return cls(
+            age=[d.age for d in demos],
+            sex=[d.sex for d in demos],
+            ethnicity=[d.ethnicity for d in demos],
+            data={f: matrix[:, j] for j, f in enumerate(score.PROFILE_FIELDS)},
+        )
+
+    @classmethod
+    def from_records(cls, records) -> "ProfileTable":
+        """Profile dicts shaped like profiles/*.json: {"demographics": {...}, field: value}."""
+        demos = [r.get("demographics", {}) for r in records]
+        present = set().union(*records) if records else set()
+        return cls(
+            age=[d.get("age") for d in demos],
+            sex=[d.get("sex") for d in demos],
+            ethnicity=[d.get("ethnicity", "white") for d in demos],
+            data={f: [r.get(f) for r in records] for f in score.PROFILE_FIELDS if f in present},
+        )
+
+    @classmethod
+    def from_jsonl(cls, path) -> "ProfileTable":
+        """One profile dict per line (the --batch input format)."""
+        with open(path) as f:
+            # One json.loads over the whole file beats one call per line
+            records = json.loads("[" + ",".join(line for line in f if line.strip()) + "]")
+        return cls.from_records(records)
+
+    @classmethod
+    def from_csv(cls, path) -> "ProfileTable":
+        """Header row of age, sex, ethnicity and UserProfile field names; blank cell = missing.
+
+        Boolean fields accept true/false, yes/no or 1/0. Unknown columns are ignored.
+        """
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = [h.strip() for h in next(reader)]
+            rows = list(reader)
+        cols = dict(zip(header, zip(*rows))) if rows else {h: () for h in header}
+        data = {}
+        for f in score.PROFILE_FIELDS:
+            raw = cols.get(f)
+            if raw is None:
+                continue
+            if f in BOOL_FIELDS:
+                data[f] = [_BOOL_TEXT[v.strip().lower()] for v in raw]
+            else:
+                data[f] = np.array([v.strip() or "nan" for v in raw], dtype=np.float64)
+        return cls(
+            age=[a.strip() or "nan" for a in cols["age"]],
+            sex=[s.strip() for s in cols["sex"]],
+            ethnicity=[e.strip() or "white" for e in cols.get("ethnicity", [""] * len(rows))],
+            data=data,
+        )
+
+
+class ProfileRow:
+    """Zero-copy view of one ProfileTable row, read like a UserProfile (NaN reads as None)."""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: ProfileTable, index: int):
+        self.table = table
+        self.index = index
+
+    def __getattr__(self, name):
+        col = self.table.data.get(name)
+        if col is None:
+            raise AttributeError(name)
+        v = col[self.index]
+        if v != v:
+            return None
+        return bool(v) if name in BOOL_FIELDS else float(v)
+
+    @property
+    def demographics(self) -> Demographics:
+        t, i = self.table, self.index
+        return Demographics(
+            age=int(t.age[i]),
+            sex=t.sex_labels[t.sex[i]],
+            ethnicity=t.ethnicity_labels[t.ethnicity[i]],
+        )
+
+    def to_profile(self) -> UserProfile:
+        """Copy out as a real UserProfile."""
+        return UserProfile(demographics=self.demographics,
+                           **dict(zip(score.PROFILE_FIELDS, score.profile_row(self))))
+
+    def __repr__(self) -> str:
+        d = self.demographics
+        return f"<ProfileRow {self.index}: {d.age}{d.sex}, {d.ethnicity}>"
+
+
+# ---------------------------------------------------------------------------
+# Vectorized assess
+# ---------------------------------------------------------------------------
+
+# ---------------------------------------------------------------------------
+# Dense cutoff tensor — every manual table × age bucket × sex, gaps already
+# filled by score.resolve_cutoffs, so classification is pure array indexing
+# ---------------------------------------------------------------------------
+
+_cutoffs = None  # (table index by name, (tables, buckets, sexes + 1, 4) tensor, lower_is_better per table)
+
+
+def _build_cutoff_grid(table: dict) -> np.ndarray:
+    """Dense (age bucket, sex, 4) view of a cutoff table. NaN where assess() finds no cutoffs."""
+    grid = np.full((len(AGE_BUCKETS), len(SEXES) + 1, 4), np.nan)
+    cells, _ = score.resolve_cutoffs(table)
+    universal = table["cutoffs"].get("universal")
+    for b, bucket in enumerate(AGE_BUCKETS):
+        for s, sex in enumerate(SEXES):
+            if (bucket, sex) in cells:
+                grid[b, s] = cells[(bucket, sex)]
+        if universal:
+            grid[b, len(SEXES)] = universal
+    return grid
+
+
+def build_cutoff_tensor(tables: dict) -> np.ndarray:
+    """(tables, age buckets, sexes + 1, 4) stack of _build_cutoff_grid, in `tables` order."""
+    return np.stack([_build_cutoff_grid(table) for table in tables.values()])
+
+
+def cutoff_tensor():
+    """(index {table name: i}, tensor, lower_is_better as 0/1 per table) for score.py's
+    tables; from the reference snapshot when it's current with score.py."""
+    global _cutoffs
+    if _cutoffs is None:
+        tables = score.cutoff_tables()
+        tensor = None
+        from nhanes import snapshot
+        snap = snapshot.load()
+        if snap is not None and snap.is_fresh("tables") and snap.meta["tables"] == list(tables):
+            tensor = snap.array("tables/cutoffs")
+        if tensor is None:
+            tensor = build_cutoff_tensor(tables)
+        _cutoffs = (
+            {name: i for i, name in enumerate(tables)},
+            tensor,
+            np.array([table["lower_is_better"] for table in tables.values()], dtype=np.intp),
+        )
+    return _cutoffs
+
+
+def cutoff_index(table: dict) -> int | None:
+    """The table's index into the cutoff tensor, None for a table not defined in score.py."""
+    name = score.module_table_name(table)
+    return None if name is None else cutoff_tensor()[0][name]
+
+
+# Band → standing / percentile, flat index lower_is_better * 5 + band
+_BAND_CODES = np.concatenate([_BANDS[False][0], _BANDS[True][0]])
+_BAND_PCTS = np.concatenate([_BANDS[False][1], _BANDS[True][1]])
+
+
+def classify_cutoffs(values, table_idx, bucket_idx, sex_idx, tables=None):
+    """Standing codes and percentiles for values against the cutoff tensor (any mix of tables).
+
+    The band is the number of a cell's cutoffs strictly below the value —
+    np.searchsorted(cutoffs, value, side="left") per cell — computed as four
+    compares against one flat lookup row per cutoff position, which beats
+    grouping values by cell for a searchsorted with only four cutoffs. Both
+    directions share it; lower_is_better only picks the band → standing row.
+    `tables` = (tensor, lower_is_better) classifies against other tables than
+    score.py's. Returns (int8 codes, float64 percentiles), UNKNOWN / NaN for
+    empty cells and NaN values.
+    """
+    tensor, lower_is_better = tables or cutoff_tensor()[1:]
+    n_tables, n_buckets, n_sexes, _ = tensor.shape
+    cell = (table_idx * n_buckets + bucket_idx) * n_sexes + sex_idx
+    cutoffs = tensor.reshape(-1, 4).T  # (4, cells)
+    band = (cutoffs[0][cell] < values).astype(np.intp)
+    for row in cutoffs[1:]:
+        band += row[cell] < values
+    known = ~np.isnan(cutoffs[0][cell]) & ~np.isnan(values)
+    lookup = lower_is_better[table_idx] * len(_BANDS[True][0]) + band
+    standing = np.where(known, _BAND_CODES[lookup], UNKNOWN).astype(np.int8)
+    pct = np.where(known, _BAND_PCTS[lookup], np.nan)
+    return standing, pct
+
+
+def _nhanes_percentiles(nhanes_key, values, ages, sex_idx, eth_idx=0):
+    """NHANES percentile for each value on the continuous-age curves (NaN where there is no curve)."""
+    return score.nhanes_percentiles_at_age(NHANES_KEY_MAP[nhanes_key], values, ages, sex_idx, eth_idx)
+
+
+def ethnicity_codes(labels) -> np.ndarray:
+    """NHANES stratum code per ethnicity label (percentile_lookup.ETHNICITIES index + 1, 0 = other/unknown)."""
+    from nhanes.percentile_lookup import ETHNICITIES
+    labels = np.asarray(labels, dtype=object)
+    codes = np.zeros(labels.shape, dtype=np.intp)
+    for i, label in enumerate(ETHNICITIES):
+        codes[labels == label] = i + 1
+    return codes
+
+
+def assess_many(values, table, bucket_idx, sex_idx, nhanes_key=None, ages=None, eth_idx=0):
+    """Vectorized score.assess over present (non-NaN) values.
+
+    ages (years) drive the NHANES lookup; without them it uses the bucket
+    midpoints, which land exactly on the bucket curves. eth_idx (see
+    ethnicity_codes) selects NHANES ethnicity strata where the file has
+    them. Manual cutoff tables always use bucket_idx and sex_idx only.
+    Returns (standing codes int8, percentile float64 with NaN where UNKNOWN).
+    """
+    n = len(values)
+    standing = np.full(n, UNKNOWN, dtype=np.int8)
+    pct = np.full(n, np.nan)
+
+    todo = None
+    if score.NHANES_AVAILABLE and nhanes_key and nhanes_key in NHANES_KEY_MAP:
+        if ages is None:
+            ages = BUCKET_CENTERS[bucket_idx]
+        raw = _nhanes_percentiles(nhanes_key, values, ages, sex_idx, eth_idx)
+        hit = ~np.isnan(raw)
+        standing[hit] = _PCT_STANDING[np.searchsorted(_PCT_EDGES, raw[hit], side="right")]
+        pct[hit] = _round_half_up(raw[hit])
+        todo = ~hit
+        if not todo.any():
+            return standing, pct
+
+    # Manual cutoff tables (5-bucket approximation), gaps filled at tensor build
+    i = cutoff_index(table)
+    if i is None:  # a table not in score.py: a one-table tensor for this call only
+        one = (_build_cutoff_grid(table)[None], np.array([int(table["lower_is_better"])], dtype=np.intp))
+        st, p = classify_cutoffs(values, 0, bucket_idx, sex_idx, one)
+    else:
+        st, p = classify_cutoffs(values, i, bucket_idx, sex_idx)
+    if todo is not None:
+        st[~todo] = standing[~todo]
+        p[~todo] = pct[~todo]
+    return st, p
+
+
+_BAND_OPS = {
+    operator.lt: np.less, operator.le: np.less_equal,
+    operator.gt: np.greater, operator.ge: np.greater_equal,
+}
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def score_columns(cols: Mapping) -> "ScoreFrame":
+    """Score profiles laid out as column arrays. See ScoreFrame for the result layout."""
+    age = np.asarray(cols["age"], dtype=np.float64)
+    n = len(age)
+    sexes = np.asarray(cols["sex"], dtype=object)
+    bucket_idx = np.searchsorted(AGE_EDGES, age, side="right")
+    sex_idx = np.full(n, len(SEXES), dtype=np.intp)
+    for s, code in enumerate(SEXES):
+        sex_idx[sexes == code] = s
+    eth_idx = np.zeros(n, dtype=np.intp)
+    if score.NHANES_AVAILABLE and "ethnicity" in cols:
+        eth_idx = ethnicity_codes(cols["ethnicity"])
+
+    # Metric-major (m, n) so each metric works on contiguous rows; returned transposed.
+    m = len(PLAN)
+    has_data = np.zeros((m, n), dtype=bool)
+    value = np.full((m, n), np.nan)
+    source = np.full((m, n), -1, dtype=np.int8)
+    standing = np.full((m, n), UNKNOWN, dtype=np.int8)
+    pct = np.full((m, n), np.nan)
+
+    for j, step in enumerate(PLAN):
+        for f in step.coverage:
+            has_data[j] |= ~np.isnan(_column(cols, _FIELD[f], n))
+
+        chain = step.sources
+        if not chain:
+            # Coverage-only metric: collected = Good
+            standing[j][has_data[j]] = GOOD
+            continue
+
+        v = value[j]
+        src = source[j]
+        for k, (f, _table, _key, _unit) in enumerate(chain):
+            col = _column(cols, _FIELD[f], n)
+            if k == 0:
+                v[:] = col
+                src[~np.isnan(col)] = 0
+                continue
+            take = np.isnan(v) & ~np.isnan(col)
+            v[take] = col[take]
+            src[take] = k
+
+        todo = src >= 0
+        for op, threshold, band_standing, band_pct in step.bands:
+            hit = todo & _BAND_OPS[op](v, threshold)
+            standing[j][hit] = STANDING_CODE[band_standing]
+            pct[j][hit] = band_pct
+            todo &= ~hit
+
+        for k, (_f, table, nhanes_key, _unit) in enumerate(chain):
+            rows = np.flatnonzero(todo & (src == k)) if len(chain) > 1 else np.flatnonzero(todo)
+            if len(rows):
+                st, p = assess_many(v[rows], table, bucket_idx[rows], sex_idx[rows], nhanes_key, age[rows],
+                                    eth_idx[rows])
+                standing[j][rows] = st
+                pct[j][rows] = p
+
+    # --- Coverage + tier sub-scores (same arithmetic as score_profile) ---
+    tier1 = METRIC_TIERS == 1
+    tier2 = METRIC_TIERS == 2
+    total_weight = sum(TIER1_WEIGHTS.values()) + sum(TIER2_WEIGHTS.values())
+    t1_total = sum(TIER1_WEIGHTS.values())
+    t2_total = sum(TIER2_WEIGHTS.values())
+    covered = METRIC_WEIGHTS @ has_data
+    t1_covered = METRIC_WEIGHTS[tier1] @ has_data[tier1]
+    t2_covered = METRIC_WEIGHTS[tier2] @ has_data[tier2]
+
+    assessed = ~np.isnan(pct)
+    n_assessed = assessed.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg_percentile = _round_half_up(np.where(assessed, pct, 0).sum(axis=0) / n_assessed)
+
+    has_data, value, source, standing, pct = has_data.T, value.T, source.T, standing.T, pct.T
+    return ScoreFrame(
+        metrics=METRIC_NAMES,
+        tier=METRIC_TIERS,
+        coverage_weight=METRIC_WEIGHTS,
+        has_data=has_data,
+        value=value,
+        source=source,
+        standing=standing,
+        percentile=pct.astype(np.float32),
+        coverage_score=_round_half_up(covered / total_weight * 100).astype(np.int64),
+        covered_count=has_data.sum(axis=1),
+        tier1_pct=_round_half_up(t1_covered / t1_total * 100).astype(np.int64),
+        tier1_count=has_data[:, tier1].sum(axis=1),
+        tier1_covered=t1_covered,
+        tier2_pct=_round_half_up(t2_covered / t2_total * 100).astype(np.int64),
+        tier2_count=has_data[:, tier2].sum(axis=1),
+        tier2_covered=t2_covered,
+        avg_percentile=avg_percentile,  # NaN when nothing was assessed
+        columns=cols,
+    )
+
+
+def score_many(profiles) -> "ScoreFrame":
+    """Score many profiles at once.
+
+    Accepts a ProfileTable, a sequence of UserProfile or a mapping of column
+    arrays (see profile_columns / record_columns). Returns a ScoreFrame;
+    frame[i] is the score_profile-compatible view of profile i.
+    """
+    if isinstance(profiles, ProfileTable):
+        cols = profiles.columns()
+    elif isinstance(profiles, Mapping):
+        cols = profiles
+    else:
+        cols = profile_columns(profiles)
+    return score_columns(cols)
+
+
+# ---------------------------------------------------------------------------
+# ScoreFrame — struct-of-arrays result, materialized on access
+# ---------------------------------------------------------------------------
+
+def _opt(x):
+    """NaN → None, integral floats stay floats (values are float64 columns)."""
+    return None if x != x else x
+
+
+_NAMES = METRIC_NAMES
+_RANKS = tuple(step.rank for step in PLAN)
+_COSTS = tuple(step.cost_to_close for step in PLAN)
+_NOTES = tuple(step.note for step in PLAN)
+_UNITS = tuple(step.unit for step in PLAN)
+_SOURCE_UNITS = tuple(tuple(src[3] for src in step.sources) for step in PLAN)
+_NOTE_ON_FALLBACK = tuple(step.note_on_fallback for step in PLAN)
+_T1_TOTAL = sum(TIER1_WEIGHTS.values())
+_T2_TOTAL = sum(TIER2_WEIGHTS.values())
+
+
+class ScoreFrame:
+    """Scores for n profiles × m metrics, one array per column.
+
+    Per metric (m,):       metrics, tier, coverage_weight
+    Per profile × metric:  has_data (bool), value (float64), source (int8, -1 = none),
+                           standing (int8 codes into STANDINGS), percentile (float32, NaN = none)
+    Per profile (n,):      coverage_score, covered_count, tier1_pct, tier1_count, tier1_covered,
+                           tier2_pct, tier2_count, tier2_covered, avg_percentile (NaN = none)
+
+    Nothing per-metric is built until asked for: frame[i] is a score_profile-
+    compatible mapping whose "results"/"gaps" become MetricResults on first
+    access; metric_dicts(i) goes straight to to_dict()-shaped dicts.
+    """
+
+    __slots__ = (
+        "metrics", "tier", "coverage_weight",
+        "has_data", "value", "source", "standing", "percentile",
+        "coverage_score", "covered_count",
+        "tier1_pct", "tier1_count", "tier1_covered",
+        "tier2_pct", "tier2_count", "tier2_covered",
+        "avg_percentile", "columns",
+    )
+
+    def __init__(self, **columns):
+        for name in self.__slots__:
+            setattr(self, name, columns[name])
+
+    def __len__(self) -> int:
+        return len(self.coverage_score)
+
+    def __getitem__(self, i: int) -> "ProfileScore":
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return ProfileScore(self, i % len(self))
+
+    def __iter__(self):
+        return (ProfileScore(self, i) for i in range(len(self)))
+
+    # --- per-metric materialization ---
+
+    def _unit(self, i: int, j: int) -> str:
+        src = self.source[i, j]
+        unit = _SOURCE_UNITS[j][src] if src >= 0 else _UNITS[j]
+        detail = PLAN[j].unit_detail
+        if detail is not None:
+            col = self.columns.get(_FIELD[detail])
+            if col is not None:
+                d = _opt(float(col[i]))
+                unit += f"/{int(d)}" if d else ""
+        return unit
+
+    def _fields(self, i: int, j: int) -> tuple:
+        """(has_data, value, unit, standing, percentile, note) for metric j of profile i."""
+        has = bool(self.has_data[i, j])
+        src = self.source[i, j]
+        if _NOTE_ON_FALLBACK[j]:
+            show_note = has and src != 0
+        else:
+            show_note = not has
+        pct = self.percentile[i, j]
+        return (
+            has,
+            _opt(float(self.value[i, j])) if _SOURCE_UNITS[j] else None,
+            self._unit(i, j),
+            STANDINGS[self.standing[i, j]],
+            None if pct != pct else int(pct),
+            _NOTES[j] if show_note else "",
+        )
+
+    def metric_result(self, i: int, j: int) -> MetricResult:
+        has, value, unit, standing, pct, note = self._fields(i, j)
+        return MetricResult(
+            name=_NAMES[j], tier=int(self.tier[j]), rank=_RANKS[j],
+            has_data=has, value=value, unit=unit, standing=standing, percentile_approx=pct,
+            coverage_weight=int(self.coverage_weight[j]), cost_to_close=_COSTS[j], note=note,
+        )
+
+    def metric_results(self, i: int) -> list[MetricResult]:
+        return [self.metric_result(i, j) for j in range(len(_NAMES))]
+
+    def metric_dicts(self, i: int) -> list[dict]:
+        """MetricResult.to_dict() output for profile i, without building MetricResults."""
+        out = []
+        for j in range(len(_NAMES)):
+            has, value, unit, standing, pct, note = self._fields(i, j)
+            out.append({
+                "name": _NAMES[j],
+                "tier": int(self.tier[j]),
+                "rank": _RANKS[j],
+                "has_data": has,
+                "value": value,
+                "unit": unit,
+                "standing": standing.value,
+                "percentile_approx": pct,
+                "coverage_weight": int(self.coverage_weight[j]),
+                "cost_to_close": _COSTS[j],
+                "note": note,
+            })
+        return out
+
+    def gap_order(self, i: int) -> np.ndarray:
+        """Metric indices without data, by coverage weight (desc), report order within ties."""
+        idx = np.flatnonzero(~self.has_data[i])
+        return idx[np.argsort(-self.coverage_weight[idx], kind="stable")]
+
+    # --- per-profile views ---
+
+    def result(self, i: int) -> dict:
+        """The dict score_profile would have returned for profile i (eager)."""
+        return dict(self[i])
+
+    def summary(self, i: int) -> dict:
+        """Compact JSON-serializable summary of profile i (one --batch output line)."""
+        metrics = {}
+        for j in np.flatnonzero(self.has_data[i]):
+            p = self.percentile[i, j]
+            metrics[_NAMES[j]] = {
+                "standing": STANDINGS[self.standing[i, j]].value,
+                "percentile": None if p != p else int(p),
+            }
+        avg = self.avg_percentile[i]
+        return {
+            "coverage_score": int(self.coverage_score[i]),
+            "tier1_pct": int(self.tier1_pct[i]),
+            "tier2_pct": int(self.tier2_pct[i]),
+            "avg_percentile": None if avg != avg else int(avg),
+            "metrics": metrics,
+            "gaps": [_NAMES[j] for j in self.gap_order(i)],
+        }
+
+
+SCORE_KEYS = (
+    "demographics", "coverage_score", "coverage_fraction",
+    "tier1_pct", "tier1_fraction", "tier1_weight",
+    "tier2_pct", "tier2_fraction", "tier2_weight",
+    "avg_percentile", "results", "gaps",
+)
+
+
+class ProfileScore(Mapping):
+    """Read-only score_profile-shaped view of one ScoreFrame row.
+
+    Works anywhere a score_profile dict is read (print_report, MCP formatters).
+    MetricResults are built once, on the first "results" or "gaps" access.
+    """
+
+    __slots__ = ("frame", "index", "_results")
+
+    def __init__(self, frame: ScoreFrame, index: int):
+        self.frame = frame
+        self.index = index
+        self._results = None
+
+    def __iter__(self):
+        return iter(SCORE_KEYS)
+
+    def __len__(self) -> int:
+        return len(SCORE_KEYS)
+
+    def __getitem__(self, key: str):
+        f, i = self.frame, self.index
+        if key == "results":
+            if self._results is None:
+                self._results = f.metric_results(i)
+            return self._results
+        if key == "gaps":
+            results = self["results"]
+            return [results[j] for j in f.gap_order(i)]
+        if key == "demographics":
+            cols = f.columns
+            age = float(cols["age"][i])
+            age = int(age) if age.is_integer() else age
+            return f"{age}{cols['sex'][i]}, {cols['ethnicity'][i]}"
+        if key == "coverage_fraction":
+            return f"{int(f.covered_count[i])}/{len(f.metrics)}"
+        if key in ("tier1_fraction", "tier2_fraction"):
+            tier = int(key[4])
+            return f"{int(getattr(f, f'tier{tier}_count')[i])}/{int((f.tier == tier).sum())}"
+        if key == "tier1_weight":
+            return f"{int(f.tier1_covered[i])}/{_T1_TOTAL}"
+        if key == "tier2_weight":
+            return f"{int(f.tier2_covered[i])}/{_T2_TOTAL}"
+        if key == "avg_percentile":
+            avg = f.avg_percentile[i]
+            return None if avg != avg else int(avg)
+        if key in ("coverage_score", "tier1_pct", "tier2_pct"):
+            return int(getattr(f, key)[i])
+        raise KeyError(key)
+
+    def __repr__(self) -> str:
+        return f"<ProfileScore {self.index}: {self['demographics']}, coverage {self['coverage_score']}%>"
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Baseline — Garmin Fetch Layer
+
+Every Garmin Connect request garmin_import makes goes through a Fetcher:
+requests run concurrently on a thread pool, paced by a shared token-bucket
+rate limit, and 429 / 5xx responses are retried with backoff.
+
+Rate limit: a token bucket refilled at `rate` requests/second that holds up
+to `burst` tokens, shared by every worker. Adaptive backoff: a throttled or
+failing response halves the rate (down to MIN_RATE) and pauses all workers
+for Retry-After, or else for an exponential, jittered delay. Each success
+then wins back a twentieth of the configured rate. Other errors (404s, bad
+payloads) are not retried.
+
+Request cache: successful responses are kept for the Fetcher's lifetime,
+keyed on (endpoint, args) — for the per-day endpoints that's (endpoint,
+date) — so pulls that share one Fetcher fetch each endpoint/day at most
+once. Failures are not cached.
+
+Response store: given a garmin_store.ResponseStore, days() serves settled
+days from disk and writes what it fetches back (see garmin_store.py), so
+across runs only new or still-changing days go to Garmin.
+
+Usage:
+    fetcher = Fetcher(client, rate=5, workers=8)
+    payloads = fetcher.days("get_sleep_data", 30)      # [(date, payload or None), ...] newest first
+    data = fetcher.call("get_max_metrics", "2026-01-31")  # raises once retries run out
+    print(fetcher.summary())                          # ..., cache: H hits, M misses
+
+The pull_* functions in garmin_import accept a Fetcher or a bare client
+(wrapped in a Fetcher with the default limits).
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+RATE = 5.0          # sustained requests/second
+BURST = 10          # requests that may go out back to back
+WORKERS = 8         # concurrent requests in flight
+RETRIES = 4         # attempts after the first, on 429 / 5xx
+MIN_RATE = 0.5      # adaptive backoff never drops the rate below this (or the configured rate)
+BACKOFF_BASE = 1.0  # seconds; doubled per attempt, plus up to as much jitter
+BACKOFF_MAX = 60.0
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """Thread-safe token bucket with a global pause for backoff. rate=None (or 0) disables limiting."""
+
+    def __init__(self, rate: float = RATE, burst: int = BURST):
+        rate = rate or None
+        self.target = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._resume = 0.0  # monotonic time before which nothing goes out
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may go out."""
+        if self.rate is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1  # may go negative: a reservation paid back by later refills
+            wait = max(-self._tokens / self.rate, self._resume - now)
+        if wait > 0:
+            time.sleep(wait)
+
+    def throttle(self, pause: float):
+        """Halve the rate and hold every request for `pause` seconds."""
+        with self._lock:
+            self._resume = max(self._resume, time.monotonic() + pause)
+            if self.rate is not None:
+                # Floor at MIN_RATE, or at the configured rate when that is already lower
+                self.rate = max(min(MIN_RATE, self.target), min(self.rate, self.target) / 2)
+
+    def recover(self):
+        """Win back part of the configured rate after a success."""
+        if self.rate is not None and self.rate < self.target:
+            with self._lock:
+                self.rate = min(self.target, self.rate + self.target / 20)
+
+
+def http_status(exc: Exception):
+    """HTTP status behind a garminconnect / garth / requests exception, or None."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if "TooManyRequests" in type(exc).__name__:
+            return 429
+        for holder in (exc, getattr(exc, "response", None)):
+            status = getattr(holder, "status_code", None)
+            if isinstance(status, int):
+                return status
+        exc = getattr(exc, "error", None) or exc.__cause__ or exc.__context__
+    return None
+
+
+def retry_after(exc: Exception):
+    """Seconds from a Retry-After header on the exception's response, or None."""
+    while exc is not None:
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        value = headers.get("Retry-After") if hasattr(headers, "get") else None
+        if value is not None:
+            try:
+                return min(float(value), BACKOFF_MAX)
+            except ValueError:
+                return None
+        exc = getattr(exc, "error", None) or exc.__cause__
+    return None
+
+
+def retryable(status) -> bool:
+    return status is not None and (status == 429 or status >= 500)
+
+
+# ---------------------------------------------------------------------------
+# Fetcher
+# ---------------------------------------------------------------------------
+
+class Fetcher:
+    """Concurrent, rate-limited access to a garminconnect.Garmin-like client."""
+
+    def __init__(self, client, rate: float = RATE, burst: int = BURST, workers: int = WORKERS,
+                 retries: int = RETRIES, cache: bool = True, store=None):
+        self.client = client
+        self.store = store  # garmin_store.ResponseStore or None
+        self.cache = {} if cache else None  # (endpoint, *args) -> response
+        self.limiter = TokenBucket(rate, burst)
+        self.workers = max(1, workers)
+        self.retries = retries
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+        self.failures = set()  # (endpoint, *args) of requests that failed for good
+        self.hits = 0
+        self.misses = 0
+        self.from_store = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def call(self, endpoint: str, *args):
+        """client.<endpoint>(*args) under the rate limit, retrying 429 / 5xx. Raises once retries run out."""
+        key = (endpoint, *args)
+        if self.cache is not None:
+            with self._lock:
+                if key in self.cache:
+                    self.hits += 1
+                    return self.cache[key]
+                self.misses += 1
+        fn = getattr(self.client, endpoint)
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            with self._lock:
+                self.requests += 1
+            try:
+                result = fn(*args)
+            except Exception as e:
+                status = http_status(e)
+                if not retryable(status) or attempt == self.retries:
+                    with self._lock:
+                        self.failed += 1
+                        self.failures.add(key)
+                    raise
+                with self._lock:
+                    self.retried += 1
+                delay = min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX)
+                self.limiter.throttle(retry_after(e) or delay + random.uniform(0, delay))
+                continue
+            self.limiter.recover()
+            if self.cache is not None:
+                with self._lock:
+                    self.cache[key] = result
+            return result
+
+    def get(self, endpoint: str, *args):
+        """call(), but None instead of an exception."""
+        return self._attempt(endpoint, *args)[1]
+
+    def _attempt(self, endpoint: str, *args) -> tuple:
+        """(True, response) or (False, None) if the request failed."""
+        try:
+            return True, self.call(endpoint, *args)
+        except Exception:
+            return False, None
+
+    def _map(self, fn, endpoint: str, arg_list) -> list:
+        arg_list = list(arg_list)
+        if len(arg_list) <= 1 or self.workers == 1:
+            return [fn(endpoint, *args) for args in arg_list]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(arg_list))) as pool:
+            return list(pool.map(lambda args: fn(endpoint, *args), arg_list))
+
+    def map(self, endpoint: str, arg_list) -> list:
+        """get(endpoint, *args) for each args tuple, concurrently; results in input order."""
+        return self._map(self.get, endpoint, arg_list)
+
+    def days(self, endpoint: str, days: int, today: date = None) -> list:
+        """[(ISO date, payload or None), ...] for the last `days` days, newest first."""
+        today = today or date.today()
+        return self.dates(endpoint, [(today - timedelta(days=i)).isoformat() for i in range(days)], today)
+
+    def dates(self, endpoint: str, dates: list, today: date = None) -> list:
+        """[(ISO date, payload or None), ...] for the given dates, in order; settled days come from the store."""
+        if self.store is None:
+            return list(zip(dates, self.map(endpoint, ((d,) for d in dates))))
+        today = today or date.today()
+
+        mark = self.store.settled(endpoint)
+        stored = self.store.read(endpoint, [d for d in dates if mark and mark[0] <= d <= mark[1]])
+        missing = [d for d in dates if d not in stored]
+        results = self._map(self._attempt, endpoint, ((d,) for d in missing))
+        self.store.write(endpoint, [(d, payload) for d, (ok, payload) in zip(missing, results) if ok], today)
+        with self._lock:
+            self.from_store += len(stored)
+        fetched = {d: payload for d, (_, payload) in zip(missing, results)}
+        return [(d, stored[d] if d in stored else fetched[d]) for d in dates]
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        parts = [f"{self.requests} requests in {elapsed:.1f}s"]
+        if self.retried:
+            parts.append(f"{self.retried} retried")
+        if self.failed:
+            parts.append(f"{self.failed} failed")
+        summary = "Garmin: " + ", ".join(parts)
+        if self.cache is not None:
+            summary += f"; cache: {self.hits} hits, {self.misses} misses"
+        if self.store is not None:
+            summary += f"; store: {self.from_store} days from disk"
+        return summary
+
+
+def fetcher(client) -> Fetcher:
+    """`client` if it's already a Fetcher, else a new Fetcher around it with the default limits."""
+    return client if isinstance(client, Fetcher) else Fetcher(client)
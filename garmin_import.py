@@ -11,23 +11,38 @@ Outputs a JSON dict compatible with the scoring engine's profile fields:
   - vo2_max
   - hrv_rmssd_avg (7-day avg)
   - zone2_min_per_week (7-day total)
+
+Requests run concurrently through garmin_fetch.Fetcher under one shared rate
+limit (--rate requests/second, --workers in flight), with 429 / 5xx backoff.
+Per-day responses are kept in garmin_store.db; days older than --settle-days
+are served from it, so a daily run only fetches new and recent days.
 """
 
-import csv
 import json
 import os
 import statistics
 import sys
-import time
 from datetime import date, datetime, timedelta
 from pathlib import Path
 
-from garminconnect import Garmin
+from garmin_fetch import Fetcher, fetcher
+from garmin_store import SETTLE_DAYS, ResponseStore
+from strength_store import StrengthLog
+from workout_store import WorkoutStore
 
 TOKEN_DIR = Path(__file__).parent / ".garmin_tokens"
 STRENGTH_LOG = Path(__file__).parent / "strength_log.csv"
-WORKOUTS_JSON = Path(__file__).parent / "garmin_workouts.json"
+WORKOUTS_JSON = Path(__file__).parent / "garmin_workouts.json"  # export of the workout store
+WORKOUT_DIR = Path(__file__).parent / "workouts"
 DAILY_BURN_JSON = Path(__file__).parent / "garmin_daily_burn.json"
+DAILY_SERIES_JSON = Path(__file__).parent / "garmin_daily.json"
+SERIES_CHECKPOINT = Path(__file__).parent / "garmin_daily.checkpoint.json"
+SERIES_CHUNK = 30  # days fetched between saves of the daily series
+ACTIVITY_PAGE_DAYS = 30  # days of activities per get_activities_by_date request
+
+# Garmin API pacing (requests/second, concurrent requests) — see garmin_fetch.py
+RATE_LIMIT = 5.0
+WORKERS = 8
 
 # Map Garmin exercise names → strength_log.csv keys
 EXERCISE_NAME_MAP = {
@@ -47,6 +62,8 @@ EXERCISE_NAME_MAP = {
 
 def get_client():
     """Authenticate with Garmin Connect, caching tokens."""
+    from garminconnect import Garmin
+
     # Try cached tokens first (no credentials needed)
     if TOKEN_DIR.exists():
         try:
@@ -82,29 +99,58 @@ def get_client():
     return client
 
 
+def make_fetcher(client, rate=RATE_LIMIT, workers=WORKERS, store=True, settle_days=SETTLE_DAYS) -> Fetcher:
+    """One Fetcher for a whole run, so every pull_* shares its rate limit and request cache.
+
+    With store=True, per-day responses are read from and saved to garmin_store.db.
+    """
+    store = ResponseStore(settle_days=settle_days) if store else None
+    return Fetcher(client, rate=rate, workers=workers, store=store)
+
+
+def rhr_value(data):
+    """Resting HR from a get_rhr_day payload, or None."""
+    try:
+        if data and isinstance(data, dict):
+            # Try direct keys first
+            rhr = (data.get("restingHeartRate")
+                   or data.get("currentDayRestingHeartRate"))
+            # Try nested structure: allMetrics.metricsMap.WELLNESS_RESTING_HEART_RATE
+            if not rhr:
+                metrics_map = (data.get("allMetrics", {}) or {}).get("metricsMap", {}) or {}
+                wellness_rhr = metrics_map.get("WELLNESS_RESTING_HEART_RATE", [])
+                if wellness_rhr and isinstance(wellness_rhr, list):
+                    rhr = wellness_rhr[0].get("value")
+            if rhr and isinstance(rhr, (int, float)) and rhr > 0:
+                return rhr
+    except Exception:
+        pass
+    return None
+
+
+def hrv_value(data):
+    """Nightly (else weekly) HRV RMSSD from a get_hrv_data payload, or None."""
+    try:
+        if data:
+            # Try top-level keys, then nested: hrvSummary.weeklyAvg / lastNightAvg
+            summary = data.get("hrvSummary", {}) or {}
+            weekly = data.get("weeklyAvg") or summary.get("weeklyAvg")
+            nightly = data.get("lastNightAvg") or summary.get("lastNightAvg")
+            val = nightly or weekly  # prefer nightly for more granular data
+            if val and isinstance(val, (int, float)) and val > 0:
+                return val
+    except Exception:
+        pass
+    return None
+
+
 def pull_resting_hr(client, days=30):
     """Get average resting heart rate over N days."""
     values = []
-    today = date.today()
-    for i in range(days):
-        d = (today - timedelta(days=i)).isoformat()
-        try:
-            data = client.get_rhr_day(d)
-            if data and isinstance(data, dict):
-                # Try direct keys first
-                rhr = (data.get("restingHeartRate")
-                       or data.get("currentDayRestingHeartRate"))
-                # Try nested structure: allMetrics.metricsMap.WELLNESS_RESTING_HEART_RATE
-                if not rhr:
-                    metrics_map = (data.get("allMetrics", {}) or {}).get("metricsMap", {}) or {}
-                    wellness_rhr = metrics_map.get("WELLNESS_RESTING_HEART_RATE", [])
-                    if wellness_rhr and isinstance(wellness_rhr, list):
-                        rhr = wellness_rhr[0].get("value")
-                if rhr and isinstance(rhr, (int, float)) and rhr > 0:
-                    values.append(rhr)
-        except Exception:
-            pass
-        time.sleep(0.3)
+    for _, data in fetcher(client).days("get_rhr_day", days):
+        rhr = rhr_value(data)
+        if rhr:
+            values.append(rhr)
 
     if values:
         avg = round(statistics.mean(values), 1)
@@ -117,18 +163,14 @@ def pull_resting_hr(client, days=30):
 def pull_steps(client, days=30):
     """Get average daily steps over N days."""
     values = []
-    today = date.today()
-    for i in range(days):
-        d = (today - timedelta(days=i)).isoformat()
+    for _, stats in fetcher(client).days("get_stats", days):
         try:
-            stats = client.get_stats(d)
             if stats and stats.get("totalSteps"):
                 steps = stats["totalSteps"]
                 if isinstance(steps, (int, float)) and steps > 0:
                     values.append(steps)
         except Exception:
             pass
-        time.sleep(0.3)
 
     if values:
         avg = round(statistics.mean(values))
@@ -141,11 +183,8 @@ def pull_steps(client, days=30):
 def pull_sleep_regularity(client, days=30):
     """Get bedtime standard deviation (minutes) over N days."""
     bedtimes = []
-    today = date.today()
-    for i in range(days):
-        d = (today - timedelta(days=i)).isoformat()
+    for _, sleep in fetcher(client).days("get_sleep_data", days):
         try:
-            sleep = client.get_sleep_data(d)
             if sleep:
                 dto = sleep.get("dailySleepDTO", {})
                 ts = dto.get("sleepStartTimestampLocal")
@@ -158,7 +197,6 @@ def pull_sleep_regularity(client, days=30):
                     bedtimes.append(minutes)
         except Exception:
             pass
-        time.sleep(0.3)
 
     if len(bedtimes) > 1:
         stdev = round(statistics.stdev(bedtimes), 1)
@@ -174,11 +212,8 @@ def pull_sleep_regularity(client, days=30):
 def pull_sleep_duration(client, days=30):
     """Get average sleep duration (hours) over N days."""
     durations = []
-    today = date.today()
-    for i in range(days):
-        d = (today - timedelta(days=i)).isoformat()
+    for _, sleep in fetcher(client).days("get_sleep_data", days):
         try:
-            sleep = client.get_sleep_data(d)
             if sleep:
                 dto = sleep.get("dailySleepDTO", {})
                 secs = dto.get("sleepTimeSeconds")
@@ -186,7 +221,6 @@ def pull_sleep_duration(client, days=30):
                     durations.append(secs / 3600)
         except Exception:
             pass
-        time.sleep(0.3)
 
     if durations:
         avg = round(statistics.mean(durations), 1)
@@ -200,7 +234,7 @@ def pull_vo2_max(client):
     """Get latest VO2 max estimate."""
     today = date.today()
     try:
-        data = client.get_max_metrics(today.isoformat())
+        data = fetcher(client).call("get_max_metrics", today.isoformat())
         if data:
             # May be a list or dict depending on response
             if isinstance(data, list) and len(data) > 0:
@@ -224,27 +258,10 @@ def pull_vo2_max(client):
 def pull_hrv(client, days=7):
     """Get average HRV RMSSD over N days."""
     values = []
-    today = date.today()
-    for i in range(days):
-        d = (today - timedelta(days=i)).isoformat()
-        try:
-            data = client.get_hrv_data(d)
-            if data:
-                # Try top-level keys
-                weekly = data.get("weeklyAvg")
-                nightly = data.get("lastNightAvg")
-                # Try nested: hrvSummary.weeklyAvg / lastNightAvg
-                summary = data.get("hrvSummary", {}) or {}
-                if not weekly:
-                    weekly = summary.get("weeklyAvg")
-                if not nightly:
-                    nightly = summary.get("lastNightAvg")
-                val = nightly or weekly  # prefer nightly for more granular data
-                if val and isinstance(val, (int, float)) and val > 0:
-                    values.append(val)
-        except Exception:
-            pass
-        time.sleep(0.3)
+    for _, data in fetcher(client).days("get_hrv_data", days):
+        val = hrv_value(data)
+        if val:
+            values.append(val)
 
     if values:
         avg = round(statistics.mean(values), 1)
@@ -261,9 +278,7 @@ def pull_zone2_minutes(client, days=7):
     total_z2 = 0
 
     try:
-        activities = client.get_activities_by_date(
-            week_ago.isoformat(), today.isoformat()
-        )
+        activities = fetcher(client).call("get_activities_by_date", week_ago.isoformat(), today.isoformat())
         if not activities:
             print("  Zone 2: no activities found")
             return None
@@ -282,54 +297,80 @@ def pull_zone2_minutes(client, days=7):
         return None
 
 
-def pull_daily_series(client, days=90):
-    """Pull daily RHR + HRV time series for trend analysis."""
-    series = []
-    today = date.today()
-    print(f"\n  Pulling {days}-day daily series (RHR + HRV)...")
-
-    for i in range(days):
-        d = today - timedelta(days=i)
-        d_str = d.isoformat()
-        entry = {"date": d_str, "rhr": None, "hrv": None}
-
-        # RHR
-        try:
-            data = client.get_rhr_day(d_str)
-            if data and isinstance(data, dict):
-                rhr = (data.get("restingHeartRate")
-                       or data.get("currentDayRestingHeartRate"))
-                if not rhr:
-                    metrics_map = (data.get("allMetrics", {}) or {}).get("metricsMap", {}) or {}
-                    wellness_rhr = metrics_map.get("WELLNESS_RESTING_HEART_RATE", [])
-                    if wellness_rhr and isinstance(wellness_rhr, list):
-                        rhr = wellness_rhr[0].get("value")
-                if rhr and isinstance(rhr, (int, float)) and rhr > 0:
-                    entry["rhr"] = round(rhr, 1)
-        except Exception:
-            pass
-
-        # HRV
-        try:
-            data = client.get_hrv_data(d_str)
-            if data:
-                summary = data.get("hrvSummary", {}) or {}
-                nightly = data.get("lastNightAvg") or summary.get("lastNightAvg")
-                weekly = data.get("weeklyAvg") or summary.get("weeklyAvg")
-                val = nightly or weekly
-                if val and isinstance(val, (int, float)) and val > 0:
-                    entry["hrv"] = round(val, 1)
-        except Exception:
-            pass
-
-        series.append(entry)
-        time.sleep(0.3)
+def _write_json(path, data):
+    """Write JSON atomically, so an interrupted run never leaves a truncated file."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
 
-    # Reverse to chronological order
-    series.reverse()
 
-    filled_rhr = sum(1 for e in series if e["rhr"] is not None)
-    filled_hrv = sum(1 for e in series if e["hrv"] is not None)
+def _read_json(path, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def pull_daily_series(client, days=90, path=DAILY_SERIES_JSON, checkpoint=SERIES_CHECKPOINT, settle_days=None):
+    """Pull daily RHR + HRV time series for trend analysis (chronological).
+
+    With a path, the saved series is filled in rather than re-pulled: only days
+    in the window that are missing or null, plus the last settle_days (still
+    changing; default: the fetcher's store setting, else SETTLE_DAYS), are
+    fetched, newest first, and merged into the file after every SERIES_CHUNK
+    days. Settled days that were fetched successfully go into the
+    checkpoint, so an interrupted backfill resumes where it stopped and days
+    Garmin has no data for aren't asked for again. path=None fetches the whole
+    window and saves nothing.
+    """
+    fetch = fetcher(client)
+    today = date.today()
+    if settle_days is None:
+        settle_days = fetch.store.settle_days if fetch.store else SETTLE_DAYS
+    window = [(today - timedelta(days=i)).isoformat() for i in range(days)]
+    by_date = {e["date"]: e for e in _read_json(path, [])} if path else {}
+    tried = set(_read_json(checkpoint, [])) if path and checkpoint else set()
+    settling = (today - timedelta(days=settle_days)).isoformat()
+
+    def needed(d):
+        e = by_date.get(d)
+        return d > settling or (d not in tried and (e is None or e["rhr"] is None or e["hrv"] is None))
+
+    gaps = [d for d in window if needed(d)]
+    print(f"\n  Pulling {days}-day daily series (RHR + HRV): {len(gaps)} days to fetch...")
+
+    step = SERIES_CHUNK if path else max(1, len(gaps))  # nothing to save between chunks without a path
+    for start in range(0, len(gaps), step):
+        chunk = gaps[start:start + step]
+        rhr_days = fetch.dates("get_rhr_day", chunk, today)
+        hrv_days = fetch.dates("get_hrv_data", chunk, today)
+        for (d_str, rhr_data), (_, hrv_data) in zip(rhr_days, hrv_days):
+            old = by_date.get(d_str, {})
+            rhr = rhr_value(rhr_data)
+            hrv = hrv_value(hrv_data)
+            by_date[d_str] = {
+                "date": d_str,
+                "rhr": round(rhr, 1) if rhr else old.get("rhr"),
+                "hrv": round(hrv, 1) if hrv else old.get("hrv"),
+            }
+        if path:
+            _write_json(path, sorted(by_date.values(), key=lambda e: e["date"]))
+            if checkpoint:
+                tried.update(d for d in chunk if d <= settling
+                             and ("get_rhr_day", d) not in fetch.failures
+                             and ("get_hrv_data", d) not in fetch.failures)
+                _write_json(checkpoint, sorted(tried))
+            if len(gaps) > step:
+                print(f"    {chunk[-1]} … {chunk[0]}: {start + len(chunk)}/{len(gaps)} days")
+
+    # Chronological; days outside the window stay in the saved history
+    series = sorted(by_date.values(), key=lambda e: e["date"])
+
+    in_window = [by_date[d] for d in window if d in by_date]
+    filled_rhr = sum(1 for e in in_window if e["rhr"] is not None)
+    filled_hrv = sum(1 for e in in_window if e["hrv"] is not None)
     print(f"  Daily series: {filled_rhr} RHR days, {filled_hrv} HRV days (of {days})")
     return series
 
@@ -342,138 +383,174 @@ def normalize_exercise(name):
     return lower.replace(" ", "_")
 
 
-def pull_workouts(client, days=7):
-    """Pull recent activities and extract workout details."""
+def workout_store():
+    """The month-partitioned workout store (imports garmin_workouts.json on first use)."""
+    return WorkoutStore(WORKOUT_DIR, legacy=WORKOUTS_JSON)
+
+
+def known_activity_ids():
+    """Activity IDs already saved in the workout store."""
+    return workout_store().ids()
+
+
+def activity_pages(client, start, end):
+    """Yield get_activities_by_date results ACTIVITY_PAGE_DAYS at a time, newest first."""
+    fetch = fetcher(client)
+    page_end = end
+    while page_end >= start:
+        page_start = max(start, page_end - timedelta(days=ACTIVITY_PAGE_DAYS - 1))
+        yield fetch.call("get_activities_by_date", page_start.isoformat(), page_end.isoformat()) or []
+        page_end = page_start - timedelta(days=1)
+
+
+def parse_workout(act, sets_data, today):
+    """Workout summary (with strength sets, if any) from an activity and its exercise sets."""
+    activity_id = act.get("activityId")
+    activity_type = act.get("activityType", {})
+    type_key = activity_type.get("typeKey", "unknown") if isinstance(activity_type, dict) else str(activity_type)
+    act_name = act.get("activityName", type_key)
+    start_local = act.get("startTimeLocal", "")
+    act_date = start_local[:10] if start_local else today.isoformat()
+    duration_secs = act.get("duration", 0)
+    calories = act.get("calories", 0)
+    avg_hr = act.get("averageHR")
+
+    workout = {
+        "activity_id": activity_id,
+        "date": act_date,
+        "name": act_name,
+        "type": type_key,
+        "duration_min": round(duration_secs / 60, 1) if duration_secs else 0,
+        "calories": calories,
+        "avg_hr": avg_hr,
+        "strength_sets": [],
+    }
+
+    if activity_id:
+        try:
+            if not sets_data:
+                raise ValueError("no data")
+            exercises = sets_data.get("exerciseSets", []) if isinstance(sets_data, dict) else sets_data if isinstance(sets_data, list) else []
+            for s in exercises:
+                if not isinstance(s, dict):
+                    continue
+                # Skip rest periods and non-exercise entries
+                set_type = s.get("setType")
+                if set_type == "REST":
+                    continue
+                ex_name = s.get("exerciseName") or s.get("exercises", [{}])[0].get("exerciseName", "") if s.get("exercises") else ""
+                if not ex_name:
+                    ex_category = s.get("exerciseCategory", "")
+                    ex_name = ex_category if ex_category else "unknown"
+                weight = s.get("weight")  # grams from Garmin
+                reps = s.get("repetitionCount") or s.get("reps")
+                rpe = s.get("rpe")
+
+                # Convert weight from grams to lbs if present
+                weight_lbs = None
+                if weight and isinstance(weight, (int, float)) and weight > 0:
+                    weight_lbs = round(weight / 453.592, 1)
+
+                workout["strength_sets"].append({
+                    "exercise": ex_name,
+                    "exercise_normalized": normalize_exercise(ex_name),
+                    "weight_lbs": weight_lbs,
+                    "reps": reps,
+                    "rpe": rpe,
+                })
+        except Exception:
+            pass  # No exercise set data for this activity
+
+    return workout
+
+
+def pull_workouts(client, days=7, known=None):
+    """Pull recent activities and extract workout details, yielding one list of
+    new workouts per activity page (newest first).
+
+    Activities whose IDs are in `known` (default: those already saved in
+    the workout store) are skipped before any detail request. The activity
+    list is paged by date and each page is handed to the caller before the
+    next is fetched, so a caller that saves as it goes (main() does) never
+    holds the whole history of a long backfill.
+    """
     today = date.today()
     start = today - timedelta(days=days)
+    known = known_activity_ids() if known is None else set(known)
 
+    fetch = fetcher(client)
     print(f"\n  Pulling activities from {start} to {today}...")
-    try:
-        activities = client.get_activities_by_date(
-            start.isoformat(), today.isoformat()
-        )
-    except Exception as e:
-        print(f"  Error fetching activities: {e}")
-        return []
+    found = 0
+    skipped = 0
+    pages = activity_pages(fetch, start, today)
+    while True:
+        try:
+            activities = next(pages)
+        except StopIteration:
+            break
+        except Exception as e:
+            print(f"  Error fetching activities: {e}")
+            break
+
+        new = [act for act in activities if act.get("activityId") not in known]
+        skipped += len(activities) - len(new)
+
+        # Exercise sets for every new activity, fetched concurrently — type is unreliable
+        ids = [act["activityId"] for act in new if act.get("activityId")]
+        sets_by_id = dict(zip(ids, fetch.map("get_activity_exercise_sets", [(i,) for i in ids])))
+
+        workouts = []
+        for act in new:
+            workout = parse_workout(act, sets_by_id.get(act.get("activityId")), today)
+            workouts.append(workout)
+            set_count = len(workout["strength_sets"])
+            if set_count:
+                print(f"    {workout['date']} {workout['name']}: {set_count} sets")
+            else:
+                print(f"    {workout['date']} {workout['name']} ({workout['type']})")
+        if workouts:
+            found += len(workouts)
+            yield workouts
 
-    if not activities:
+    if not found and not skipped:
         print("  No activities found.")
-        return []
-
-    workouts = []
-    for act in activities:
-        activity_id = act.get("activityId")
-        activity_type = act.get("activityType", {})
-        type_key = activity_type.get("typeKey", "unknown") if isinstance(activity_type, dict) else str(activity_type)
-        act_name = act.get("activityName", type_key)
-        start_local = act.get("startTimeLocal", "")
-        act_date = start_local[:10] if start_local else today.isoformat()
-        duration_secs = act.get("duration", 0)
-        calories = act.get("calories", 0)
-        avg_hr = act.get("averageHR")
-
-        workout = {
-            "activity_id": activity_id,
-            "date": act_date,
-            "name": act_name,
-            "type": type_key,
-            "duration_min": round(duration_secs / 60, 1) if duration_secs else 0,
-            "calories": calories,
-            "avg_hr": avg_hr,
-            "strength_sets": [],
-        }
-
-        # Try pulling exercise sets for any activity — type is unreliable
-        if activity_id:
-            try:
-                sets_data = client.get_activity_exercise_sets(activity_id)
-                if not sets_data:
-                    raise ValueError("no data")
-                exercises = sets_data.get("exerciseSets", []) if isinstance(sets_data, dict) else sets_data if isinstance(sets_data, list) else []
-                for s in exercises:
-                    if not isinstance(s, dict):
-                        continue
-                    # Skip rest periods and non-exercise entries
-                    set_type = s.get("setType")
-                    if set_type == "REST":
-                        continue
-                    ex_name = s.get("exerciseName") or s.get("exercises", [{}])[0].get("exerciseName", "") if s.get("exercises") else ""
-                    if not ex_name:
-                        ex_category = s.get("exerciseCategory", "")
-                        ex_name = ex_category if ex_category else "unknown"
-                    weight = s.get("weight")  # grams from Garmin
-                    reps = s.get("repetitionCount") or s.get("reps")
-                    rpe = s.get("rpe")
-
-                    # Convert weight from grams to lbs if present
-                    weight_lbs = None
-                    if weight and isinstance(weight, (int, float)) and weight > 0:
-                        weight_lbs = round(weight / 453.592, 1)
-
-                    workout["strength_sets"].append({
-                        "exercise": ex_name,
-                        "exercise_normalized": normalize_exercise(ex_name),
-                        "weight_lbs": weight_lbs,
-                        "reps": reps,
-                        "rpe": rpe,
-                    })
-                time.sleep(0.3)
-            except Exception:
-                pass  # No exercise set data for this activity
-
-        workouts.append(workout)
-        set_count = len(workout["strength_sets"])
-        if set_count:
-            print(f"    {act_date} {act_name}: {set_count} sets")
-        else:
-            print(f"    {act_date} {act_name} ({type_key})")
-
-    print(f"  Found {len(workouts)} activities.")
-    return workouts
+        return
+    skipped_note = f" ({skipped} already saved, skipped)" if skipped else ""
+    print(f"  Found {found} new activities{skipped_note}.")
 
 
 def append_strength_log(workouts):
-    """Append new strength sets to strength_log.csv, deduplicating."""
-    # Read existing entries for dedup
-    existing = set()
-    if STRENGTH_LOG.exists():
-        with open(STRENGTH_LOG) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                key = (row["date"], row["exercise"], row["weight_lbs"], row["reps"])
-                existing.add(key)
-
-    new_rows = []
+    """Append new strength sets to the strength log, deduplicating.
+
+    De-duplication is a unique-index lookup in strength_log.db keyed on the
+    activity and the set's position among identical sets (see
+    strength_store.py), so a re-pulled activity adds nothing while repeated
+    sets are kept; only the new sets are appended to strength_log.csv.
+    """
+    rows = []
     for w in workouts:
         for s in w["strength_sets"]:
             # Skip bodyweight exercises (no weight data)
             if not s["weight_lbs"]:
                 continue
-            row = {
+            rows.append({
                 "date": w["date"],
                 "exercise": s["exercise_normalized"],
                 "weight_lbs": str(s["weight_lbs"]),
                 "reps": str(s["reps"] or ""),
                 "rpe": str(s["rpe"] or ""),
                 "notes": f"garmin:{w['activity_id']}",
-            }
-            key = (row["date"], row["exercise"], row["weight_lbs"], row["reps"])
-            if key not in existing:
-                new_rows.append(row)
-                existing.add(key)
+            })
+
+    log = StrengthLog(STRENGTH_LOG.with_suffix(".db"), STRENGTH_LOG,
+                      STRENGTH_LOG.with_name("strength_recent.csv"))
+    new_rows = log.append(rows)
+    log.close()
 
     if not new_rows:
         print("\n  No new strength entries to add.")
         return 0
 
-    # Append to CSV
-    write_header = not STRENGTH_LOG.exists()
-    with open(STRENGTH_LOG, "a", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=["date", "exercise", "weight_lbs", "reps", "rpe", "notes"])
-        if write_header:
-            writer.writeheader()
-        writer.writerows(new_rows)
-
     print(f"\n  Added {len(new_rows)} new entries to {STRENGTH_LOG.name}:")
     for r in new_rows:
         rpe_str = f" RPE {r['rpe']}" if r["rpe"] else ""
@@ -481,41 +558,28 @@ def append_strength_log(workouts):
     return len(new_rows)
 
 
-def save_workouts_json(workouts):
-    """Save full workout details to garmin_workouts.json."""
-    # Merge with existing data to avoid losing older pulls
-    existing = []
-    if WORKOUTS_JSON.exists():
-        try:
-            with open(WORKOUTS_JSON) as f:
-                existing = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            pass
-
-    existing_ids = {w["activity_id"] for w in existing if "activity_id" in w}
-    for w in workouts:
-        if w["activity_id"] not in existing_ids:
-            existing.append(w)
+def save_workouts(workouts):
+    """Append new workouts to the month-partitioned store in workouts/."""
+    store = workout_store()
+    added = store.add(workouts)
+    closed = store.compact()
+    closed_note = f", compressed {', '.join(closed)}" if closed else ""
+    print(f"  Saved {len(added)} new workouts to {WORKOUT_DIR.name}/ ({len(store)} total{closed_note})")
 
-    # Sort by date descending
-    existing.sort(key=lambda w: w.get("date", ""), reverse=True)
 
-    with open(WORKOUTS_JSON, "w") as f:
-        json.dump(existing, f, indent=2)
-    print(f"  Saved {len(existing)} workouts to {WORKOUTS_JSON.name}")
+def export_workouts():
+    """Rewrite the old single-file garmin_workouts.json from the workout store."""
+    count = workout_store().export_json(WORKOUTS_JSON)
+    print(f"  Exported {count} workouts to {WORKOUTS_JSON.name}")
 
 
 def pull_daily_burn(client, days=7):
     """Pull daily calorie burn (BMR + active) for recent days."""
-    today = date.today()
     burns = []
 
     print(f"\n  Pulling daily calorie burn ({days} days)...")
-    for i in range(days):
-        d = today - timedelta(days=i)
-        d_str = d.isoformat()
+    for d_str, stats in fetcher(client).days("get_stats", days):
         try:
-            stats = client.get_stats(d_str)
             if stats:
                 entry = {
                     "date": d_str,
@@ -529,7 +593,6 @@ def pull_daily_burn(client, days=7):
                 print(f"    {d_str}: {total:.0f} cal total ({active:.0f} active)")
         except Exception:
             pass
-        time.sleep(0.3)
 
     burns.sort(key=lambda x: x["date"])
 
@@ -545,18 +608,31 @@ def main():
     parser.add_argument("--history", action="store_true",
                         help="Also pull 90-day daily RHR + HRV series")
     parser.add_argument("--history-days", type=int, default=90,
-                        help="Number of days for history pull (default: 90)")
+                        help="Days of history to keep filled in (default: 90)")
     parser.add_argument("--workouts", action="store_true",
                         help="Pull recent workouts and append strength sets to strength_log.csv")
     parser.add_argument("--workout-days", type=int, default=7,
                         help="Number of days to pull workouts (default: 7)")
+    parser.add_argument("--export-workouts-json", action="store_true",
+                        help="Also rewrite garmin_workouts.json from the workout store")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT,
+                        help=f"Garmin requests per second, 0 = unlimited (default: {RATE_LIMIT:g})")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help=f"Concurrent Garmin requests (default: {WORKERS})")
+    parser.add_argument("--settle-days", type=int, default=SETTLE_DAYS,
+                        help=f"Days after which stored data is final (default: {SETTLE_DAYS})")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Re-download everything instead of using garmin_store.db")
     args = parser.parse_args()
 
-    client = get_client()
+    client = make_fetcher(get_client(), rate=args.rate, workers=args.workers,
+                          store=not args.no_store, settle_days=args.settle_days)
 
     print("\nPulling Garmin data...")
 
-    # Pull sleep data in one pass to avoid double-fetching
+    # One Fetcher for the run: its request cache fetches each endpoint/day once,
+    # so sleep (regularity + duration), stats (steps + burn), RHR/HRV (summary +
+    # daily series) and the activity list (Zone 2 + workouts) are shared
     rhr = pull_resting_hr(client)
     steps = pull_steps(client)
     sleep_stdev = pull_sleep_regularity(client)
@@ -593,19 +669,19 @@ def main():
 
     # Workouts
     if args.workouts:
-        workouts = pull_workouts(client, days=args.workout_days)
-        if workouts:
+        # A page at a time, so a long --workout-days backfill keeps only one page in memory
+        for workouts in pull_workouts(client, days=args.workout_days):
             append_strength_log(workouts)
-            save_workouts_json(workouts)
+            save_workouts(workouts)
+        if args.export_workouts_json:
+            export_workouts()
 
-    # Historical daily series
+    # Historical daily series (fills gaps in garmin_daily.json, saving as it goes)
     if args.history:
-        series = pull_daily_series(client, days=args.history_days)
-        series_path = Path(__file__).parent / "garmin_daily.json"
-        with open(series_path, "w") as f:
-            json.dump(series, f, indent=2)
-        print(f"Saved daily series to {series_path}")
+        pull_daily_series(client, days=args.history_days, settle_days=args.settle_days)
+        print(f"Saved daily series to {DAILY_SERIES_JSON}")
 
+    print(f"\n{client.summary()}")
     return garmin_data
 
 
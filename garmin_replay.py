@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Baseline — Garmin Record / Replay
+
+Offline Garmin Connect clients with the interface garmin_import's pull_*
+functions use (get_rhr_day, get_stats, get_sleep_data, get_hrv_data,
+get_max_metrics, get_activities_by_date, get_activity_exercise_sets), so the
+import pipeline can be benchmarked and load-tested without an account:
+
+  ReplayGarmin        serves a payload fixture, optionally with injected
+                      latency and HTTP errors
+  RecordingGarmin     wraps a live client and saves what it returns as a fixture
+  synthetic_account   generates a fixture for a plausible multi-year account
+
+Fixture format (JSON). Per-day endpoints (rhr_day, stats, sleep_data,
+hrv_data) are lists indexed by day offset from the replay date, null = no
+data. Dates are stored relative, not absolute: sleep start as
+dailySleepDTO.sleepStartMinuteLocal (minutes after the previous midnight),
+activities as dayOffset + startTime. Replay rewrites them against `today`,
+so a fixture always looks like a live account. max_metrics is the latest
+get_max_metrics response; exercise_sets maps activity ID → response.
+
+Injected faults are a pure function of (seed, endpoint, args, attempt), so a
+run replays the same delays and errors whatever order the worker threads
+get to them in.
+
+Usage:
+    python3 garmin_replay.py synth --years 3 --output account.json
+    python3 garmin_replay.py record --days 90 --output account.json  # live account; the fixture holds your data
+    python3 garmin_replay.py bench --years 2 --latency 0.05 --error-rate 0.02 --rate 0
+    python3 garmin_replay.py bench --fixture account.json --workers 16
+"""
+
+import copy
+import json
+import math
+import random
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+GARMIN_PAYLOADS = Path(__file__).parent / "benchmarks" / "fixtures" / "garmin_payloads.json"
+
+# client method → fixture key, for the per-day endpoints
+DAY_ENDPOINTS = {
+    "get_rhr_day": "rhr_day",
+    "get_stats": "stats",
+    "get_sleep_data": "sleep_data",
+    "get_hrv_data": "hrv_data",
+}
+ERROR_STATUSES = (429, 500, 503)
+
+
+class ReplayHTTPError(Exception):
+    """An injected HTTP error, shaped like requests.HTTPError for garmin_fetch.http_status."""
+
+    class Response:
+        def __init__(self, status_code):
+            self.status_code = status_code
+            self.headers = {}
+
+    def __init__(self, status_code, endpoint):
+        super().__init__(f"{status_code} injected by ReplayGarmin ({endpoint})")
+        self.response = self.Response(status_code)
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class ReplayGarmin:
+    """Offline stand-in for garminconnect.Garmin serving recorded payloads.
+
+    Day-indexed payloads are looked up by offset from `today`, and their
+    date fields (sleep timestamps, activity start times) are rewritten to
+    the requested day so garmin_import's date math sees a live account.
+    `fixture` is a path or an already-loaded fixture dict. Every call
+    sleeps `latency` seconds (±50% jitter) and fails with an HTTP 429 / 5xx
+    with probability `error_rate`.
+    """
+
+    def __init__(self, fixture=GARMIN_PAYLOADS, today: date = None, latency: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        if isinstance(fixture, dict):
+            self.payloads = fixture
+        else:
+            with open(fixture) as f:
+                self.payloads = json.load(f)
+        self.today = today or date.today()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.calls = 0
+        self.errors = 0
+        self._attempts = {}  # (endpoint, *args) -> calls so far
+        self._lock = threading.Lock()
+
+    def _call(self, endpoint: str, *args):
+        """Count the call and apply injected latency / errors."""
+        key = (endpoint, *args)
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts[key] = self._attempts.get(key, 0) + 1
+        if not (self.latency or self.error_rate):
+            return
+        rng = random.Random(f"{self.seed}:{endpoint}:{args}:{attempt}")
+        if self.latency:
+            time.sleep(self.latency * rng.uniform(0.5, 1.5))
+        if rng.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise ReplayHTTPError(rng.choice(ERROR_STATUSES), endpoint)
+
+    def _day(self, endpoint: str, day: str):
+        self._call(endpoint, day)
+        offset = (self.today - date.fromisoformat(day)).days
+        series = self.payloads[DAY_ENDPOINTS[endpoint]]
+        if not 0 <= offset < len(series) or series[offset] is None:
+            return None
+        return copy.deepcopy(series[offset])
+
+    def get_rhr_day(self, day):
+        return self._day("get_rhr_day", day)
+
+    def get_stats(self, day):
+        return self._day("get_stats", day)
+
+    def get_hrv_data(self, day):
+        return self._day("get_hrv_data", day)
+
+    def get_sleep_data(self, day):
+        data = self._day("get_sleep_data", day)
+        if data:
+            dto = data["dailySleepDTO"]
+            start = datetime.fromisoformat(day) - timedelta(days=1)
+            start += timedelta(minutes=dto.pop("sleepStartMinuteLocal"))
+            dto["sleepStartTimestampLocal"] = int(start.timestamp() * 1000)
+            dto["calendarDate"] = day
+        return data
+
+    def get_max_metrics(self, day):
+        self._call("get_max_metrics", day)
+        return copy.deepcopy(self.payloads["max_metrics"])
+
+    def get_activities_by_date(self, start, end):
+        self._call("get_activities_by_date", start, end)
+        lo, hi = date.fromisoformat(start), date.fromisoformat(end)
+        out = []
+        for recorded in self.payloads["activities"]:
+            day = self.today - timedelta(days=recorded["dayOffset"])
+            if lo <= day <= hi:
+                act = {k: v for k, v in recorded.items() if k not in ("dayOffset", "startTime")}
+                act["startTimeLocal"] = f"{day.isoformat()} {recorded['startTime']}"
+                out.append(act)
+        return out
+
+    def get_activity_exercise_sets(self, activity_id):
+        self._call("get_activity_exercise_sets", activity_id)
+        return copy.deepcopy(self.payloads["exercise_sets"].get(str(activity_id)))
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class RecordingGarmin:
+    """Pass-through wrapper around a live client that keeps every response for fixture()."""
+
+    def __init__(self, client):
+        self._client = client
+        self.responses = {}  # (endpoint, *args) -> response
+
+    def __getattr__(self, endpoint):
+        fn = getattr(self._client, endpoint)
+
+        def record(*args):
+            result = fn(*args)
+            self.responses[(endpoint, *args)] = copy.deepcopy(result)
+            return result
+        return record
+
+    def fixture(self, today: date = None) -> dict:
+        """The recorded responses in fixture format, dated relative to `today`."""
+        today = today or date.today()
+        per_day = {key: {} for key in DAY_ENDPOINTS.values()}
+        fixture = {"note": f"Recorded from Garmin Connect on {today.isoformat()}.",
+                   "max_metrics": None, "activities": [], "exercise_sets": {}}
+        seen = set()
+        for (endpoint, *args), result in sorted(self.responses.items(), key=lambda kv: str(kv[0])):
+            if endpoint in DAY_ENDPOINTS:
+                offset = (today - date.fromisoformat(args[0])).days
+                if endpoint == "get_sleep_data" and result:
+                    result = _relative_sleep(result, args[0])
+                per_day[DAY_ENDPOINTS[endpoint]][offset] = result
+            elif endpoint == "get_max_metrics":
+                fixture["max_metrics"] = result
+            elif endpoint == "get_activities_by_date":
+                for act in result or []:
+                    if act.get("activityId") in seen or not act.get("startTimeLocal"):
+                        continue
+                    seen.add(act.get("activityId"))
+                    day, _, clock = act["startTimeLocal"].partition(" ")
+                    recorded = {k: v for k, v in act.items() if k != "startTimeLocal"}
+                    recorded["dayOffset"] = (today - date.fromisoformat(day)).days
+                    recorded["startTime"] = clock
+                    fixture["activities"].append(recorded)
+            elif endpoint == "get_activity_exercise_sets":
+                fixture["exercise_sets"][str(args[0])] = result
+        days = max((max(d, default=-1) for d in per_day.values()), default=-1) + 1
+        fixture["days"] = days
+        for key, by_offset in per_day.items():
+            fixture[key] = [by_offset.get(i) for i in range(days)]
+        fixture["activities"].sort(key=lambda a: (a["dayOffset"], a["startTime"]))
+        return fixture
+
+
+def _relative_sleep(data: dict, day: str) -> dict:
+    """Replace a sleep payload's absolute dates with sleepStartMinuteLocal."""
+    dto = dict(data.get("dailySleepDTO") or {})
+    ts = dto.pop("sleepStartTimestampLocal", None)
+    dto.pop("calendarDate", None)
+    if ts is None:
+        return None  # nothing ReplayGarmin could date
+    midnight = datetime.fromisoformat(day) - timedelta(days=1)
+    dto["sleepStartMinuteLocal"] = round((datetime.fromtimestamp(ts / 1000) - midnight).total_seconds() / 60)
+    return {**data, "dailySleepDTO": dto}
+
+
+def record(client, days: int = 90) -> dict:
+    """Run the import pulls for `days` against a live client and return what it sent back as a fixture."""
+    import garmin_import
+    from garmin_fetch import Fetcher
+
+    recorder = RecordingGarmin(client)
+    fetch = Fetcher(recorder)
+    garmin_import.pull_daily_series(fetch, days=days, path=None)
+    garmin_import.pull_steps(fetch, days=days)
+    garmin_import.pull_sleep_duration(fetch, days=days)
+    garmin_import.pull_vo2_max(fetch)
+    for _ in garmin_import.pull_workouts(fetch, days=days, known=()):
+        pass
+    print(f"\n{fetch.summary()}")
+    return recorder.fixture()
+
+
+# ---------------------------------------------------------------------------
+# Synthetic accounts
+# ---------------------------------------------------------------------------
+
+# (exercise name, Garmin category, name key, working weight in lbs)
+STRENGTH_EXERCISES = (
+    ("Barbell Back Squat", "SQUAT", "BARBELL_BACK_SQUAT", 225),
+    ("Barbell Bench Press", "BENCH_PRESS", "BARBELL_BENCH_PRESS", 185),
+    ("Barbell Deadlift", "DEADLIFT", "BARBELL_DEADLIFT", 275),
+    ("Dumbbell Row", "ROW", "DUMBBELL_ROW", 70),
+    ("Pull Up", "PULL_UP", "PULL_UP", 0),
+)
+CARDIO = (("running", "Morning Run", 1), ("cycling", "Evening Ride", 2), ("walking", "Walk", 9))
+
+
+def synthetic_account(years: float = 2, seed: int = 0) -> dict:
+    """A fixture for a plausible account `years` long: daily RHR / HRV / steps / sleep,
+    three strength sessions a week with logged sets, and cardio most other days.
+    Values drift with fitness and season and have realistic gaps."""
+    rng = random.Random(seed)
+    days = int(years * 365)
+    fixture = {"note": f"Synthetic Garmin account, {days} days, seed {seed}.", "days": days,
+               "rhr_day": [], "stats": [], "sleep_data": [], "hrv_data": [],
+               "activities": [], "exercise_sets": {}}
+    hrv_week = []
+    for offset in range(days):
+        # Oldest day is least fit; fitness improves toward today, with a yearly cycle
+        fitness = 1 - offset / max(days, 1)
+        season = math.sin(2 * math.pi * offset / 365)
+        worn = rng.random() > 0.04
+
+        rhr = round(60 - 5 * fitness + 1.5 * season + rng.gauss(0, 2))
+        fixture["rhr_day"].append({
+            "userProfileId": 1, "statisticsStartDate": None,
+            "allMetrics": {"metricsMap": {"WELLNESS_RESTING_HEART_RATE": [
+                {"value": float(rhr), "calendarDate": None}]}},
+        } if worn else None)
+
+        hrv = max(15, round(42 + 12 * fitness - 3 * season + rng.gauss(0, 7)))
+        hrv_week = (hrv_week + [hrv])[-7:]
+        fixture["hrv_data"].append({"hrvSummary": {
+            "lastNightAvg": hrv, "weeklyAvg": round(sum(hrv_week) / len(hrv_week)), "status": "BALANCED",
+        }} if worn and rng.random() > 0.05 else None)
+
+        steps = max(500, round(rng.gauss(8500 + 1500 * season, 2600)))
+        active = round(steps * 0.045 + rng.gauss(120, 60))
+        fixture["stats"].append({
+            "totalSteps": steps, "dailyStepGoal": 8000, "bmrKilocalories": 1850,
+            "activeKilocalories": active, "totalKilocalories": 1850 + active,
+            "wellnessKilocalories": 1850 + active, "restingHeartRate": rhr,
+            "moderateIntensityMinutes": rng.randint(0, 60), "vigorousIntensityMinutes": rng.randint(0, 30),
+        } if worn else None)
+
+        asleep = round(rng.gauss(7.2, 0.7) * 3600)
+        fixture["sleep_data"].append({"dailySleepDTO": {
+            "sleepStartMinuteLocal": round(rng.gauss(1350, 35)),  # ~22:30
+            "sleepTimeSeconds": asleep, "deepSleepSeconds": round(asleep * 0.2),
+            "lightSleepSeconds": round(asleep * 0.5), "remSleepSeconds": round(asleep * 0.25),
+            "awakeSleepSeconds": rng.randint(300, 1800),
+        }} if worn and rng.random() > 0.03 else None)
+
+        activity_id = 16_000_000_000 + offset * 10
+        if offset % 7 in (0, 2, 4) and rng.random() < 0.9:
+            fixture["activities"].append(_strength(rng, offset, activity_id, fitness, fixture["exercise_sets"]))
+        elif rng.random() < 0.6:
+            type_key, name, type_id = rng.choice(CARDIO)
+            minutes = rng.uniform(25, 75)
+            fixture["activities"].append({
+                "activityId": activity_id + 1, "activityName": name,
+                "activityType": {"typeKey": type_key, "typeId": type_id},
+                "dayOffset": offset, "startTime": f"{rng.randint(6, 19):02d}:{rng.randint(0, 59):02d}:00",
+                "duration": round(minutes * 60, 1), "calories": round(minutes * rng.uniform(7, 12), 1),
+                "averageHR": round(rng.uniform(115, 150), 1),
+                "hrTimeInZone_1": round(minutes * 6), "hrTimeInZone_2": round(minutes * 36),
+                "hrTimeInZone_3": round(minutes * 15),
+            })
+
+    fixture["max_metrics"] = [{"generic": {"vo2MaxValue": 47.0, "vo2MaxPreciseValue": 46.8, "calendarDate": None},
+                               "cycling": None}]
+    return fixture
+
+
+def _strength(rng, offset, activity_id, fitness, exercise_sets) -> dict:
+    sets = []
+    for name, category, key, weight in rng.sample(STRENGTH_EXERCISES, 3):
+        lbs = round(weight * (0.8 + 0.2 * fitness) / 5) * 5
+        for _ in range(rng.randint(3, 5)):
+            sets.append({"setType": "ACTIVE", "exercises": [{"category": category, "name": key}],
+                         "exerciseName": name, "repetitionCount": rng.randint(5, 10),
+                         "weight": round(lbs * 453.592, 0), "duration": 45.0})
+            sets.append({"setType": "REST", "duration": 120.0})
+    exercise_sets[str(activity_id)] = {"activityId": activity_id, "exerciseSets": sets}
+    minutes = rng.uniform(45, 70)
+    return {
+        "activityId": activity_id, "activityName": "Strength",
+        "activityType": {"typeKey": "strength_training", "typeId": 13},
+        "dayOffset": offset, "startTime": f"{rng.randint(6, 19):02d}:{rng.randint(0, 59):02d}:00",
+        "duration": round(minutes * 60, 1), "calories": round(minutes * 8, 1),
+        "averageHR": round(rng.uniform(110, 135), 1),
+        "hrTimeInZone_1": round(minutes * 20), "hrTimeInZone_2": round(minutes * 25),
+        "hrTimeInZone_3": round(minutes * 10),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Throughput
+# ---------------------------------------------------------------------------
+
+def run_import(client, days: int) -> dict:
+    """The pulls garmin_import.main() makes with --history --workouts over `days`, without writing files."""
+    import garmin_import as gi
+    return {
+        "resting_hr": gi.pull_resting_hr(client),
+        "daily_steps_avg": gi.pull_steps(client),
+        "sleep_regularity_stddev": gi.pull_sleep_regularity(client),
+        "sleep_duration_avg": gi.pull_sleep_duration(client),
+        "vo2_max": gi.pull_vo2_max(client),
+        "hrv_rmssd_avg": gi.pull_hrv(client),
+        "zone2_min_per_week": gi.pull_zone2_minutes(client),
+        "workouts": sum(len(page) for page in gi.pull_workouts(client, days=days, known=())),
+        "series": len(gi.pull_daily_series(client, days=days, path=None)),
+    }
+
+
+def bench(replay: ReplayGarmin, days: int, rate=None, workers: int = 8) -> dict:
+    """Time one full import against `replay`; {seconds, requests, rps, summary}."""
+    import contextlib
+    import io
+    from garmin_fetch import Fetcher
+
+    fetch = Fetcher(replay, rate=rate, workers=workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_import(fetch, days)
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "requests": replay.calls, "rps": replay.calls / seconds,
+            "injected_errors": replay.errors, "summary": fetch.summary()}
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Record, synthesize and replay Garmin Connect data offline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("synth", help="Write a synthetic multi-year account fixture")
+    p.add_argument("--years", type=float, default=2)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", required=True)
+
+    p = sub.add_parser("record", help="Record a fixture from the live account (needs credentials)")
+    p.add_argument("--days", type=int, default=90)
+    p.add_argument("--output", required=True)
+
+    p = sub.add_parser("bench", help="Time a full import against a replayed account")
+    p.add_argument("--fixture", help="Fixture to replay (default: a synthetic account)")
+    p.add_argument("--years", type=float, default=2, help="Synthetic account length (default: 2)")
+    p.add_argument("--days", type=int, help="History to import (default: the whole account)")
+    p.add_argument("--latency", type=float, default=0.0, help="Seconds per request (default: 0)")
+    p.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 429/5xx")
+    p.add_argument("--rate", type=float, default=0, help="Fetcher requests/second, 0 = unlimited (default: 0)")
+    p.add_argument("--workers", type=int, default=8)
+    p.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "synth":
+        fixture = synthetic_account(args.years, args.seed)
+        Path(args.output).write_text(json.dumps(fixture, separators=(",", ":")))
+        print(f"Wrote {fixture['days']} days, {len(fixture['activities'])} activities to {args.output}")
+    elif args.command == "record":
+        from garmin_import import get_client
+        fixture = record(get_client(), args.days)
+        Path(args.output).write_text(json.dumps(fixture, indent=1))
+        print(f"Wrote {fixture['days']} days, {len(fixture['activities'])} activities to {args.output}")
+    else:
+        fixture = args.fixture or synthetic_account(args.years, args.seed)
+        replay = ReplayGarmin(fixture, latency=args.latency, error_rate=args.error_rate, seed=args.seed)
+        days = args.days or replay.payloads["days"]
+        result = bench(replay, days, rate=args.rate or None, workers=args.workers)
+        print(f"Imported {days} days: {result['requests']} requests in {result['seconds']:.2f}s "
+              f"({result['rps']:.0f} req/s), {result['injected_errors']} injected errors")
+        print(result["summary"])
+
+
+if __name__ == "__main__":
+    main()
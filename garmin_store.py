@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Baseline — Garmin Response Store
+
+A local SQLite store of per-day Garmin responses (RHR, HRV, sleep, stats),
+keyed by endpoint + date, so each run only downloads what can still change.
+
+A day's data keeps updating for a while after the fact (late syncs, sleep
+that ends the next morning), so a stored response is final only if it was
+fetched at least `settle_days` after the day itself. Per endpoint, the store
+keeps a watermark: the contiguous date range [synced_from, settled_through]
+whose responses are all final. The range only ever widens; final days past a
+gap left by a failed fetch join it once the gap is fetched. Fetcher.days serves that range from disk and
+fetches only the days outside it — new days, unsettled days, and days older
+than anything synced — so a daily run costs a few requests per endpoint.
+
+Failed requests are never stored; a stored null means Garmin had no data.
+
+Usage:
+    python3 garmin_store.py                    # per-endpoint days stored + watermark
+    python3 garmin_store.py --reset get_stats  # forget an endpoint (next run refetches it)
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+STORE_PATH = Path(__file__).parent / "garmin_store.db"
+SETTLE_DAYS = 3  # a day's data is treated as immutable once fetched this many days later
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    endpoint   TEXT NOT NULL,
+    day        TEXT NOT NULL,  -- ISO date
+    payload    TEXT,           -- JSON; NULL = Garmin returned nothing
+    fetched_on TEXT NOT NULL,  -- ISO date
+    PRIMARY KEY (endpoint, day)
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    endpoint        TEXT PRIMARY KEY,
+    synced_from     TEXT NOT NULL,  -- every day in [synced_from, settled_through]
+    settled_through TEXT NOT NULL   -- is stored and final
+);
+"""
+
+
+class ResponseStore:
+    """Per-day Garmin responses on disk. Safe to share between threads."""
+
+    def __init__(self, path=STORE_PATH, settle_days: int = SETTLE_DAYS):
+        self.path = Path(path)
+        self.settle_days = settle_days
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self._db.close()
+
+    def settled(self, endpoint: str):
+        """(synced_from, settled_through) ISO dates, or None if nothing is settled yet."""
+        with self._lock:
+            row = self._db.execute("SELECT synced_from, settled_through FROM watermarks WHERE endpoint = ?",
+                                   (endpoint,)).fetchone()
+        return tuple(row) if row else None
+
+    def read(self, endpoint: str, days) -> dict:
+        """{ISO date: payload} for the stored days among `days`."""
+        days = list(days)
+        out = {}
+        with self._lock:
+            for i in range(0, len(days), 500):  # stay under SQLite's bound-variable limit
+                chunk = days[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                for day, payload in self._db.execute(
+                        f"SELECT day, payload FROM responses WHERE endpoint = ? AND day IN ({marks})",
+                        (endpoint, *chunk)):
+                    out[day] = json.loads(payload) if payload is not None else None
+        return out
+
+    def write(self, endpoint: str, responses, today: date = None):
+        """Store [(ISO date, payload), ...] fetched today, then advance the endpoint's watermark."""
+        today = today or date.today()
+        responses = list(responses)
+        if not responses:
+            return
+        rows = [(endpoint, day, json.dumps(payload, separators=(",", ":")) if payload is not None else None,
+                 today.isoformat()) for day, payload in responses]
+        final = {day for day, _ in responses if self.is_final(day, today)}
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", rows)
+        self._advance(endpoint, final)
+
+    def is_final(self, day: str, fetched_on: date) -> bool:
+        return (fetched_on - date.fromisoformat(day)).days >= self.settle_days
+
+    def _advance(self, endpoint: str, final: set):
+        """Widen the watermark over final days adjacent to it, never giving up settled days.
+
+        Stored final days on the far side of a gap (a failed fetch) aren't
+        covered yet, but are picked up here once the gap is stored.
+        """
+        if not final:
+            return
+        mark = self.settled(endpoint)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT day, fetched_on FROM responses WHERE endpoint = ? AND (day < ? OR day > ?)",
+                (endpoint, *(mark or ("", ""))))
+            days = {day for day, fetched_on in rows if self.is_final(day, date.fromisoformat(fetched_on))}
+        if mark:
+            lo, hi = (date.fromisoformat(d) for d in mark)
+        else:
+            lo = hi = date.fromisoformat(max(days))  # nothing settled yet: start from the newest final day
+        while (hi + timedelta(days=1)).isoformat() in days:
+            hi += timedelta(days=1)
+        while (lo - timedelta(days=1)).isoformat() in days:
+            lo -= timedelta(days=1)
+        if (lo.isoformat(), hi.isoformat()) != mark:
+            with self._lock, self._db:
+                self._db.execute("INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?)",
+                                 (endpoint, lo.isoformat(), hi.isoformat()))
+
+    def reset(self, endpoint: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE endpoint = ?", (endpoint,))
+            self._db.execute("DELETE FROM watermarks WHERE endpoint = ?", (endpoint,))
+
+    def stats(self) -> list:
+        """[(endpoint, days stored, synced_from, settled_through), ...]"""
+        with self._lock:
+            return self._db.execute("""
+                SELECT r.endpoint, COUNT(*), w.synced_from, w.settled_through
+                FROM responses r LEFT JOIN watermarks w ON w.endpoint = r.endpoint
+                GROUP BY r.endpoint ORDER BY r.endpoint
+            """).fetchall()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect the local Garmin response store")
+    parser.add_argument("--path", default=str(STORE_PATH), help="Store path (default: garmin_store.db)")
+    parser.add_argument("--reset", metavar="ENDPOINT", help="Forget every stored day for an endpoint")
+    args = parser.parse_args()
+
+    store = ResponseStore(args.path)
+    if args.reset:
+        store.reset(args.reset)
+        print(f"Reset {args.reset}")
+    rows = store.stats()
+    if not rows:
+        print(f"{args.path}: empty")
+    for endpoint, count, lo, hi in rows:
+        mark = f"settled {lo} → {hi}" if lo else "nothing settled yet"
+        print(f"  {endpoint:<16} {count:>5} days   {mark}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
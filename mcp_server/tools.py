@@ -24,6 +24,21 @@ from mcp_server.formatters import (
     format_health_context_markdown,
 )
 
+_scorer = None
+
+
+def _score(profile_name: str, user_profile) -> dict:
+    """score_profile via a shared IncrementalScorer: re-evaluates only fields changed since the last call.
+
+    The scorer is cleared whenever NHANES percentiles reload or a metric's
+    backend changes (see score._clear_percentile_caches), so cached results never outlive their data.
+    """
+    global _scorer
+    if _scorer is None:
+        from score import IncrementalScorer
+        _scorer = IncrementalScorer()
+    return _scorer.score(profile_name, user_profile)
+
 
 def register_tools(mcp: FastMCP):
     """Register all Baseline tools on the given MCP server."""
@@ -48,11 +63,9 @@ def register_tools(mcp: FastMCP):
 
         Returns coverage_pct, tier1_pct, tier2_pct, avg_percentile, metrics list, and gaps list.
         """
-        from score import score_profile
-
         data = load_profile(profile_name)
         user_profile = profile_to_user_profile(data)
-        output = score_profile(user_profile)
+        output = _score(profile_name, user_profile)
 
         return {
             "coverage_pct": output["coverage_score"],
@@ -87,55 +100,23 @@ def register_tools(mcp: FastMCP):
         If biomarkers is omitted, returns all non-null biomarkers.
         Each entry: {key, value, unit, percentile, standing, lower_is_better}.
         """
-        from score import (
-            assess, Demographics, age_bucket,
-            BP_SYSTOLIC, BP_DIASTOLIC, LDL_C, HDL_C, APOB,
-            TRIGLYCERIDES, FASTING_GLUCOSE, HBA1C, FASTING_INSULIN,
-            RHR, DAILY_STEPS, WAIST, LPA, HSCRP, ALT, GGT, TSH,
-            VITAMIN_D, FERRITIN, HEMOGLOBIN, VO2_MAX, HRV_RMSSD,
-            SLEEP_REGULARITY,
-        )
-
-        TABLES = {
-            "systolic": (BP_SYSTOLIC, "bp_systolic"),
-            "diastolic": (BP_DIASTOLIC, "bp_diastolic"),
-            "ldl_c": (LDL_C, "ldl_c"),
-            "hdl_c": (HDL_C, "hdl_c"),
-            "apob": (APOB, "apob"),
-            "triglycerides": (TRIGLYCERIDES, "triglycerides"),
-            "fasting_glucose": (FASTING_GLUCOSE, "fasting_glucose"),
-            "hba1c": (HBA1C, "hba1c"),
-            "fasting_insulin": (FASTING_INSULIN, "fasting_insulin"),
-            "resting_hr": (RHR, "rhr"),
-            "daily_steps_avg": (DAILY_STEPS, None),
-            "waist_circumference": (WAIST, "waist"),
-            "lpa": (LPA, "lpa"),
-            "hscrp": (HSCRP, "hscrp"),
-            "alt": (ALT, "alt"),
-            "ggt": (GGT, "ggt"),
-            "tsh": (TSH, "tsh"),
-            "vitamin_d": (VITAMIN_D, "vitamin_d"),
-            "ferritin": (FERRITIN, "ferritin"),
-            "hemoglobin": (HEMOGLOBIN, "hemoglobin"),
-            "vo2_max": (VO2_MAX, None),
-            "hrv_rmssd_avg": (HRV_RMSSD, None),
-            "sleep_regularity_stddev": (SLEEP_REGULARITY, None),
-        }
+        from score import assess, Demographics, BIOMARKERS
 
         data = load_profile(profile_name)
         demo_data = data.get("demographics", {})
         demo = Demographics(**demo_data)
 
-        keys = biomarkers if biomarkers else list(TABLES.keys())
+        keys = biomarkers if biomarkers else list(BIOMARKERS)
         results = []
         for key in keys:
-            if key not in TABLES:
+            marker = BIOMARKERS.get(key)
+            if marker is None:
                 continue
-            table, nhanes_key = TABLES[key]
+            table = marker.table
             value = data.get(key)
             if biomarkers is None and value is None:
                 continue
-            standing, pct = assess(value, table, demo, nhanes_key=nhanes_key)
+            standing, pct = assess(value, table, demo, nhanes_key=marker.nhanes_key)
             results.append({
                 "key": key,
                 "value": value,
@@ -180,11 +161,9 @@ def register_tools(mcp: FastMCP):
         Returns structured markdown with sections for Demographics, Blood Work (with percentiles),
         Garmin Wearable (VO2, Zone 2), Coverage Score, Top Gaps, and Biomarker Trends.
         """
-        from score import score_profile
-
         data = load_profile(profile_name)
         user_profile = profile_to_user_profile(data)
-        score_output = score_profile(user_profile)
+        score_output = _score(profile_name, user_profile)
         garmin_data = load_garmin_data()
 
         # Gather biomarker trends from draws
@@ -228,11 +207,11 @@ def register_tools(mcp: FastMCP):
         """
         if refresh:
             from garmin_import import (
-                get_client, pull_resting_hr, pull_steps,
+                get_client, make_fetcher, pull_resting_hr, pull_steps,
                 pull_sleep_regularity, pull_sleep_duration,
                 pull_vo2_max, pull_hrv, pull_zone2_minutes,
             )
-            client = get_client()
+            client = make_fetcher(get_client())
             garmin_data = {
                 "resting_hr": pull_resting_hr(client),
                 "daily_steps_avg": pull_steps(client),
@@ -262,11 +241,9 @@ def register_tools(mcp: FastMCP):
         Set refresh=true to pull fresh data from Garmin API.
         """
         if refresh:
-            from garmin_import import get_client, pull_daily_series
-            client = get_client()
-            series = pull_daily_series(client, days=days)
-            out_path = PROJECT_ROOT / "garmin_daily.json"
-            out_path.write_text(json.dumps(series, indent=2))
+            from garmin_import import get_client, make_fetcher, pull_daily_series
+            client = make_fetcher(get_client())
+            series = pull_daily_series(client, days=days)  # merges into garmin_daily.json
         else:
             series = load_garmin_daily()
 
@@ -300,3 +277,28 @@ def register_tools(mcp: FastMCP):
             "series": series,
             "summary": summary,
         }
+
+    # ------------------------------------------------------------------
+    # 9. get_standing_targets
+    # ------------------------------------------------------------------
+    @mcp.tool()
+    def get_standing_targets(
+        profile_name: str = "andrew",
+        metrics: list[str] | None = None,
+    ) -> list[dict]:
+        """Values each scored metric must reach for every standing (Optimal/Good/Average/Below Average).
+
+        If metrics (metric names, e.g. "Lipid Panel + ApoB") is omitted, covers every metric with reference data.
+        Each entry: {metric, field, unit, value, standing, percentile, lower_is_better, targets, bands};
+        a target {standing, percentile, value, comparison, source} reads "value <comparison> target".
+        """
+        from score import standing_targets
+
+        data = load_profile(profile_name)
+        user_profile = profile_to_user_profile(data)
+        entries = standing_targets(user_profile, metrics)
+        for entry in entries:
+            for target in entry["targets"]:
+                if target["value"] is not None:
+                    target["value"] = round(target["value"], 2)
+        return entries
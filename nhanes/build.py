@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Baseline — NHANES Percentile Build
+
+Rebuilds nhanes_percentiles.json from NHANES public-use files in nhanes/raw/
+(SAS transport .XPT as downloaded from CDC, or .csv exports with the same
+column names). For every metric × age bucket × sex group, each sex and
+optionally each age bucket × sex × ethnicity stratum it computes
+survey-weighted percentiles, weighted mean and standard deviation.
+
+Quantiles are computed for all groups of a metric at once: one lexsort by
+(group, value), cumulative weights, then a single np.interp over the
+concatenated groups. Metrics are built in parallel worker processes.
+
+Midpoint interpolation: each observation owns a block of its group's total
+weight and sits at the block's midpoint; a percentile interpolates linearly
+between neighbouring midpoints and clamps to the smallest/largest value
+outside them. With equal weights this is the Hazen definition
+(numpy.percentile(method="hazen")).
+
+Metrics not built from microdata (Lp(a): published percentiles) and the
+file's top-level fields are carried over from the existing output file.
+
+Usage:
+    python3 -m nhanes.build                          # all metrics, nhanes/raw → app/nhanes_percentiles.json
+    python3 -m nhanes.build --only ldl_c apob        # rebuild some metrics, keep the rest
+    python3 -m nhanes.build --raw ~/nhanes --output /tmp/p.json --jobs 4
+    python3 -m nhanes.build --ethnicity              # add age × sex × ethnicity strata
+
+Rebuilding the default output also refreshes the memory-mapped reference
+snapshot (see snapshot.py) and the parametric fits (see parametric.py).
+"""
+
+import csv
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from nhanes.percentile_lookup import ETHNICITIES
+
+NHANES_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = os.path.join(NHANES_DIR, "raw")
+OUTPUT_PATH = os.path.join(os.path.dirname(NHANES_DIR), "app", "nhanes_percentiles.json")
+
+PERCENTILE_POINTS = (1, 5, 10, 15, 20, 25, 30, 40, 50, 60, 70, 75, 80, 85, 90, 95, 99)
+AGE_BUCKETS = ("20-29", "30-39", "40-49", "50-59", "60-69", "70+")
+SEXES = ("M", "F")  # RIAGENDR 1, 2
+RIDRETH3 = {1: "hispanic", 2: "hispanic", 3: "white", 4: "black", 6: "asian", 7: "other"}  # → ETHNICITIES
+MIN_GROUP_N = 30    # groups with fewer usable observations are left out
+DECIMALS = 2        # percentile values are rounded to this
+
+
+# ---------------------------------------------------------------------------
+# Metric definitions
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class MetricSource:
+    """Where one metric's values live in NHANES and how to turn them into the reported unit."""
+
+    key: str
+    label: str
+    unit: str
+    lower_is_better: bool
+    file: str                # NHANES file stem, e.g. "P_BPXO" (read from <raw>/<file>.XPT or .csv)
+    columns: tuple           # value column(s); several are averaged per person (repeat BP readings)
+    weight: str              # survey weight column, from the lab file or the demographics file
+    demo: str = "P_DEMO"     # demographics file for the cycle (SEQN, RIDAGEYR, RIAGENDR, WTMEC*)
+    scale: float = 1.0       # multiply values by this (unit conversion)
+
+
+SOURCES = (
+    MetricSource("bp_systolic", "Blood Pressure (Systolic)", "mmHg", True,
+                 "P_BPXO", ("BPXOSY1", "BPXOSY2", "BPXOSY3"), "WTMECPRP"),
+    MetricSource("bp_diastolic", "Blood Pressure (Diastolic)", "mmHg", True,
+                 "P_BPXO", ("BPXODI1", "BPXODI2", "BPXODI3"), "WTMECPRP"),
+    MetricSource("rhr", "Resting Heart Rate", "bpm", True,
+                 "P_BPXO", ("BPXOPLS1", "BPXOPLS2", "BPXOPLS3"), "WTMECPRP"),
+    MetricSource("ldl_c", "LDL Cholesterol", "mg/dL", True, "P_TRIGLY", ("LBDLDL",), "WTSAFPRP"),
+    MetricSource("hdl_c", "HDL Cholesterol", "mg/dL", False, "P_HDL", ("LBDHDD",), "WTMECPRP"),
+    MetricSource("triglycerides", "Triglycerides", "mg/dL", True, "P_TRIGLY", ("LBXTR",), "WTSAFPRP"),
+    MetricSource("fasting_glucose", "Fasting Glucose", "mg/dL", True, "P_GLU", ("LBXGLU",), "WTSAFPRP"),
+    MetricSource("hba1c", "HbA1c", "%", True, "P_GHB", ("LBXGH",), "WTMECPRP"),
+    MetricSource("fasting_insulin", "Fasting Insulin", "µIU/mL", True, "P_INS", ("LBXIN",), "WTSAFPRP"),
+    MetricSource("waist", "Waist Circumference", "inches", True,
+                 "P_BMX", ("BMXWAIST",), "WTMECPRP", scale=1 / 2.54),
+    MetricSource("hscrp", "hs-CRP", "mg/L", True, "P_HSCRP", ("LBXHSCRP",), "WTMECPRP"),
+    MetricSource("alt", "ALT", "U/L", True, "P_BIOPRO", ("LBXSATSI",), "WTMECPRP"),
+    MetricSource("ggt", "GGT", "IU/L", True, "P_BIOPRO", ("LBXSGTSI",), "WTMECPRP"),
+    MetricSource("ferritin", "Ferritin", "ng/mL", False, "P_FERTIN", ("LBXFER",), "WTMECPRP"),
+    MetricSource("hemoglobin", "Hemoglobin", "g/dL", False, "P_CBC", ("LBXHGB",), "WTMECPRP"),
+    # Supplementary cycles — the pre-pandemic files don't carry these analytes
+    MetricSource("vitamin_d", "Vitamin D (25-OH)", "ng/mL", False,
+                 "VID_J", ("LBXVIDMS",), "WTMEC2YR", demo="DEMO_J", scale=1 / 2.496),  # nmol/L → ng/mL
+    MetricSource("apob", "Apolipoprotein B", "mg/dL", True,
+                 "APOB_I", ("LBXAPB",), "WTMEC2YR", demo="DEMO_I"),
+    MetricSource("tsh", "TSH", "mIU/L", True,
+                 "THYROD_G", ("LBXTSH1",), "WTMEC2YR", demo="DEMO_G"),
+)
+SOURCES_BY_KEY = {s.key: s for s in SOURCES}
+
+
+# ---------------------------------------------------------------------------
+# Reading NHANES files
+# ---------------------------------------------------------------------------
+
+_MEMBER_HEADER = b"HEADER RECORD*******MEMBER  HEADER RECORD!!!!!!!"
+_NAMESTR_HEADER = b"HEADER RECORD*******NAMESTR HEADER RECORD!!!!!!!"
+_OBS_HEADER = b"HEADER RECORD*******OBS     HEADER RECORD!!!!!!!"
+
+
+def _ibm_to_float(raw: np.ndarray) -> np.ndarray:
+    """IBM System/360 floats (rows of big-endian bytes, 2-8 wide) → float64, SAS missing → NaN."""
+    n, width = raw.shape
+    padded = np.zeros((n, 8), dtype=np.uint8)
+    padded[:, :width] = raw
+    bits = padded.view(">u8").ravel()
+    mantissa = bits & 0x00FFFFFFFFFFFFFF
+    exponent = ((bits >> 56) & 0x7F).astype(np.int64) - 64
+    sign = np.where(bits >> 63, -1.0, 1.0)
+    values = sign * np.ldexp(mantissa.astype(np.float64), 4 * exponent - 56)
+    # Missing values (., .A-.Z, ._) have a zero mantissa and a non-zero first byte
+    values[(mantissa == 0) & (padded[:, 0] != 0)] = np.nan
+    return values
+
+
+def read_xpt(path: str) -> dict:
+    """Columns of the first dataset in a SAS XPORT (v5) file: {name: float64 array or list of str}."""
+    with open(path, "rb") as f:
+        blob = f.read()
+    member = blob.find(_MEMBER_HEADER)
+    at = blob.find(_NAMESTR_HEADER, member)
+    obs = blob.find(_OBS_HEADER, at)
+    if member < 0 or at < 0 or obs < 0:
+        raise ValueError(f"{path}: not a SAS XPORT v5 file")
+    namestr_len = int(blob[member + 74:member + 78])  # 140, or 136 on VAX/VMS
+    n_vars = int(blob[at + 54:at + 58])
+
+    variables = []  # (name, is_numeric, offset, length)
+    for i in range(n_vars):
+        ns = blob[at + 80 + i * namestr_len:at + 80 + (i + 1) * namestr_len]
+        ntype, length = int.from_bytes(ns[0:2], "big"), int.from_bytes(ns[4:6], "big")
+        name = ns[8:16].decode("ascii").strip()
+        offset = int.from_bytes(ns[84:88], "big")
+        variables.append((name, ntype == 1, offset, length))
+
+    row_len = sum(v[3] for v in variables)
+    data = blob[obs + 80:]
+    n_rows = len(data) // row_len
+    rows = np.frombuffer(data, dtype=np.uint8, count=n_rows * row_len).reshape(n_rows, row_len)
+    # The data area is blank-padded to a multiple of 80 bytes; drop padding "rows"
+    while n_rows and (rows[n_rows - 1] == ord(" ")).all():
+        n_rows -= 1
+    rows = rows[:n_rows]
+
+    columns = {}
+    for name, numeric, offset, length in variables:
+        cells = rows[:, offset:offset + length]
+        if numeric:
+            columns[name] = _ibm_to_float(cells)
+        else:
+            columns[name] = [bytes(c).decode("latin-1").rstrip() for c in cells]
+    return columns
+
+
+def read_csv(path: str) -> dict:
+    """Columns of a CSV export (header row of NHANES variable names); blanks → NaN."""
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        cells = list(reader)
+    columns = {}
+    for j, name in enumerate(header):
+        raw = [row[j] if j < len(row) else "" for row in cells]
+        try:
+            columns[name] = np.array([float(v) if v.strip() not in ("", ".", "NA") else np.nan for v in raw])
+        except ValueError:
+            columns[name] = raw
+    return columns
+
+
+@lru_cache(maxsize=None)
+def read_table(raw_dir: str, stem: str) -> dict:
+    """Read <raw_dir>/<stem>.XPT (or .xpt, .csv). Cached per process — P_DEMO is shared by most metrics."""
+    for ext, reader in ((".XPT", read_xpt), (".xpt", read_xpt), (".csv", read_csv), (".CSV", read_csv)):
+        path = os.path.join(raw_dir, stem + ext)
+        if os.path.exists(path):
+            return reader(path)
+    raise FileNotFoundError(f"{stem}.XPT / {stem}.csv not found in {raw_dir}")
+
+
+# ---------------------------------------------------------------------------
+# Weighted statistics
+# ---------------------------------------------------------------------------
+
+def weighted_quantiles(values: np.ndarray, weights: np.ndarray, groups: np.ndarray,
+                       n_groups: int, points=PERCENTILE_POINTS) -> np.ndarray:
+    """Survey-weighted percentiles for every group at once (midpoint interpolation).
+
+    values, weights: float arrays; groups: int array of group ids in [0, n_groups).
+    Returns a (n_groups, len(points)) array, NaN rows for empty groups.
+    """
+    order = np.lexsort((values, groups))
+    v, w, g = values[order], weights[order], groups[order]
+    counts = np.bincount(g, minlength=n_groups)
+    totals = np.bincount(g, weights=w, minlength=n_groups)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+
+    cum = np.cumsum(w)
+    before = np.concatenate(([0.0], cum))[starts]      # weight preceding each group
+    mid = (cum - before[g] - w / 2) / totals[g]         # block midpoints, in (0, 1) per group
+    # Offsetting by group id keeps positions increasing across the concatenated groups,
+    # so one np.interp serves them all; clamping keeps each target inside its own group.
+    present = np.flatnonzero(counts)
+    q = np.asarray(points, dtype=np.float64) / 100
+    lo, hi = mid[starts[present]], mid[ends[present] - 1]
+    targets = np.clip(q, lo[:, None], hi[:, None]) + present[:, None]
+
+    out = np.full((n_groups, len(q)), np.nan)
+    out[present] = np.interp(targets, g + mid, v)
+    return out
+
+
+def weighted_moments(values: np.ndarray, weights: np.ndarray, groups: np.ndarray, n_groups: int):
+    """Per-group (n, weighted mean, weighted population std)."""
+    n = np.bincount(groups, minlength=n_groups)
+    total = np.bincount(groups, weights=weights, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(groups, weights=weights * values, minlength=n_groups) / total
+        dev = values - mean[groups]
+        var = np.bincount(groups, weights=weights * dev * dev, minlength=n_groups) / total
+    return n, mean, np.sqrt(var)
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def _join(keys: np.ndarray, lookup_keys: np.ndarray, column: np.ndarray) -> np.ndarray:
+    """column (aligned with lookup_keys) re-indexed by keys; NaN where a key has no match."""
+    order = np.argsort(lookup_keys)
+    sorted_keys = lookup_keys[order]
+    idx = np.clip(np.searchsorted(sorted_keys, keys), 0, len(sorted_keys) - 1)
+    found = sorted_keys[idx] == keys
+    return np.where(found, column[order][idx], np.nan)
+
+
+def metric_observations(source: MetricSource, raw_dir: str = RAW_DIR, ethnicity: bool = False):
+    """(values, weights, group ids) for adults with a value and a positive weight.
+
+    Each observation counts once per level of group_keys(ethnicity): its
+    age bucket × sex group (id = bucket index * 2 + sex index), its sex
+    group and, with ethnicity, its bucket × sex × ethnicity stratum — so
+    the returned arrays repeat observations, one copy per level.
+    """
+    lab = read_table(raw_dir, source.file)
+    demo = read_table(raw_dir, source.demo)
+    seqn = lab["SEQN"]
+
+    readings = np.column_stack([lab[c] for c in source.columns])
+    taken = (~np.isnan(readings)).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):  # no reading at all → NaN
+        values = np.nansum(readings, axis=1) / taken * source.scale
+    weights = lab[source.weight] if source.weight in lab else _join(seqn, demo["SEQN"], demo[source.weight])
+    age = _join(seqn, demo["SEQN"], demo["RIDAGEYR"])
+    sex = _join(seqn, demo["SEQN"], demo["RIAGENDR"])
+
+    usable = ~np.isnan(values) & (weights > 0) & (age >= 20) & np.isin(sex, (1, 2))
+    values, weights, age, sex = values[usable], weights[usable], age[usable], sex[usable]
+    bucket = np.minimum((age.astype(np.int64) - 20) // 10, len(AGE_BUCKETS) - 1)
+    sex = sex.astype(np.int64) - 1
+    cell = bucket * 2 + sex
+    ids = [cell, len(AGE_BUCKETS) * 2 + sex]
+    copies = [np.arange(len(values))] * 2
+    if ethnicity:
+        race = _join(seqn, demo["SEQN"], demo["RIDRETH3"])[usable]
+        stratum = np.full(len(race), -1)
+        for code, label in RIDRETH3.items():
+            stratum[race == code] = ETHNICITIES.index(label)
+        has = np.flatnonzero(stratum >= 0)
+        ids.append(((len(AGE_BUCKETS) + 1) * 2 + cell * len(ETHNICITIES) + stratum)[has])
+        copies.append(has)
+    take = np.concatenate(copies)
+    return values[take], weights[take], np.concatenate(ids)
+
+
+def group_keys(ethnicity: bool = False) -> list[str]:
+    """Group key for each group id, in id order: "<bucket>|<sex>", then "<sex>",
+    then (with ethnicity) "<bucket>|<sex>|<ethnicity>"."""
+    keys = [f"{bucket}|{sex}" for bucket in AGE_BUCKETS for sex in SEXES] + list(SEXES)
+    if ethnicity:
+        keys += [f"{bucket}|{sex}|{e}" for bucket in AGE_BUCKETS for sex in SEXES for e in ETHNICITIES]
+    return keys
+
+
+def build_metric(key: str, raw_dir: str = RAW_DIR, ethnicity: bool = False) -> dict:
+    """One metric's entry in the nhanes_percentiles.json schema."""
+    source = SOURCES_BY_KEY[key]
+    values, weights, groups = metric_observations(source, raw_dir, ethnicity)
+    keys = group_keys(ethnicity)
+    quantiles = weighted_quantiles(values, weights, groups, len(keys))
+    n, mean, std = weighted_moments(values, weights, groups, len(keys))
+
+    out = {}
+    for i in sorted(range(len(keys)), key=keys.__getitem__):  # "20-29|F", "20-29|M", ...
+        if n[i] < MIN_GROUP_N:
+            continue
+        out[keys[i]] = {
+            "n": int(n[i]),
+            "mean": float(mean[i]),
+            "std": float(std[i]),
+            "percentiles": {str(p): round(float(v), DECIMALS) for p, v in zip(PERCENTILE_POINTS, quantiles[i])},
+        }
+    return {
+        "label": source.label,
+        "unit": source.unit,
+        "lower_is_better": source.lower_is_better,
+        "weight_used": source.weight,
+        "groups": out,
+    }
+
+
+def _build_one(args):
+    key, raw_dir, ethnicity = args
+    start = time.perf_counter()
+    return key, build_metric(key, raw_dir, ethnicity), time.perf_counter() - start
+
+
+def build(metrics=None, raw_dir: str = RAW_DIR, jobs: int = None, ethnicity: bool = False) -> dict:
+    """{metric key: schema entry} for the given metric keys (default: all), built in parallel.
+
+    ethnicity adds "<bucket>|<sex>|<ethnicity>" strata (RIDRETH3) to every metric.
+    """
+    keys = list(metrics or SOURCES_BY_KEY)
+    unknown = [k for k in keys if k not in SOURCES_BY_KEY]
+    if unknown:
+        raise KeyError(f"Unknown metrics: {', '.join(unknown)}")
+    jobs = min(jobs or os.cpu_count() or 1, len(keys))
+    tasks = [(key, raw_dir, ethnicity) for key in keys]
+
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_build_one, tasks))
+    else:
+        results = [_build_one(task) for task in tasks]
+
+    built = {}
+    for key, entry, seconds in results:
+        n = sum(g["n"] for k, g in entry["groups"].items() if k.count("|") == 1)  # people, once each
+        print(f"  {key:<16} {len(entry['groups']):>2} groups  n={n:<6,} {seconds:.2f}s")
+        dropped = [k for k in group_keys(ethnicity) if k not in entry["groups"]]
+        strata = sum(1 for k in dropped if k.count("|") == 2)
+        if len(dropped) > strata:
+            print(f"  {'':<16} {len(dropped) - strata} group(s) under {MIN_GROUP_N} observations left out")
+        if strata:
+            print(f"  {'':<16} {strata} ethnicity strata under {MIN_GROUP_N} observations left out")
+        built[key] = entry
+    return built
+
+
+def write(built: dict, output: str = OUTPUT_PATH, template: str = OUTPUT_PATH):
+    """Merge built metrics into the existing file's layout (other metrics/fields kept) and write it."""
+    if os.path.exists(template):
+        with open(template) as f:
+            data = json.load(f)
+    else:
+        data = {"source": "", "cycle": "", "percentile_points": [], "note": "", "metrics": {}}
+    data["percentile_points"] = list(PERCENTILE_POINTS)
+    metrics = data.setdefault("metrics", {})
+    for key, entry in built.items():
+        metrics[key] = entry  # replaces in place, so existing metric order is kept
+    with open(output, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Rebuild nhanes_percentiles.json from NHANES XPT/CSV files")
+    parser.add_argument("--raw", default=RAW_DIR, help="Directory with the NHANES files (default: nhanes/raw)")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="Output JSON (default: app/nhanes_percentiles.json)")
+    parser.add_argument("--only", nargs="+", choices=list(SOURCES_BY_KEY), help="Metrics to rebuild (others are kept)")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--ethnicity", action="store_true",
+                        help="Also build age × sex × ethnicity strata (RIDRETH3)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    print(f"\nBuilding NHANES percentiles from {args.raw}...\n")
+    try:
+        built = build(args.only, args.raw, args.jobs, args.ethnicity)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    template = args.output if os.path.exists(args.output) else OUTPUT_PATH
+    write(built, args.output, template)
+    print(f"\nWrote {len(built)} metrics to {args.output} in {time.perf_counter() - start:.1f}s")
+    if os.path.abspath(args.output) == OUTPUT_PATH:
+        from nhanes import snapshot
+        info = snapshot.write()
+        print(f"Refreshed {snapshot.SNAPSHOT_PATH} ({info['entries']} arrays)")
+        from nhanes import parametric
+        parametric.write(parametric.build())
+        print(f"Refit {parametric.FITS_PATH} (fidelity report: python3 -m nhanes.parametric --report)")
+
+
+if __name__ == "__main__":
+    main()
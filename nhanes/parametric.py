@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Baseline — Parametric Percentile Fits
+
+Fits a closed-form distribution to every group curve in
+nhanes_percentiles.json and writes the parameters to
+nhanes/parametric_fits.json. A metric switched to the parametric backend
+(percentile_lookup.set_backend) is scored through the fitted CDF instead of
+by linear interpolation between its 17 percentile points: smooth through
+the tails, where the points are 4-5 percentiles apart and skewed metrics
+(triglycerides, hs-CRP, insulin, Lp(a)) stretch furthest, at the cost of
+any shape the family can't follow.
+
+Families (one per metric; default: the best fit, see choose_family):
+    normal       z = (x - mu) / sigma
+    lognormal    z = (ln x - mu) / sigma
+    lognormal3   z = (ln(x - shift) - mu) / sigma     shifted (three-parameter) log-normal
+    percentile = 100·Φ(z)
+The shifted log-normal is the skewed family: a skew-normal CDF needs Owen's
+T function, which has no closed form, while the shifted log-normal takes
+its skew from `shift` and its CDF stays one log and one Φ. Parameters are
+stored as (shift, mu, sigma); shift is 0 for the two-parameter families.
+
+Fitting: each group's curve values, transformed, are regressed on z at the
+percentile points (Φ⁻¹ by Acklam's rational approximation); lognormal3
+searches `shift` below the smallest value for the lowest error in
+percentile units. On the continuous-age surface the parameters of the two
+neighbouring bucket fits are blended, as the table backend blends curves.
+
+Φ is the Abramowitz & Stegun 7.1.26 erf approximation (|error| < 1.5e-7)
+in both the pure-Python and the NumPy evaluator, so the two agree — NumPy
+has no erf and SciPy isn't a dependency.
+
+Fidelity report (printed on every build): per metric, the family and its
+error against the file's own percentile points, a held-out check — each
+interior point dropped in turn and predicted by table interpolation over
+its neighbours and by a refit without it, split into tails (5th-10th,
+90th-95th) and middle — and how far the two backends' percentiles differ
+across each group's value range. Errors are in percentile points.
+
+Usage:
+    python3 -m nhanes.parametric                        # fit all metrics → nhanes/parametric_fits.json
+    python3 -m nhanes.parametric --family lognormal3    # one family for every metric
+    python3 -m nhanes.parametric --report               # fidelity report only, nothing written
+
+Rebuilding nhanes_percentiles.json with nhanes.build refits automatically;
+fits recorded against a different percentile file are ignored.
+"""
+
+import hashlib
+import json
+import math
+import os
+import sys
+from functools import partial
+
+NHANES_DIR = os.path.dirname(os.path.abspath(__file__))
+FITS_PATH = os.path.join(NHANES_DIR, "parametric_fits.json")
+
+FAMILIES = ("normal", "lognormal", "lognormal3")  # fewest parameters first
+SIMPLER_WITHIN = 0.10  # choose_family keeps a simpler family unless the next cuts RMSE by more than this
+TAIL_POINTS = (5, 10, 90, 95)  # held-out points reported as "tails"
+
+# Abramowitz & Stegun 7.1.26
+_P = 0.3275911
+_A = (0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429)
+_SQRT1_2 = math.sqrt(0.5)
+
+# Acklam's inverse normal CDF
+_IC = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+       -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_ID = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00)
+_IA = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+       1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_IB = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+       6.680131188771972e+01, -1.328068155288572e+01)
+_P_LOW = 0.02425
+
+
+# ---------------------------------------------------------------------------
+# Closed-form CDF and quantile
+# ---------------------------------------------------------------------------
+
+def phi(z: float) -> float:
+    """Standard normal CDF."""
+    x = abs(z) * _SQRT1_2
+    t = 1.0 / (1.0 + 0.3275911 * x)  # _P, _A inlined: this is the single-lookup hot path
+    erf = 1.0 - ((((1.061405429 * t - 1.453152027) * t + 1.421413741) * t - 0.284496736) * t
+                 + 0.254829592) * t * math.exp(-x * x)
+    return 0.5 * (1.0 + erf) if z >= 0 else 0.5 * (1.0 - erf)
+
+
+def phi_array(z):
+    """phi over a NumPy array."""
+    import numpy as np
+    x = np.abs(z) * _SQRT1_2
+    t = 1.0 / (1.0 + _P * x)
+    a1, a2, a3, a4, a5 = _A
+    erf = 1.0 - ((((a5 * t + a4) * t + a3) * t + a2) * t + a1) * t * np.exp(-x * x)
+    return np.where(z >= 0, 0.5 * (1.0 + erf), 0.5 * (1.0 - erf))
+
+
+def ndtri(p: float) -> float:
+    """Inverse standard normal CDF for 0 < p < 1 (relative error < 1.2e-9)."""
+    c, d, a, b = _IC, _ID, _IA, _IB
+    if p < _P_LOW or p > 1.0 - _P_LOW:
+        q = math.sqrt(-2.0 * math.log(p if p < _P_LOW else 1.0 - p))
+        z = ((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]
+        z /= (((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0
+        return z if p < _P_LOW else -z
+    q = p - 0.5
+    r = q * q
+    z = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q
+    return z / (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0)
+
+
+def ndtri_array(p):
+    """ndtri over a NumPy array."""
+    import numpy as np
+    c, d, a, b = _IC, _ID, _IA, _IB
+    p = np.asarray(p, dtype=np.float64)
+    tail = (p < _P_LOW) | (p > 1.0 - _P_LOW)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.sqrt(-2.0 * np.log(np.where(p < _P_LOW, p, 1.0 - p)))
+        zt = ((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]
+        zt /= (((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0
+        zt = np.where(p < _P_LOW, zt, -zt)
+    q = p - 0.5
+    r = q * q
+    zc = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q
+    zc /= ((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0
+    return np.where(tail, zt, zc)
+
+
+def cdf(log: bool, params: tuple, value: float) -> float:
+    """Percentile (0-100, not oriented) of value under fitted params."""
+    shift, mu, sigma = params
+    if log:
+        d = value - shift
+        if d <= 0.0:
+            return 0.0
+        return 100.0 * phi((math.log(d) - mu) / sigma)
+    return 100.0 * phi((value - mu) / sigma)
+
+
+def quantile(log: bool, params: tuple, pct: float) -> float:
+    """Value at percentile pct (0 < pct < 100, not oriented) under fitted params."""
+    shift, mu, sigma = params
+    x = mu + sigma * ndtri(pct / 100.0)
+    return math.exp(x) + shift if log else x
+
+
+def cdf_array(log: bool, params, values):
+    """cdf for arrays: params (n, 3), values (n,)."""
+    import numpy as np
+    shift, mu, sigma = params[:, 0], params[:, 1], params[:, 2]
+    if log:
+        d = values - shift
+        z = (np.log(np.where(d > 0.0, d, 1.0)) - mu) / sigma
+        return np.where(d > 0.0, 100.0 * phi_array(z), 0.0)
+    return 100.0 * phi_array((values - mu) / sigma)
+
+
+def quantile_array(log: bool, params, pcts):
+    """quantile for arrays: params (n, 3), pcts (n,)."""
+    import numpy as np
+    x = params[:, 1] + params[:, 2] * ndtri_array(pcts / 100.0)
+    return np.exp(x) + params[:, 0] if log else x
+
+
+# ---------------------------------------------------------------------------
+# Runtime model — fitted parameters resolved against a CompiledMetric
+# ---------------------------------------------------------------------------
+
+_fits = None     # parsed FITS_PATH, or {} when missing
+_current = {}    # percentile file path -> whether the fits were made from it
+
+
+def source_digest(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def fit_for(metric: str, source: str) -> dict:
+    """The stored fit for `metric`, or None if there is none or it was made from a file other than `source`."""
+    global _fits
+    if _fits is None:
+        try:
+            with open(FITS_PATH) as f:
+                _fits = json.load(f)
+        except (OSError, ValueError):
+            _fits = {}
+    if source not in _current:
+        try:
+            _current[source] = source_digest(source) == _fits.get("source_sha1")
+        except OSError:
+            _current[source] = False
+    return _fits.get("metrics", {}).get(metric) if _current[source] else None
+
+
+class Model:
+    """One metric's fitted parameters, keyed like its CompiledMetric's curve rows."""
+
+    __slots__ = ("family", "log", "cdf", "quantile", "row_params", "age_params", "_arrays")
+
+    def __init__(self, m, fit: dict):
+        from nhanes.percentile_lookup import parse_group
+        self.family = fit["family"]
+        self.log = self.family != "normal"
+        self.cdf = partial(cdf, self.log)            # (params, value) -> percentile
+        self.quantile = partial(quantile, self.log)  # (params, pct) -> value
+        self.row_params = {}  # group curve row -> (shift, mu, sigma)
+        for key, params in fit["groups"].items():
+            row = m.groups.get(parse_group(key))
+            if row is not None:
+                self.row_params[row] = tuple(params)
+        self.age_params = {}  # (integer age, sex, ethnicity) -> params or None, filled on first use
+        self._arrays = None
+
+    def params_at_age(self, m, age: int, sex: str, ethnicity: str = None):
+        """Parameters at an integer age: CompiledMetric.age_row's anchors, with parameters blended
+        where it blends curves."""
+        from nhanes.percentile_lookup import AGE_MIN, AGE_MAX
+        key = (age, sex, ethnicity)
+        if key in self.age_params:
+            return self.age_params[key]
+        a = min(max(age, AGE_MIN), AGE_MAX)
+        if ethnicity is not None and ethnicity not in m.strata:
+            params = self.params_at_age(m, a, sex)
+        else:
+            anchors = m.anchors.get((sex, ethnicity), m.universal)
+            if not isinstance(anchors, list):
+                params = self.row_params.get(anchors)
+            elif a <= anchors[0][0]:
+                params = self.row_params[anchors[0][1]]
+            elif a >= anchors[-1][0]:
+                params = self.row_params[anchors[-1][1]]
+            else:
+                k = next(k for k in range(1, len(anchors)) if a <= anchors[k][0])
+                (c0, r0), (c1, r1) = anchors[k - 1], anchors[k]
+                t = (a - c0) / (c1 - c0)
+                params = tuple((1 - t) * p0 + t * p1 for p0, p1 in zip(self.row_params[r0], self.row_params[r1]))
+        self.age_params[key] = params
+        return params
+
+    def arrays(self, m):
+        """(row params (curve rows, 3), age params (age - AGE_MIN, sex code, ethnicity code, 3)); NaN = none."""
+        if self._arrays is None:
+            import numpy as np
+            from nhanes.percentile_lookup import AGE_MIN, AGE_MAX, SEXES, _ETH_LABELS
+            rows = np.full((max(self.row_params, default=-1) + 1, 3), np.nan)
+            for row, params in self.row_params.items():
+                rows[row] = params
+            ages = np.full((AGE_MAX - AGE_MIN + 1, len(SEXES) + 1, len(_ETH_LABELS), 3), np.nan)
+            for s, sex in enumerate(SEXES + (None,)):
+                for e, ethnicity in enumerate(_ETH_LABELS):
+                    for age in range(AGE_MIN, AGE_MAX + 1):
+                        params = self.params_at_age(m, age, sex, ethnicity)
+                        if params is not None:
+                            ages[age - AGE_MIN, s, e] = params
+            self._arrays = (rows, ages)
+        return self._arrays
+
+
+# ---------------------------------------------------------------------------
+# Fitting
+# ---------------------------------------------------------------------------
+
+def _regress(z, y):
+    """Least-squares (mu, sigma) for y = mu + sigma·z, row-wise over y (..., points)."""
+    zc = z - z.mean()
+    sigma = (y * zc).sum(axis=-1) / (zc * zc).sum()
+    return y.mean(axis=-1) - sigma * z.mean(), sigma
+
+
+def _errors(log: bool, shift, mu, sigma, x, points):
+    """Percentile error of the fit at each curve point, row-wise."""
+    import numpy as np
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = x - shift[..., None] if log else x
+        y = np.log(np.where(d > 0.0, d, np.nan)) if log else d
+        raw = 100.0 * phi_array((y - mu[..., None]) / sigma[..., None])
+    return np.where(np.isnan(raw), 100.0, raw - points)
+
+
+def _rmse(err):
+    import numpy as np
+    return np.sqrt((err * err).mean(axis=-1))
+
+
+def fit_curve(curve, points, family: str):
+    """(shift, mu, sigma) for one curve, or None if the family can't describe it."""
+    import numpy as np
+    x = np.asarray(curve, dtype=np.float64)
+    p = np.asarray(points, dtype=np.float64)
+    z = ndtri_array(p / 100.0)
+    if family == "normal":
+        mu, sigma = _regress(z, x)
+        return (0.0, float(mu), float(sigma)) if sigma > 0 else None
+    if family == "lognormal":
+        if x[0] <= 0:
+            return None
+        mu, sigma = _regress(z, np.log(x))
+        return (0.0, float(mu), float(sigma)) if sigma > 0 else None
+
+    # lognormal3: shift = x_min - span·10^u; u searched on a grid, then refined by golden section
+    span = (x[-1] - x[0]) or abs(x[0]) or 1.0
+
+    def evaluate(u):
+        shift = x[0] - span * np.power(10.0, u)
+        mu, sigma = _regress(z, np.log(x - shift[..., None]))
+        return _rmse(_errors(True, shift, mu, sigma, x, p)), shift, mu, sigma
+
+    grid = np.linspace(-3.0, 2.0, 51)
+    if x[0] > 0:
+        grid = np.append(grid, np.log10(x[0] / span))  # shift = 0: plain log-normal
+    rmse, *_ = evaluate(grid)
+    best = int(np.nanargmin(rmse))
+    lo, hi = grid[max(best - 1, 0)], grid[min(best + 1, 50)]
+    golden = (math.sqrt(5) - 1) / 2
+    for _ in range(40):
+        a, b = hi - golden * (hi - lo), lo + golden * (hi - lo)
+        ra, rb = evaluate(np.array([a, b]))[0]
+        if ra < rb:
+            hi = b
+        else:
+            lo = a
+    candidates = np.array([grid[best], (lo + hi) / 2])
+    rmse, shift, mu, sigma = evaluate(candidates)
+    i = int(np.nanargmin(rmse))
+    if not sigma[i] > 0:
+        return None
+    return (float(shift[i]), float(mu[i]), float(sigma[i]))
+
+
+def fit_errors(curve, points, family: str, params) -> list:
+    """Percentile error at each point for fitted params."""
+    import numpy as np
+    shift, mu, sigma = (np.array([v]) for v in params)
+    return _errors(family != "normal", shift, mu, sigma,
+                   np.asarray(curve, dtype=np.float64)[None, :], np.asarray(points, dtype=np.float64))[0].tolist()
+
+
+def choose_family(group_curves: dict, points) -> str:
+    """The family with the lowest mean RMSE over a metric's groups, keeping a simpler one unless
+    the next cuts the error by more than SIMPLER_WITHIN."""
+    best, best_rmse = None, math.inf
+    for family in FAMILIES:
+        errs = []
+        for curve in group_curves.values():
+            params = fit_curve(curve, points, family)
+            if params is None:
+                break
+            e = fit_errors(curve, points, family, params)
+            errs.append(math.sqrt(sum(v * v for v in e) / len(e)))
+        else:
+            rmse = sum(errs) / len(errs)
+            if rmse < best_rmse * (1 - SIMPLER_WITHIN):
+                best, best_rmse = family, rmse
+    return best
+
+
+def fit_metric(spec: dict, points, family: str = None) -> dict:
+    """{"family", "groups": {group key: [shift, mu, sigma]}} for one metric, or None if unfittable."""
+    curves = {key: [float(g["percentiles"][str(p)]) for p in points] for key, g in spec["groups"].items()}
+    family = family or choose_family(curves, points)
+    if family is None:
+        return None
+    groups = {}
+    for key, curve in curves.items():
+        params = fit_curve(curve, points, family)
+        if params is None:
+            return None
+        groups[key] = list(params)
+    return {"family": family, "groups": groups}
+
+
+# ---------------------------------------------------------------------------
+# Fidelity
+# ---------------------------------------------------------------------------
+
+def fidelity(spec: dict, points, fit: dict) -> dict:
+    """Error summary of a metric's fit against table interpolation (percentile points)."""
+    import numpy as np
+    family = fit["family"]
+    log = family != "normal"
+    p = np.asarray(points, dtype=np.float64)
+    fit_sq, fit_max = [], 0.0
+    held = {"tails": ([], []), "middle": ([], [])}  # (table errors, fitted errors)
+    vs_table = []
+    for key, group in spec["groups"].items():
+        curve = np.array([float(group["percentiles"][str(q)]) for q in points])
+        params = fit["groups"][key]
+        err = np.asarray(fit_errors(curve, points, family, params))
+        fit_sq.append((err * err).mean())
+        fit_max = max(fit_max, float(np.abs(err).max()))
+
+        for k in range(1, len(points) - 1):
+            keep = np.arange(len(points)) != k
+            table_pct = np.interp(curve[k], curve[keep], p[keep])
+            refit = fit_curve(curve[keep], p[keep], family)
+            if refit is None:
+                continue
+            fitted_pct = cdf(log, refit, float(curve[k]))
+            part = held["tails" if points[k] in TAIL_POINTS else "middle"]
+            part[0].append(abs(table_pct - p[k]))
+            part[1].append(abs(fitted_pct - p[k]))
+
+        values = np.linspace(curve[0], curve[-1], 200)
+        table_pct = np.interp(values, curve, p)
+        fitted_pct = cdf_array(log, np.tile(params, (len(values), 1)), values)
+        vs_table.append(np.abs(fitted_pct - table_pct))
+
+    vs_table = np.concatenate(vs_table)
+    out = {
+        "groups": len(spec["groups"]),
+        "fit_rmse": round(float(np.sqrt(np.mean(fit_sq))), 3),
+        "fit_max": round(fit_max, 3),
+        "vs_table_mean": round(float(vs_table.mean()), 3),
+        "vs_table_max": round(float(vs_table.max()), 3),
+    }
+    for part, (table_errs, fitted_errs) in held.items():
+        out[f"heldout_{part}_table"] = round(float(np.mean(table_errs)), 3) if table_errs else None
+        out[f"heldout_{part}_fitted"] = round(float(np.mean(fitted_errs)), 3) if fitted_errs else None
+    return out
+
+
+def print_report(fits: dict):
+    print(f"\n{'metric':<17} {'family':<11} {'groups':>6}  {'fit rmse':>8} {'max':>6}  "
+          f"{'held-out tails':>15}  {'held-out middle':>15}  {'vs table':>14}")
+    print(f"{'':<17} {'':<11} {'':>6}  {'':>8} {'':>6}  {'table / fit':>15}  {'table / fit':>15}  "
+          f"{'mean / max':>14}")
+    for key, fit in fits.items():
+        if fit is None:
+            print(f"{key:<17} (no family fits every group)")
+            continue
+        f = fit["fidelity"]
+        print(f"{key:<17} {fit['family']:<11} {f['groups']:>6}  {f['fit_rmse']:>8.2f} {f['fit_max']:>6.1f}  "
+              f"{f['heldout_tails_table']:>7.2f} / {f['heldout_tails_fitted']:<5.2f}  "
+              f"{f['heldout_middle_table']:>7.2f} / {f['heldout_middle_fitted']:<5.2f}  "
+              f"{f['vs_table_mean']:>6.2f} / {f['vs_table_max']:<5.1f}")
+    print("\nErrors in percentile points. Held-out: each interior point predicted without it "
+          "(table: interpolation over its neighbours; fit: refit without it).")
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def build(source: str = None, family: str = None, only=None) -> dict:
+    """Fit every metric of a percentile file. Returns the fits-file dict."""
+    from nhanes.percentile_lookup import DATA_PATH
+    source = source or DATA_PATH
+    with open(source) as f:
+        data = json.load(f)
+    points = data["percentile_points"]
+    fits = {}
+    for key, spec in data["metrics"].items():
+        if only and key not in only:
+            continue
+        fit = fit_metric(spec, points, family)
+        if fit is not None:
+            fit["fidelity"] = fidelity(spec, points, fit)
+        fits[key] = fit
+    return {"source_sha1": source_digest(source), "percentile_points": points, "metrics": fits}
+
+
+def write(built: dict, path: str = FITS_PATH):
+    """Write fits; metrics not in `built` are kept from an existing file made from the same source."""
+    global _fits
+    metrics = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            existing = json.load(f)
+        if existing.get("source_sha1") == built["source_sha1"]:
+            metrics = existing.get("metrics", {})
+    for key, fit in built["metrics"].items():
+        if fit is None:
+            metrics.pop(key, None)
+        else:
+            metrics[key] = fit
+    with open(path, "w") as f:
+        json.dump(dict(built, metrics=metrics), f, indent=1)
+    _fits = None
+    _current.clear()
+
+
+def main():
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Fit closed-form distributions to the NHANES percentile curves")
+    parser.add_argument("--family", choices=FAMILIES, help="Fit this family for every metric (default: best per metric)")
+    parser.add_argument("--only", nargs="+", help="Metrics to fit (default: all)")
+    parser.add_argument("--output", default=FITS_PATH, help="Fits JSON (default: nhanes/parametric_fits.json)")
+    parser.add_argument("--report", action="store_true", help="Print the fidelity report without writing")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(NHANES_DIR))
+    start = time.perf_counter()
+    built = build(family=args.family, only=args.only)
+    print_report(built["metrics"])
+    if not args.report:
+        write(built, args.output)
+        print(f"\nWrote {sum(v is not None for v in built['metrics'].values())} fits to {args.output} "
+              f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,632 @@
+"""NHANES continuous percentile lookup.
+
+Compiles metrics[*].groups[...].percentiles from nhanes_percentiles.json
+into sorted float arrays.
+A value is placed on its group's percentile curve by binary search + linear
+interpolation (linearInterp in app/nhanes.js: a value tied across several
+points scores the lowest), clamped to 1-99, and inverted for lower-is-better
+metrics so the result always reads "% of peers you're better than".
+
+Groups are strata of increasing width, all optional except that a metric
+needs at least one:
+    "<bucket>|<sex>|<ethnicity>"   exact stratum, e.g. "30-39|F|black"
+    "<bucket>|<sex>"               age + sex
+    "<sex>"                        sex only
+    "universal"                    everyone
+A lookup takes the narrowest group that exists, in that order. The chain is
+resolved when a metric is compiled — every (bucket, sex, ethnicity) cell
+maps straight to a curve row — so strata cost nothing per lookup, and
+calls without an ethnicity (or one the file has no strata for) read the
+age + sex curves exactly as before.
+
+Continuous age: get_percentile_at_age() looks values up on a per-sex
+(age × percentile) surface instead of the decade bucket, so a percentile no
+longer jumps on a birthday. Each bucket's curve is anchored at the bucket's
+centre age (25, 35, ... 75); the curve at any integer age 20-80 blends the
+two nearest anchors linearly, and the value is then interpolated along that
+curve — bilinear over the (age, percentile point) grid. Below 25 and above
+75 the end buckets' curves apply unchanged. An ethnicity's surface anchors
+on its exact strata, using the age + sex curve for buckets it lacks. Curves
+are materialized per (age, sex, ethnicity) on first use and kept, so a
+lookup costs the same as a bucket lookup.
+
+get_value_at_percentile() runs a lookup backwards: the value at which a
+demographic reaches a given percentile, read off the same age-surface curve
+(get_values_at_percentiles() is its vectorized form). Percentile points are
+shared by every curve, so the inverse is one bisect over them.
+
+Backends: every metric is scored by table interpolation unless
+set_backend(metric, "parametric") switches it to the closed-form
+distribution fitted to its curves (see parametric.py). Group chains, the
+age surface and the inverse work the same on both.
+
+Single lookups stay in pure Python (bisect over lists) so importing this
+module never pulls in NumPy; get_percentiles() / get_percentiles_at_age()
+are the vectorized forms used by batch scoring. The file is parsed on the
+first lookup and each metric's curves are compiled the first time that
+metric is asked for, so a one-shot CLI run only pays for the metrics it
+scores. When nhanes/reference.snap is current with the JSON file, metrics
+come from that memory-mapped snapshot instead, age surface precompiled (see
+snapshot.py).
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from bisect import bisect_left, bisect_right
+
+# The web app's percentile file: one copy of the data for app/nhanes.js and this module
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "nhanes_percentiles.json")
+
+AGE_BUCKETS = ("20-29", "30-39", "40-49", "50-59", "60-69", "70+")
+SEXES = ("M", "F")  # integer sex code 2 = anything else (universal group only)
+ETHNICITIES = ("white", "black", "hispanic", "asian", "other")  # integer code i + 1; 0 = unspecified
+
+BUCKET_CENTERS = (25, 35, 45, 55, 65, 75)  # anchor age of each bucket's curve on the age surface
+AGE_MIN, AGE_MAX = 20, 80                 # surface rows; ages outside are clamped (NHANES top-codes at 80)
+
+_BUCKET_CODE = {b: i for i, b in enumerate(AGE_BUCKETS)}
+_SEX_CODE = {s: i for i, s in enumerate(SEXES)}
+_ETH_CODE = {e: i + 1 for i, e in enumerate(ETHNICITIES)}
+_ETH_LABELS = (None,) + ETHNICITIES  # by code
+
+
+def parse_group(group_key: str) -> tuple:
+    """(bucket, sex, ethnicity) for a group key, None for each dimension it spans."""
+    if group_key == "universal":
+        return (None, None, None)
+    parts = group_key.split("|")
+    if len(parts) == 1:
+        return (None, parts[0], None)
+    return (parts[0], parts[1], parts[2] if len(parts) > 2 else None)
+
+
+def group_key(bucket, sex, ethnicity) -> str:
+    """Inverse of parse_group."""
+    if sex is None:
+        return "universal"
+    if bucket is None:
+        return sex
+    return f"{bucket}|{sex}|{ethnicity}" if ethnicity else f"{bucket}|{sex}"
+
+
+class CompiledMetric:
+    """Percentile curves for one metric, one row per demographic group."""
+
+    __slots__ = ("key", "lower_is_better", "unit", "points", "last", "curves", "groups",
+                 "universal", "strata", "lookup", "anchors", "age_rows", "age_table", "model", "_snapshot",
+                 "_arrays")
+
+    def __init__(self, key: str, spec: dict, points: list):
+        self.key = key
+        self.lower_is_better = spec["lower_is_better"]
+        self.unit = spec.get("unit", "")
+        self.points = [float(p) for p in points]
+        self.last = len(self.points) - 1
+        self.curves = []  # list of sorted value lists, aligned with points
+        self.groups = {}  # (bucket, sex, ethnicity) -> row, as given (see parse_group)
+        for group_key, group in spec["groups"].items():
+            curve = [float(group["percentiles"][str(p)]) for p in points]
+            if any(b < a for a, b in zip(curve, curve[1:])):
+                raise ValueError(f"{key} {group_key}: percentile values are not sorted")
+            self.groups[parse_group(group_key)] = self._add_curve(curve)
+        self.age_table = None  # [age - AGE_MIN][sex code][ethnicity code] -> row or -1, when precompiled
+        self.model = None      # parametric.Model when the metric uses the parametric backend
+        self._snapshot = None
+        self._arrays = None
+        self._resolve()
+
+    @classmethod
+    def from_snapshot(cls, key: str, snap) -> CompiledMetric:
+        """A metric served from a reference snapshot (see nhanes/snapshot.py): every age row is
+        already compiled, and arrays() returns views over the mapped file."""
+        meta = snap.meta["metrics"][key]
+        name = f"nhanes/{key}/"
+        m = cls.__new__(cls)
+        m.key = key
+        m.lower_is_better = meta["lower_is_better"]
+        m.unit = meta["unit"]
+        m.points = [float(p) for p in snap.meta["points"]]
+        m.last = len(m.points) - 1
+        m.curves = snap.view(name + "curves").tolist()
+        m.groups = {parse_group(k): row for k, row in meta["groups"].items()}
+        m.age_table = snap.view(name + "ages").tolist()
+        m.model = None
+        m._snapshot = snap
+        m._arrays = None
+        m._resolve()
+        return m
+
+    def _resolve(self):
+        """Resolve the fallback chain: exact stratum → age + sex → sex → universal, per cell."""
+        groups = self.groups
+        self.universal = groups.get((None, None, None))
+        self.strata = tuple(e for e in ETHNICITIES if any(k[2] == e for k in groups))
+        self.lookup = {}   # (bucket, sex, ethnicity or None) -> row, every cell that has one
+        self.anchors = {}  # (sex, ethnicity or None) -> [(centre age, row), ...] ascending
+        for sex in SEXES:
+            broad = groups.get((None, sex, None), self.universal)
+            for ethnicity in _ETH_LABELS:
+                anchors = []
+                for centre, bucket in zip(BUCKET_CENTERS, AGE_BUCKETS):
+                    row = groups.get((bucket, sex, ethnicity)) if ethnicity else None
+                    if row is None:
+                        row = groups.get((bucket, sex, None))
+                    if row is not None:
+                        anchors.append((centre, row))
+                    else:
+                        row = broad
+                    if row is not None:
+                        self.lookup[(bucket, sex, ethnicity)] = row
+                self.anchors[(sex, ethnicity)] = anchors or broad
+        self.age_rows = {}  # (integer age, sex, ethnicity) -> row, filled on first use
+
+    def _add_curve(self, curve: list) -> int:
+        self.curves.append(curve)
+        return len(self.curves) - 1
+
+    def group_row(self, bucket: str, sex: str, ethnicity: str = None) -> int | None:
+        """Row of the narrowest group covering (bucket, sex, ethnicity), or None."""
+        row = self.lookup.get((bucket, sex, ethnicity))
+        if row is None:
+            row = self.lookup.get((bucket, sex, None), self.universal)
+        return row
+
+    def age_row(self, age: int, sex: str, ethnicity: str = None) -> int | None:
+        """Row of the curve for an integer age (clamped to AGE_MIN-AGE_MAX), sex and
+        ethnicity, falling back along the group chain."""
+        key = (age, sex, ethnicity)
+        if key in self.age_rows:
+            return self.age_rows[key]
+        a = min(max(age, AGE_MIN), AGE_MAX)
+        if ethnicity is not None and ethnicity not in self.strata:
+            row = self.age_row(a, sex)  # no strata for it: the age + sex surface
+        elif self.age_table is not None:
+            row = self.age_table[a - AGE_MIN][_SEX_CODE.get(sex, len(SEXES))][_ETH_CODE.get(ethnicity, 0)]
+            if row < 0:
+                row = None
+        else:
+            anchors = self.anchors.get((sex, ethnicity), self.universal)
+            if not isinstance(anchors, list):
+                row = anchors  # no bucket curves: the sex or universal group
+            elif a <= anchors[0][0]:
+                row = anchors[0][1]
+            elif a >= anchors[-1][0]:
+                row = anchors[-1][1]
+            else:
+                k = next(k for k in range(1, len(anchors)) if a <= anchors[k][0])
+                (c0, r0), (c1, r1) = anchors[k - 1], anchors[k]
+                if a == c1:
+                    row = r1
+                else:
+                    # (1 - t)·x0 + t·x1 stays sorted under rounding, unlike x0 + t·(x1 - x0)
+                    t = (a - c0) / (c1 - c0)
+                    row = self._add_curve([(1 - t) * x0 + t * x1
+                                           for x0, x1 in zip(self.curves[r0], self.curves[r1])])
+        self.age_rows[key] = row
+        return row
+
+    def arrays(self):
+        """(curves (rows, points), points,
+        group table (bucket code, sex code, ethnicity code) -> row or -1,
+        age table (age - AGE_MIN, sex code, ethnicity code) -> row or -1)."""
+        if self._arrays is None and self._snapshot is not None:
+            import numpy as np
+            name = f"nhanes/{self.key}/"
+            self._arrays = (
+                self._snapshot.array(name + "curves"),
+                np.array(self.points, dtype=np.float64),
+                self._snapshot.array(name + "groups"),
+                self._snapshot.array(name + "ages"),
+            )
+        elif self._arrays is None:
+            import numpy as np
+            shape = (len(SEXES) + 1, len(_ETH_LABELS))
+            fallback = -1 if self.universal is None else self.universal
+            table = np.full((len(AGE_BUCKETS),) + shape, fallback, dtype=np.intp)
+            ages = np.full((AGE_MAX - AGE_MIN + 1,) + shape, fallback, dtype=np.intp)
+            for s, sex in enumerate(SEXES):
+                for e, ethnicity in enumerate(_ETH_LABELS):
+                    for b, bucket in enumerate(AGE_BUCKETS):
+                        row = self.group_row(bucket, sex, ethnicity)
+                        table[b, s, e] = -1 if row is None else row
+                    for age in range(AGE_MIN, AGE_MAX + 1):
+                        row = self.age_row(age, sex, ethnicity)
+                        ages[age - AGE_MIN, s, e] = -1 if row is None else row
+            self._arrays = (
+                np.array(self.curves, dtype=np.float64),
+                np.array(self.points, dtype=np.float64),
+                table,
+                ages,
+            )
+        return self._arrays
+
+
+_specs = None    # metric key -> raw spec from the percentile file (or snapshot metadata)
+_snapshot = None  # the open reference snapshot, when it's current with the percentile file
+_points = None   # percentile points shared by every curve
+_source = DATA_PATH  # the percentile file the loaded curves come from
+_metrics = {}    # metric key -> CompiledMetric, filled on first lookup of each metric
+_backends = {}   # metric key -> "parametric"; unlisted metrics use "table"
+BACKENDS = ("table", "parametric")
+_load_hooks = []
+
+
+def on_load(hook):
+    """Register hook() to be called after every (re)load — e.g. to drop memoized percentiles."""
+    _load_hooks.append(hook)
+    return hook
+
+
+def load(path=None) -> list[str]:
+    """(Re)load the percentile file. Metrics are recompiled on next use. Returns metric keys.
+
+    With no path, a current reference snapshot (nhanes/reference.snap) is
+    mapped instead of parsing the JSON file.
+    """
+    global _specs, _points, _metrics, _snapshot, _source
+    _snapshot = None
+    _source = path or DATA_PATH
+    if path is None:
+        from nhanes import snapshot
+        snap = snapshot.load()
+        if snap is not None and snap.is_fresh("nhanes"):
+            _snapshot = snap
+            _points = snap.meta["points"]
+            _specs = snap.meta["metrics"]
+    if _snapshot is None:
+        with open(path or DATA_PATH) as f:
+            data = json.load(f)
+        _points = data["percentile_points"]
+        _specs = data["metrics"]
+    _metrics = {}
+    for hook in _load_hooks:
+        hook()
+    return list(_specs)
+
+
+def _metric(key: str) -> CompiledMetric | None:
+    """Compiled curves for one metric (None if the file has no such metric)."""
+    m = _metrics.get(key)
+    if m is None:
+        if _specs is None:
+            load()
+        spec = _specs.get(key)
+        if spec is None:
+            return None
+        if _snapshot is not None:
+            m = CompiledMetric.from_snapshot(key, _snapshot)
+        else:
+            m = CompiledMetric(key, spec, _points)
+        if key in _backends:
+            from nhanes import parametric
+            fit = parametric.fit_for(key, _source)
+            if fit is not None:  # fits made from another percentile file: table backend
+                m.model = parametric.Model(m, fit)
+        _metrics[key] = m
+    return m
+
+
+def set_backend(metric: str, backend: str):
+    """Score `metric` by "table" interpolation (the default) or on its "parametric" fitted distribution.
+
+    Raises ValueError if there is no parametric fit for the loaded percentile
+    file (build one with python3 -m nhanes.parametric).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+    if backend == "parametric":
+        from nhanes import parametric
+        if parametric.fit_for(metric, _source) is None:
+            raise ValueError(f"No parametric fit for {metric} from {_source} — run python3 -m nhanes.parametric")
+        _backends[metric] = backend
+    else:
+        _backends.pop(metric, None)
+    _metrics.pop(metric, None)
+    for hook in _load_hooks:
+        hook()
+
+
+def backend(metric: str) -> str:
+    """The backend `metric` is scored on."""
+    m = _metrics.get(metric)
+    if m is not None:
+        return "parametric" if m.model is not None else "table"
+    return _backends.get(metric, "table")
+
+
+def metrics() -> list[str]:
+    """Metric keys available in the loaded percentile file."""
+    if _specs is None:
+        load()
+    return list(_specs)
+
+
+def get_percentile(metric: str, value: float, age_bucket: str, sex: str,
+                   ethnicity: str = None) -> float | None:
+    """Population percentile (0-100, higher = better) for one value, or None.
+
+    Uses the narrowest group the file has: the (age bucket, sex, ethnicity)
+    stratum, then (age bucket, sex), then sex, then "universal".
+    """
+    m = _metrics.get(metric) or _metric(metric)
+    if m is None or value is None:
+        return None
+    row = m.lookup.get((age_bucket, sex, ethnicity))
+    if row is None:
+        row = m.lookup.get((age_bucket, sex, None), m.universal)
+    if row is None:
+        return None
+    if m.model is not None:
+        return _model_percentile(m, m.model.row_params[row], value)
+    return _percentile(m, row, value)
+
+
+def get_percentile_at_age(metric: str, value: float, age: int, sex: str,
+                          ethnicity: str = None) -> float | None:
+    """get_percentile on the continuous-age surface: same scale, no decade-bucket steps.
+
+    Fractional ages are floored to whole years. Falls back along the same
+    group chain when the metric has no age curves for the stratum or `sex`.
+    """
+    m = _metrics.get(metric) or _metric(metric)
+    if m is None or value is None:
+        return None
+    if m.model is not None:
+        params = m.model.age_params.get((age, sex, ethnicity)) or m.model.params_at_age(m, int(age), sex, ethnicity)
+        return None if params is None else _model_percentile(m, params, value)
+    row = m.age_rows.get((age, sex, ethnicity))
+    if row is None:
+        row = m.age_row(int(age), sex, ethnicity)
+        if row is None:
+            return None
+    return _percentile(m, row, value)
+
+
+def _percentile(m: CompiledMetric, row: int, value: float) -> float:
+    xp, points = m.curves[row], m.points
+    # linearInterp in app/nhanes.js: clamp outside, else interpolate on the first
+    # segment whose top reaches the value, so a tied value scores the bottom of its run
+    if value <= xp[0]:
+        raw = points[0]
+    elif value >= xp[-1]:
+        raw = points[-1]
+    else:
+        k = bisect_left(xp, value)
+        t = (value - xp[k - 1]) / (xp[k] - xp[k - 1])
+        raw = points[k - 1] + t * (points[k] - points[k - 1])
+    # Clamp to 1-99, orient so higher = better, round to 0.1
+    raw = 1.0 if raw < 1.0 else 99.0 if raw > 99.0 else raw
+    if m.lower_is_better:
+        raw = 100.0 - raw
+    return math.floor(raw * 10 + 0.5) / 10  # halves round up, like Math.round in app/nhanes.js
+
+
+def _model_percentile(m: CompiledMetric, params: tuple, value: float) -> float:
+    raw = m.model.cdf(params, value)
+    raw = 1.0 if raw < 1.0 else 99.0 if raw > 99.0 else raw
+    if m.lower_is_better:
+        raw = 100.0 - raw
+    return math.floor(raw * 10 + 0.5) / 10
+
+
+def get_standing(metric: str, value: float, age_bucket: str, sex: str, ethnicity: str = None) -> str | None:
+    """Standing label for a value (same thresholds as score.percentile_to_standing)."""
+    pct = get_percentile(metric, value, age_bucket, sex, ethnicity)
+    if pct is None:
+        return None
+    if pct >= 85:
+        return "Optimal"
+    elif pct >= 65:
+        return "Good"
+    elif pct >= 35:
+        return "Average"
+    elif pct >= 15:
+        return "Below Average"
+    return "Concerning"
+
+
+def get_value_at_percentile(metric: str, pct: float, age: int, sex: str,
+                            ethnicity: str = None) -> float | None:
+    """Inverse of get_percentile_at_age: the value that scores `pct` (higher = better), or None.
+
+    pct is clamped to 1-99 like the forward lookup. Values on the better side
+    of the result (below it for lower-is-better metrics, above it otherwise)
+    score at least pct. Where the curve is flat — labs reported at a fixed
+    precision — the result is the tied value, which the forward lookup (like
+    app/nhanes.js) places at the bottom of the flat run.
+    """
+    m = _metrics.get(metric) or _metric(metric)
+    if m is None or pct is None:
+        return None
+    if m.model is not None:
+        params = m.model.params_at_age(m, int(age), sex, ethnicity)
+        if params is None:
+            return None
+        raw = 1.0 if pct < 1.0 else 99.0 if pct > 99.0 else float(pct)
+        return m.model.quantile(params, 100.0 - raw if m.lower_is_better else raw)
+    row = m.age_rows.get((age, sex, ethnicity))
+    if row is None:
+        row = m.age_row(int(age), sex, ethnicity)
+        if row is None:
+            return None
+    return _value(m, row, pct)
+
+
+def _value(m: CompiledMetric, row: int, pct: float) -> float:
+    raw = 1.0 if pct < 1.0 else 99.0 if pct > 99.0 else float(pct)
+    if m.lower_is_better:
+        raw = 100.0 - raw
+    xp, points = m.curves[row], m.points
+    j = min(bisect_right(points, raw) - 1, m.last - 1)  # the last point closes the last segment
+    return xp[j] + (raw - points[j]) * (xp[j + 1] - xp[j]) / (points[j + 1] - points[j])
+
+
+def _codes(labels, lookup: dict, unknown: int):
+    """Integer codes for an array of labels (ints pass through as codes)."""
+    import numpy as np
+    arr = np.asarray(labels)
+    if arr.dtype.kind in "iu":
+        return arr.astype(np.intp, copy=False)
+    codes = np.full(arr.shape, unknown, dtype=np.intp)
+    for label, code in lookup.items():
+        codes[arr == label] = code
+    return codes
+
+
+def get_percentiles(metric: str, values, buckets, sexes, ethnicities=0):
+    """Vectorized get_percentile.
+
+    values:      array-like of floats (NaN = missing)
+    buckets:     age bucket labels, or integer codes into AGE_BUCKETS
+    sexes:       "M"/"F" labels, or integer codes into SEXES (2 = other)
+    ethnicities: labels, or integer codes (ETHNICITIES index + 1, 0 = unspecified)
+    Scalars broadcast. Returns a float64 array, NaN where there is no group.
+    """
+    import numpy as np
+    values = np.asarray(values, dtype=np.float64)
+    m = _metric(metric)
+    if m is None:
+        return np.full(values.shape, np.nan)
+    table = m.arrays()[2]
+
+    b = _codes(buckets, _BUCKET_CODE, -1)
+    s = _codes(sexes, _SEX_CODE, len(SEXES))
+    e = _codes(ethnicities, _ETH_CODE, 0)
+    values, b, s, e = np.broadcast_arrays(values, b, s, e)
+    rows = np.where(b >= 0, table[b.clip(0), s, e], -1)
+    if m.model is not None:
+        row_params = m.model.arrays(m)[0]
+        return _model_percentiles(m, np.where((rows >= 0)[..., None], row_params[rows.clip(0)], np.nan), values)
+    return _percentiles(m, rows, values)
+
+
+def get_percentiles_at_age(metric: str, values, ages, sexes, ethnicities=0):
+    """Vectorized get_percentile_at_age.
+
+    values:      array-like of floats (NaN = missing)
+    ages:        ages in years (integers, or floats floored to whole years)
+    sexes:       "M"/"F" labels, or integer codes into SEXES (2 = other)
+    ethnicities: labels, or integer codes (ETHNICITIES index + 1, 0 = unspecified)
+    Scalars broadcast. Returns a float64 array, NaN where there is no curve.
+    """
+    import numpy as np
+    values = np.asarray(values, dtype=np.float64)
+    m = _metric(metric)
+    if m is None:
+        return np.full(values.shape, np.nan)
+
+    a = np.asarray(ages)
+    if a.dtype.kind == "f":
+        a = np.floor(a)
+    a = a.clip(AGE_MIN, AGE_MAX).astype(np.intp) - AGE_MIN
+    s = _codes(sexes, _SEX_CODE, len(SEXES))
+    e = _codes(ethnicities, _ETH_CODE, 0)
+    values, a, s, e = np.broadcast_arrays(values, a, s, e)
+    if m.model is not None:
+        return _model_percentiles(m, m.model.arrays(m)[1][a, s, e], values)
+    return _percentiles(m, m.arrays()[3][a, s, e], values)
+
+
+def _percentiles(m: CompiledMetric, rows, values):
+    """Percentile of each value on curve row rows[i] (-1 = no curve → NaN)."""
+    import numpy as np
+    curves, points = m.arrays()[:2]
+    known = (rows >= 0) & ~np.isnan(values)
+
+    out = np.full(values.shape, np.nan)
+    if not known.any():
+        return out
+    v = values[known]
+    n_points = curves.shape[1]
+    flat = curves.ravel()
+    base = rows[known] * n_points
+    # Batched binary search: count of curve points < value (== bisect_left),
+    # one gather per halving instead of materializing every value's curve row
+    lo = np.zeros(len(v), dtype=np.intp)
+    hi = np.full(len(v), n_points, dtype=np.intp)
+    for _ in range(int(n_points).bit_length()):
+        mid = (lo + hi) >> 1
+        right = flat[base + mid.clip(0, n_points - 1)] < v
+        lo = np.where(right & (lo < hi), mid + 1, lo)
+        hi = np.where(right, hi, mid)
+    # Same rule as _percentile: interpolate on segment (k - 1, k), clamp outside
+    k = lo.clip(1, n_points - 1)
+    x0, x1 = flat[base + k - 1], flat[base + k]
+    f0, f1 = points[k - 1], points[k]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        raw = f0 + (v - x0) / (x1 - x0) * (f1 - f0)
+    raw = np.where(v <= flat[base], points[0], np.where(v >= flat[base + n_points - 1], points[-1], raw))
+
+    raw = raw.clip(1.0, 99.0)
+    if m.lower_is_better:
+        raw = 100.0 - raw
+    out[known] = np.floor(raw * 10 + 0.5) / 10
+    return out
+
+
+def _model_percentiles(m: CompiledMetric, params, values):
+    """Percentile of each value under params[i] (NaN rows = no fit → NaN)."""
+    import numpy as np
+    from nhanes.parametric import cdf_array
+    known = ~np.isnan(params[..., 2]) & ~np.isnan(values)
+    out = np.full(values.shape, np.nan)
+    if not known.any():
+        return out
+    raw = cdf_array(m.model.log, params[known], values[known]).clip(1.0, 99.0)
+    if m.lower_is_better:
+        raw = 100.0 - raw
+    out[known] = np.floor(raw * 10 + 0.5) / 10
+    return out
+
+
+def get_values_at_percentiles(metric: str, pcts, ages, sexes, ethnicities=0):
+    """Vectorized get_value_at_percentile.
+
+    pcts:        target percentiles (higher = better; NaN = none)
+    ages:        ages in years (integers, or floats floored to whole years)
+    sexes:       "M"/"F" labels, or integer codes into SEXES (2 = other)
+    ethnicities: labels, or integer codes (ETHNICITIES index + 1, 0 = unspecified)
+    Scalars broadcast, so one profile's thresholds for several percentiles
+    are a single call. Returns a float64 array, NaN where there is no curve.
+    """
+    import numpy as np
+    pcts = np.asarray(pcts, dtype=np.float64)
+    m = _metric(metric)
+    if m is None:
+        return np.full(pcts.shape, np.nan)
+
+    a = np.asarray(ages)
+    if a.dtype.kind == "f":
+        a = np.floor(a)
+    a = a.clip(AGE_MIN, AGE_MAX).astype(np.intp) - AGE_MIN
+    s = _codes(sexes, _SEX_CODE, len(SEXES))
+    e = _codes(ethnicities, _ETH_CODE, 0)
+    pcts, a, s, e = np.broadcast_arrays(pcts, a, s, e)
+    if m.model is not None:
+        from nhanes.parametric import quantile_array
+        params = m.model.arrays(m)[1][a, s, e]
+        out = np.full(pcts.shape, np.nan)
+        known = ~np.isnan(params[..., 2]) & ~np.isnan(pcts)
+        raw = pcts[known].clip(1.0, 99.0)
+        out[known] = quantile_array(m.model.log, params[known], 100.0 - raw if m.lower_is_better else raw)
+        return out
+    curves, points, _, age_table = m.arrays()
+    rows = age_table[a, s, e]
+
+    out = np.full(pcts.shape, np.nan)
+    known = (rows >= 0) & ~np.isnan(pcts)
+    if not known.any():
+        return out
+    raw = pcts[known].clip(1.0, 99.0)
+    if m.lower_is_better:
+        raw = 100.0 - raw
+    xp = curves[rows[known]]
+    jj = (np.searchsorted(points, raw, side="right") - 1).clip(0, len(points) - 2)
+    idx = np.arange(len(raw))
+    x0, x1 = xp[idx, jj], xp[idx, jj + 1]
+    f0, f1 = points[jj], points[jj + 1]
+    out[known] = x0 + (raw - f0) * (x1 - x0) / (f1 - f0)
+    return out
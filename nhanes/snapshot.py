@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Baseline — Reference Table Snapshot
+
+Compiles the NHANES percentile curves (bucket curves plus the materialized
+continuous-age surface rows) and score.py's manual cutoff tables into one
+binary file, nhanes/reference.snap, that scoring processes mmap instead of
+parsing nhanes_percentiles.json and rebuilding the arrays.
+
+Layout (little-endian):
+    header   64 bytes   MAGIC, format VERSION, entry count, index offset
+    arrays   64-byte aligned, C order
+    index    one INDEX_RECORD per array: name, type code, shape, offset, size
+
+Entries:
+    meta                     uint8    JSON: points, sources, per-metric/per-table metadata
+    nhanes/<metric>/curves   float64  (rows, points) percentile curves, age-surface rows included
+    nhanes/<metric>/groups   int64    (age bucket, sex code, ethnicity code) → curve row, -1 = none
+    nhanes/<metric>/ages     int64    (age - AGE_MIN, sex code, ethnicity code) → curve row, -1 = none
+    tables/cutoffs           float64  (table, age bucket, sex code, 4) dense cutoffs, NaN = none
+
+Opening costs a header read and one small JSON parse. Entries come back as
+memoryviews (no NumPy needed: the single-profile path uses these) or as
+read-only NumPy views over the same mapped pages, so every worker process
+shares one physical copy.
+
+The snapshot records the size and mtime of nhanes_percentiles.json and
+score.py it was built from; a part whose source has changed since is
+reported stale and callers fall back to the source.
+
+The cutoff tensor is dense: score.resolve_cutoffs fills each table's
+missing (age bucket, sex) cells from fallbacks, and every build reports
+which cells were filled and from where.
+
+Usage:
+    python3 -m nhanes.snapshot                 # write nhanes/reference.snap
+    python3 -m nhanes.snapshot --fills         # ... and list each borrowed cutoff cell
+    python3 -m nhanes.snapshot --output /tmp/ref.snap
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+NHANES_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(NHANES_DIR)
+SNAPSHOT_PATH = os.path.join(NHANES_DIR, "reference.snap")
+SOURCES = {
+    "nhanes": os.path.join(PROJECT_ROOT, "app", "nhanes_percentiles.json"),
+    "tables": os.path.join(PROJECT_ROOT, "score.py"),
+}
+
+MAGIC = b"BLREFSNP"
+VERSION = 4
+HEADER = struct.Struct("<8sIIQ")  # magic, version, entry count, index offset
+HEADER_SIZE = 64
+ALIGN = 64
+NAME_LEN = 48
+INDEX_RECORD = struct.Struct(f"<{NAME_LEN}s1sB3x4IQQ")  # name, type code, ndim, shape, offset, nbytes
+
+_TYPE_CODES = {"float64": b"d", "int64": b"q", "uint8": b"B"}
+
+
+def _stat(path: str) -> list:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+class Snapshot:
+    """An open, memory-mapped snapshot file."""
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        magic, version, count, index_offset = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a reference snapshot")
+        if version != VERSION:
+            raise ValueError(f"{path}: snapshot format v{version}, expected v{VERSION} — rebuild it")
+        self.index = {}  # name -> (type code, shape, offset, nbytes)
+        for i in range(count):
+            name, code, ndim, *shape, offset, nbytes = INDEX_RECORD.unpack_from(
+                self._map, index_offset + i * INDEX_RECORD.size)
+            self.index[name.rstrip(b"\0").decode()] = (code.decode(), tuple(shape[:ndim]), offset, nbytes)
+        self.meta = json.loads(bytes(self.view("meta")))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+
+    def view(self, name: str) -> memoryview:
+        """Zero-copy memoryview of an entry, cast to its type and shape (.tolist() gives nested lists)."""
+        code, shape, offset, nbytes = self.index[name]
+        return memoryview(self._map)[offset:offset + nbytes].cast(code, shape)
+
+    def array(self, name: str):
+        """Read-only NumPy view of an entry over the mapped pages."""
+        import numpy as np
+        code, shape, offset, nbytes = self.index[name]
+        return np.frombuffer(self._map, dtype=np.dtype(code), count=nbytes // np.dtype(code).itemsize,
+                             offset=offset).reshape(shape)
+
+    def is_fresh(self, part: str) -> bool:
+        """True if the source of `part` ("nhanes" or "tables") is unchanged since the build."""
+        recorded = self.meta["sources"].get(part)
+        try:
+            return recorded is not None and _stat(SOURCES[part]) == recorded
+        except OSError:
+            return False
+
+
+_snapshot = None
+_tried = False
+
+
+def load(path: str = None):
+    """The default snapshot, opened once per process; None if it's missing or unreadable."""
+    global _snapshot, _tried
+    if path is not None:
+        return Snapshot(path)
+    if not _tried:
+        _tried = True
+        try:
+            _snapshot = Snapshot(SNAPSHOT_PATH)
+        except (OSError, ValueError):
+            _snapshot = None
+    return _snapshot
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def _entries():
+    """Yield (name, array) for everything the snapshot stores, plus the meta dict last."""
+    import numpy as np
+    import score
+    from cohort import build_cutoff_tensor
+    from nhanes import percentile_lookup
+
+    meta = {"sources": {part: _stat(path) for part, path in SOURCES.items()}, "metrics": {}}
+    with open(SOURCES["nhanes"]) as f:
+        data = json.load(f)
+    meta["points"] = data["percentile_points"]
+
+    for key, spec in data["metrics"].items():
+        m = percentile_lookup.CompiledMetric(key, spec, data["percentile_points"])
+        curves, points, groups, ages = m.arrays()  # materializes every age-surface row
+        meta["metrics"][key] = {
+            "lower_is_better": m.lower_is_better,
+            "unit": m.unit,
+            "groups": {percentile_lookup.group_key(*k): row for k, row in m.groups.items()},
+        }
+        yield f"nhanes/{key}/curves", curves
+        yield f"nhanes/{key}/groups", groups.astype(np.int64)
+        yield f"nhanes/{key}/ages", ages.astype(np.int64)
+
+    tables = score.cutoff_tables()
+    meta["tables"] = list(tables)  # tensor order
+    yield "tables/cutoffs", build_cutoff_tensor(tables)
+
+    yield "meta", meta
+
+
+def write(path: str = SNAPSHOT_PATH) -> dict:
+    """Compile the snapshot to `path` (atomically replaced). Returns {entries, bytes}."""
+    import numpy as np
+
+    blobs = []  # (name, array)
+    for name, arr in _entries():
+        if name == "meta":
+            arr = np.frombuffer(json.dumps(arr, separators=(",", ":")).encode(), dtype=np.uint8)
+        if len(name.encode()) > NAME_LEN:
+            raise ValueError(f"Entry name too long for the index: {name}")
+        blobs.append((name, np.ascontiguousarray(arr)))
+
+    body = bytearray(HEADER_SIZE)
+    records = []
+    for name, arr in blobs:
+        body += b"\0" * (-len(body) % ALIGN)
+        shape = list(arr.shape) + [0] * (4 - arr.ndim)
+        records.append(INDEX_RECORD.pack(name.encode(), _TYPE_CODES[arr.dtype.name], arr.ndim, *shape,
+                                         len(body), arr.nbytes))
+        body += arr.astype(arr.dtype.newbyteorder("<"), copy=False).tobytes()
+    body += b"\0" * (-len(body) % ALIGN)
+    index_offset = len(body)
+    body += b"".join(records)
+    HEADER.pack_into(body, 0, MAGIC, VERSION, len(records), index_offset)
+
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(body)
+    os.replace(tmp, path)  # readers that already mapped the old file keep their pages
+    return {"entries": len(records), "bytes": len(body)}
+
+
+def print_fill_report(detail: bool = False):
+    """Which manual cutoff cells (age bucket × M/F) came from a fallback rather than the table."""
+    import score
+
+    by_table = {}
+    for name, bucket, sex, source in score.cutoff_fill_report():
+        by_table.setdefault(name, []).append((bucket, sex, source))
+    cells = len(score.AGE_BUCKETS) * 2
+    print(f"\nCutoff cells filled from fallbacks ({cells} per table; unlisted tables are complete):")
+    for name, fills in by_table.items():
+        universal = sum(1 for *_, source in fills if source == "universal")
+        borrowed = [f for f in fills if f[2] not in ("universal", None)]
+        empty = sum(1 for *_, source in fills if source is None)
+        parts = [f"{n} {label}" for n, label in
+                 ((universal, "universal"), (len(borrowed), "borrowed"), (empty, "empty")) if n]
+        print(f"  {name:<18} {', '.join(parts)}")
+        if detail:
+            for bucket, sex, (src_bucket, src_sex) in borrowed:
+                print(f"      {bucket} {sex} ← {src_bucket} {src_sex}")
+
+
+def main():
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Compile reference tables into a memory-mappable snapshot")
+    parser.add_argument("--output", default=SNAPSHOT_PATH, help="Snapshot path (default: nhanes/reference.snap)")
+    parser.add_argument("--fills", action="store_true", help="List every cutoff cell borrowed from another group")
+    args = parser.parse_args()
+
+    sys.path.insert(0, PROJECT_ROOT)
+    start = time.perf_counter()
+    info = write(args.output)
+    print(f"Wrote {info['entries']} arrays ({info['bytes'] / 1024:.0f} KB) to {args.output} "
+          f"in {time.perf_counter() - start:.2f}s")
+    print_fill_report(args.fills)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,8 +21,6 @@ import re
 import sys
 from pathlib import Path
 
-import pdfplumber
-
 
 # ---------------------------------------------------------------------------
 # Biomarker aliases → profile field mapping
@@ -139,6 +137,8 @@ SORTED_ALIASES = sorted(BIOMARKER_MAP.keys(), key=len, reverse=True)
 
 def extract_text(pdf_path: str) -> str:
     """Extract all text from a Quest PDF."""
+    import pdfplumber
+
     text_parts = []
     with pdfplumber.open(pdf_path) as pdf:
         for page in pdf.pages:
@@ -208,7 +208,11 @@ def parse_quest_pdf(pdf_path: str) -> dict:
             "unmatched_lines": [str],
         }
     """
-    raw_text = extract_text(pdf_path)
+    return parse_quest_text(extract_text(pdf_path))
+
+
+def parse_quest_text(raw_text: str) -> dict:
+    """Parse text already extracted from a Quest report. Same result shape as parse_quest_pdf."""
     extracted = {}
     unmatched = []
 
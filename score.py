@@ -15,19 +15,25 @@ Percentile sources:
   - Fallback: Manual cutoff tables for metrics without NHANES data (Lp(a), TSH, Vitamin D)
 """
 
+from __future__ import annotations  # annotations stay strings: no typing import at startup
+
 import json
+import math
+import operator
+import os
 import sys
-from dataclasses import dataclass, field
+import weakref
+from bisect import bisect_left, insort
+from collections import OrderedDict, namedtuple
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from pathlib import Path
-from typing import Optional
+from operator import attrgetter
 
-# Try to load NHANES continuous percentile lookup
-try:
-    from nhanes.percentile_lookup import get_percentile as nhanes_percentile, get_standing as nhanes_standing
-    NHANES_AVAILABLE = True
-except ImportError:
-    NHANES_AVAILABLE = False
+# NHANES continuous percentile lookup (nhanes/percentile_lookup.py). Only the
+# data file's presence is checked here; the module is imported — and its
+# curves parsed — on the first percentile lookup, so CLI startup stays cheap.
+NHANES_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "nhanes_percentiles.json")
+NHANES_AVAILABLE = os.path.exists(NHANES_DATA_PATH)
 
 
 # ---------------------------------------------------------------------------
@@ -49,6 +55,8 @@ class Standing(Enum):
 
 @dataclass
 class Demographics:
+    """Who the profile belongs to — selects the NHANES peer group."""
+
     age: int
     sex: str  # "M" or "F"
     ethnicity: str = "white"  # for NHANES percentile lookup
@@ -81,6 +89,10 @@ def age_bucket(age: int) -> str:
 #
 # For "lower is better": cutoffs = [Optimal ceiling, Good ceiling, Avg ceiling, Below Avg ceiling]
 # For "higher is better": cutoffs = [Concerning ceiling, Below Avg ceiling, Avg ceiling, Good ceiling]
+#
+# Kept as eager literals: from cached bytecode all of them build in ~15µs
+# (of ~35ms for `import score`, most of it dataclasses and json), so a lazy
+# loader would add indirection to every lookup for no measurable startup win.
 # ---------------------------------------------------------------------------
 
 # Blood Pressure (Systolic) — lower is better
@@ -369,20 +381,108 @@ HRV_RMSSD = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Dense cutoffs — the sparse tables above resolved to every (bucket, sex) cell
+# A missing M/F cell takes, in order: the universal row, the nearest age
+# bucket of the same sex (the younger on a tie), then the same or nearest
+# bucket of the other sex. Any other sex gets the universal row only.
+# The tables in this module are resolved once, on first use; any other table
+# passed to assess() is resolved per call and never cached — an id() can be
+# reused by a new dict once the old one is freed.
+# ---------------------------------------------------------------------------
+
+AGE_BUCKETS = ("20-29", "30-39", "40-49", "50-59", "60-69", "70+")
+
+_module_cutoffs = None  # id(table) -> (name, table, cells, sources), this module's tables only
+
+
+def module_cutoffs() -> dict:
+    """{id(table): (name, table, cells, sources)} for every cutoff table in this module.
+
+    Entries keep the table itself: a lookup must also check `entry[1] is table`.
+    """
+    global _module_cutoffs
+    if _module_cutoffs is None:
+        _module_cutoffs = {id(table): (name, table, *_resolve(table)) for name, table in cutoff_tables().items()}
+    return _module_cutoffs
+
+
+def module_table_name(table: dict) -> str | None:
+    """The module-level name of a cutoff table defined here, None for any other table."""
+    entry = (_module_cutoffs or module_cutoffs()).get(id(table))
+    return entry[0] if entry is not None and entry[1] is table else None
+
+
+def resolve_cutoffs(table: dict) -> tuple[dict, dict]:
+    """({(bucket, sex): cutoffs} for every bucket × M/F with any fallback,
+    {(bucket, sex): where a filled cell came from — "universal" or a (bucket, sex) key})."""
+    entry = (_module_cutoffs or module_cutoffs()).get(id(table))
+    if entry is not None and entry[1] is table:
+        return entry[2], entry[3]
+    return _resolve(table)
+
+
+def _resolve(table: dict) -> tuple[dict, dict]:
+    given = table["cutoffs"]
+    universal = given.get("universal")
+    cells, sources = {}, {}
+    for b, bucket in enumerate(AGE_BUCKETS):
+        for sex, other in (("M", "F"), ("F", "M")):
+            if given.get((bucket, sex)):
+                cells[(bucket, sex)] = given[(bucket, sex)]
+                continue
+            if universal:
+                source = "universal"
+            else:
+                # Own sex before the other, then nearest bucket, younger on a tie
+                candidates = [(s != sex, abs(i - b), i, (AGE_BUCKETS[i], s))
+                              for s in (sex, other) for i in range(len(AGE_BUCKETS))
+                              if given.get((AGE_BUCKETS[i], s))]
+                if not candidates:
+                    continue
+                source = min(candidates)[3]
+            cells[(bucket, sex)] = given[source]
+            sources[(bucket, sex)] = source
+    return cells, sources
+
+
+def cutoff_tables() -> dict:
+    """{name: table} for every manual cutoff table in this module."""
+    return {name: value for name, value in globals().items()
+            if isinstance(value, dict) and "cutoffs" in value and "lower_is_better" in value}
+
+
+def cutoff_fill_report() -> list[tuple]:
+    """(table name, bucket, sex, source) for every cell filled from a fallback, plus
+    (table name, bucket, sex, None) for cells still empty."""
+    rows = []
+    for name, table in cutoff_tables().items():
+        cells, sources = resolve_cutoffs(table)
+        for bucket in AGE_BUCKETS:
+            for sex in ("M", "F"):
+                if (bucket, sex) in sources:
+                    rows.append((name, bucket, sex, sources[(bucket, sex)]))
+                elif (bucket, sex) not in cells:
+                    rows.append((name, bucket, sex, None))
+    return rows
+
+
 # ---------------------------------------------------------------------------
 # Metric definitions — Tier 1 Foundation
 # ---------------------------------------------------------------------------
 
 @dataclass
 class MetricResult:
+    """One metric's coverage and standing in a scored profile."""
+
     name: str
     tier: int
     rank: int  # position within tier
     has_data: bool
-    value: Optional[float] = None
+    value: float | None = None
     unit: str = ""
     standing: Standing = Standing.UNKNOWN
-    percentile_approx: Optional[int] = None  # rough percentile vs peers
+    percentile_approx: int | None = None  # rough percentile vs peers
     coverage_weight: float = 1.0
     cost_to_close: str = ""
     note: str = ""
@@ -404,6 +504,11 @@ class MetricResult:
         }
 
 
+def round_half_up(x: float) -> int:
+    """Nearest integer, halves up — Math.round in app/score.js (round() goes to even)."""
+    return math.floor(x + 0.5)
+
+
 def percentile_to_standing(pct: float) -> Standing:
     """Map a continuous percentile to a Standing tier."""
     if pct >= 85:
@@ -443,28 +548,31 @@ NHANES_KEY_MAP = {
 }
 
 
-def assess(value: Optional[float], table: dict, demo: Demographics,
-           nhanes_key: str = None) -> tuple[Standing, Optional[float]]:
+def assess(value: float | None, table: dict, demo: Demographics,
+           nhanes_key: str = None) -> tuple[Standing, float | None]:
     """
     Assess a value against population data. Returns (Standing, percentile).
 
     Uses NHANES continuous percentiles when available, falls back to
-    manual cutoff tables otherwise.
+    manual cutoff tables otherwise. Served from the assess cache when one
+    is enabled (see enable_assess_cache).
     """
     if value is None:
         return Standing.UNKNOWN, None
+    if _assess_cache is not None:
+        return _assess_cache.assess(value, table, demo, nhanes_key)
+    return _assess(value, table, demo, nhanes_key)
+
 
+def _assess(value: float, table: dict, demo: Demographics, nhanes_key: str = None):
     # Try NHANES continuous scoring first
     if NHANES_AVAILABLE and nhanes_key and nhanes_key in NHANES_KEY_MAP:
-        bucket = age_bucket(demo.age)
-        pct = nhanes_percentile(NHANES_KEY_MAP[nhanes_key], value, bucket, demo.sex)
+        pct = nhanes_percentile_at_age(NHANES_KEY_MAP[nhanes_key], value, demo.age, demo.sex, demo.ethnicity)
         if pct is not None:
-            return percentile_to_standing(pct), round(pct)
+            return percentile_to_standing(pct), round_half_up(pct)
 
-    # Fallback: manual cutoff tables (5-bucket approximation)
-    bucket = age_bucket(demo.age)
-    key = (bucket, demo.sex)
-    cutoffs = table["cutoffs"].get(key) or table["cutoffs"].get("universal")
+    # Fallback: manual cutoff tables (5-bucket approximation), gaps pre-resolved
+    cutoffs = resolve_cutoffs(table)[0].get((age_bucket(demo.age), demo.sex)) or table["cutoffs"].get("universal")
     if not cutoffs:
         return Standing.UNKNOWN, None
 
@@ -494,6 +602,129 @@ def assess(value: Optional[float], table: dict, demo: Demographics,
             return Standing.OPTIMAL, 90
 
 
+# ---------------------------------------------------------------------------
+# Assess cache — opt-in LRU memoization of assess()
+# Cohort lab values cluster heavily and are reported at a fixed precision, so
+# the same (metric, bucket, sex, value) recurs constantly across profiles.
+# ---------------------------------------------------------------------------
+
+class AssessCache:
+    """Bounded LRU over assess() results.
+
+    Key: (table name, nhanes_key, age, sex, value) — age in whole years for
+    NHANES metrics (continuous-age curves), the age bucket otherwise. Only
+    the cutoff tables defined in this module are cached; any other table is
+    assessed directly. Cleared automatically when NHANES percentiles reload.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def assess(self, value: float, table: dict, demo: Demographics, nhanes_key: str = None):
+        name = module_table_name(table)
+        if name is None:
+            return _assess(value, table, demo, nhanes_key)
+        if nhanes_key:
+            key = (name, nhanes_key, int(demo.age), demo.sex, demo.ethnicity, value)
+        else:
+            key = (name, None, age_bucket(demo.age), demo.sex, None, value)
+        entries = self._entries
+        result = entries.get(key)
+        if result is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return result
+        self.misses += 1
+        result = entries[key] = _assess(value, table, demo, nhanes_key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        self._entries.clear()
+
+    def info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._entries), "maxsize": self.maxsize}
+
+
+_assess_cache: AssessCache | None = None
+
+
+def enable_assess_cache(maxsize: int = 4096) -> AssessCache:
+    """Route assess() through a fresh LRU cache of the given size. Returns the cache."""
+    global _assess_cache
+    _assess_cache = AssessCache(maxsize)
+    return _assess_cache
+
+
+def disable_assess_cache():
+    global _assess_cache
+    _assess_cache = None
+
+
+def _clear_percentile_caches():
+    if _assess_cache is not None:
+        _assess_cache.clear()
+    for scorer in list(_scorers):
+        scorer.clear()
+
+
+# ---------------------------------------------------------------------------
+# Deferred NHANES import — the wrappers below stand in for the lookup
+# functions until first use, then rebind themselves to the real ones.
+# ---------------------------------------------------------------------------
+
+def _nhanes():
+    global nhanes_percentile, nhanes_percentiles, nhanes_standing
+    global nhanes_percentile_at_age, nhanes_percentiles_at_age
+    global nhanes_value_at_percentile, nhanes_values_at_percentiles
+    from nhanes import percentile_lookup
+    if nhanes_percentile is not percentile_lookup.get_percentile:
+        nhanes_percentile = percentile_lookup.get_percentile
+        nhanes_percentiles = percentile_lookup.get_percentiles
+        nhanes_percentile_at_age = percentile_lookup.get_percentile_at_age
+        nhanes_percentiles_at_age = percentile_lookup.get_percentiles_at_age
+        nhanes_value_at_percentile = percentile_lookup.get_value_at_percentile
+        nhanes_values_at_percentiles = percentile_lookup.get_values_at_percentiles
+        nhanes_standing = percentile_lookup.get_standing
+        percentile_lookup.on_load(_clear_percentile_caches)
+    return percentile_lookup
+
+
+def nhanes_percentile(metric, value, age_bucket, sex, ethnicity=None):
+    return _nhanes().get_percentile(metric, value, age_bucket, sex, ethnicity)
+
+
+def nhanes_percentiles(metric, values, buckets, sexes, ethnicities=0):
+    return _nhanes().get_percentiles(metric, values, buckets, sexes, ethnicities)
+
+
+def nhanes_percentile_at_age(metric, value, age, sex, ethnicity=None):
+    return _nhanes().get_percentile_at_age(metric, value, age, sex, ethnicity)
+
+
+def nhanes_percentiles_at_age(metric, values, ages, sexes, ethnicities=0):
+    return _nhanes().get_percentiles_at_age(metric, values, ages, sexes, ethnicities)
+
+
+def nhanes_standing(metric, value, age_bucket, sex, ethnicity=None):
+    return _nhanes().get_standing(metric, value, age_bucket, sex, ethnicity)
+
+
+def nhanes_value_at_percentile(metric, pct, age, sex, ethnicity=None):
+    return _nhanes().get_value_at_percentile(metric, pct, age, sex, ethnicity)
+
+
+def nhanes_values_at_percentiles(metric, pcts, ages, sexes, ethnicities=0):
+    return _nhanes().get_values_at_percentiles(metric, pcts, ages, sexes, ethnicities)
+
+
 # ---------------------------------------------------------------------------
 # Coverage weights — reflects relative ROI from 03-coverage-roi.md
 # Tier 1 metrics split 60% of total score (Tier 2 gets 25%, Tier 3 gets 15%)
@@ -535,454 +766,390 @@ TIER2_WEIGHTS = {
 
 @dataclass
 class UserProfile:
+    """Everything known about one person; None marks data not collected."""
+
     demographics: Demographics
 
     # Blood pressure
-    systolic: Optional[float] = None
-    diastolic: Optional[float] = None
+    systolic: float | None = None
+    diastolic: float | None = None
 
     # Lipids
-    ldl_c: Optional[float] = None
-    hdl_c: Optional[float] = None
-    total_cholesterol: Optional[float] = None
-    triglycerides: Optional[float] = None
-    apob: Optional[float] = None
+    ldl_c: float | None = None
+    hdl_c: float | None = None
+    total_cholesterol: float | None = None
+    triglycerides: float | None = None
+    apob: float | None = None
 
     # Metabolic
-    fasting_glucose: Optional[float] = None
-    hba1c: Optional[float] = None
-    fasting_insulin: Optional[float] = None
+    fasting_glucose: float | None = None
+    hba1c: float | None = None
+    fasting_insulin: float | None = None
 
     # Family history
-    has_family_history: Optional[bool] = None  # None = not collected
+    has_family_history: bool | None = None  # None = not collected
 
     # Sleep
-    sleep_regularity_stddev: Optional[float] = None  # minutes
-    sleep_duration_avg: Optional[float] = None  # hours
+    sleep_regularity_stddev: float | None = None  # minutes
+    sleep_duration_avg: float | None = None  # hours
 
     # Activity
-    daily_steps_avg: Optional[float] = None
-    resting_hr: Optional[float] = None
+    daily_steps_avg: float | None = None
+    resting_hr: float | None = None
 
     # Body
-    waist_circumference: Optional[float] = None  # inches
+    waist_circumference: float | None = None  # inches
 
     # Medications
-    has_medication_list: Optional[bool] = None
+    has_medication_list: bool | None = None
 
     # Lp(a)
-    lpa: Optional[float] = None  # nmol/L
+    lpa: float | None = None  # nmol/L
 
     # --- Tier 2 ---
     # Inflammation
-    hscrp: Optional[float] = None  # mg/L
+    hscrp: float | None = None  # mg/L
 
     # Liver enzymes
-    alt: Optional[float] = None  # U/L
-    ast: Optional[float] = None  # U/L
-    ggt: Optional[float] = None  # U/L
+    alt: float | None = None  # U/L
+    ast: float | None = None  # U/L
+    ggt: float | None = None  # U/L
 
     # Thyroid
-    tsh: Optional[float] = None  # mIU/L
+    tsh: float | None = None  # mIU/L
 
     # Vitamin D + Iron
-    vitamin_d: Optional[float] = None  # ng/mL (25-OH)
-    ferritin: Optional[float] = None  # ng/mL
+    vitamin_d: float | None = None  # ng/mL (25-OH)
+    ferritin: float | None = None  # ng/mL
 
     # CBC
-    hemoglobin: Optional[float] = None  # g/dL
-    wbc: Optional[float] = None  # K/uL
-    platelets: Optional[float] = None  # K/uL
+    hemoglobin: float | None = None  # g/dL
+    wbc: float | None = None  # K/uL
+    platelets: float | None = None  # K/uL
 
     # Cardiorespiratory
-    vo2_max: Optional[float] = None  # mL/kg/min
-    hrv_rmssd_avg: Optional[float] = None  # ms
+    vo2_max: float | None = None  # mL/kg/min
+    hrv_rmssd_avg: float | None = None  # ms
 
     # Body
-    weight_lbs: Optional[float] = None
+    weight_lbs: float | None = None
 
     # Mental health
-    phq9_score: Optional[float] = None  # 0-27
+    phq9_score: float | None = None  # 0-27
 
     # Zone 2
-    zone2_min_per_week: Optional[float] = None
+    zone2_min_per_week: float | None = None
 
     # Supplements
-    has_supplement_list: Optional[bool] = None
+    has_supplement_list: bool | None = None
 
 
 # ---------------------------------------------------------------------------
-# Scoring engine
+# Biomarker registry — profile field → reference table + NHANES key
+# Everything assess() needs to score a single profile value.
 # ---------------------------------------------------------------------------
 
-def score_profile(profile: UserProfile) -> dict:
-    """Score a user profile and return coverage + assessment results."""
-    demo = profile.demographics
-    results = []
+@dataclass(frozen=True)
+class Biomarker:
+    """A profile field with its reference table and optional NHANES key."""
+
+    field: str
+    table: dict
+    nhanes_key: str | None = None  # None = manual cutoff table only
+
+
+BIOMARKERS = {b.field: b for b in (
+    Biomarker("systolic", BP_SYSTOLIC, "bp_systolic"),
+    Biomarker("diastolic", BP_DIASTOLIC, "bp_diastolic"),
+    Biomarker("ldl_c", LDL_C, "ldl_c"),
+    Biomarker("hdl_c", HDL_C, "hdl_c"),
+    Biomarker("apob", APOB, "apob"),
+    Biomarker("triglycerides", TRIGLYCERIDES, "triglycerides"),
+    Biomarker("fasting_glucose", FASTING_GLUCOSE, "fasting_glucose"),
+    Biomarker("hba1c", HBA1C, "hba1c"),
+    Biomarker("fasting_insulin", FASTING_INSULIN, "fasting_insulin"),
+    Biomarker("resting_hr", RHR, "rhr"),
+    Biomarker("daily_steps_avg", DAILY_STEPS),
+    Biomarker("waist_circumference", WAIST, "waist"),
+    Biomarker("lpa", LPA, "lpa"),
+    Biomarker("hscrp", HSCRP, "hscrp"),
+    Biomarker("alt", ALT, "alt"),
+    Biomarker("ggt", GGT, "ggt"),
+    Biomarker("tsh", TSH, "tsh"),
+    Biomarker("vitamin_d", VITAMIN_D, "vitamin_d"),
+    Biomarker("ferritin", FERRITIN, "ferritin"),
+    Biomarker("hemoglobin", HEMOGLOBIN, "hemoglobin"),
+    Biomarker("vo2_max", VO2_MAX),                       # No NHANES data, uses ACSM
+    Biomarker("hrv_rmssd_avg", HRV_RMSSD),               # No NHANES data
+    Biomarker("sleep_regularity_stddev", SLEEP_REGULARITY),  # No NHANES data
+)}
+
+
+# ---------------------------------------------------------------------------
+# Metric registry — one entry per MetricResult, in report order.
+#   coverage:  profile fields whose presence counts toward has_data
+#   sources:   (field, unit label) fallback chain; the first present value is scored
+#   unit:      unit shown when no source value is present
+#   bands:     (op, threshold, standing, pct) checked before the reference table
+#   note_when: "missing" (no data at all) or "fallback" (data, but not the preferred marker)
+# No sources = coverage-only metric: Good if collected.
+# ---------------------------------------------------------------------------
 
-    # --- Blood Pressure ---
-    bp_has_data = profile.systolic is not None
-    bp_standing, bp_pct = assess(profile.systolic, BP_SYSTOLIC, demo, nhanes_key="bp_systolic")
-    results.append(MetricResult(
-        name="Blood Pressure",
-        tier=1, rank=1,
-        has_data=bp_has_data,
-        value=profile.systolic,
-        unit="mmHg" + (f"/{int(profile.diastolic)}" if profile.diastolic else ""),
-        standing=bp_standing,
-        percentile_approx=bp_pct,
-        coverage_weight=TIER1_WEIGHTS["blood_pressure"],
-        cost_to_close="$40 one-time (Omron cuff)",
-        note="Each 20 mmHg >115 SBP doubles CVD mortality" if not bp_has_data else "",
-    ))
-
-    # --- Lipid Panel + ApoB ---
-    lipid_values = [profile.ldl_c, profile.hdl_c, profile.triglycerides]
-    lipid_has_data = any(v is not None for v in lipid_values)
-    apob_has_data = profile.apob is not None
+@dataclass(frozen=True)
+class Metric:
+    """One scored metric: tier, weight, data sources and standing bands."""
+
+    name: str
+    tier: int
+    rank: int
+    weight: str  # key into TIER1_WEIGHTS / TIER2_WEIGHTS
+    coverage: tuple
+    sources: tuple = ()
+    unit: str = ""
+    unit_detail: str | None = None  # field appended as "/<int>" (diastolic on BP)
+    bands: tuple = ()
+    cost_to_close: str = ""
+    note: str = ""
+    note_when: str = "missing"
+
+
+METRICS = (
+    Metric("Blood Pressure", tier=1, rank=1, weight="blood_pressure",
+           coverage=("systolic",), sources=(("systolic", "mmHg"),), unit="mmHg", unit_detail="diastolic",
+           cost_to_close="$40 one-time (Omron cuff)",
+           note="Each 20 mmHg >115 SBP doubles CVD mortality"),
     # Score on ApoB if available, else LDL-C
-    if apob_has_data:
-        lip_standing, lip_pct = assess(profile.apob, APOB, demo, nhanes_key="apob")
-        lip_val, lip_unit = profile.apob, "mg/dL (ApoB)"
-    elif profile.ldl_c is not None:
-        lip_standing, lip_pct = assess(profile.ldl_c, LDL_C, demo, nhanes_key="ldl_c")
-        lip_val, lip_unit = profile.ldl_c, "mg/dL (LDL-C)"
-    else:
-        lip_standing, lip_pct = Standing.UNKNOWN, None
-        lip_val, lip_unit = None, ""
-
-    results.append(MetricResult(
-        name="Lipid Panel + ApoB",
-        tier=1, rank=2,
-        has_data=lipid_has_data or apob_has_data,
-        value=lip_val,
-        unit=lip_unit,
-        standing=lip_standing,
-        percentile_approx=lip_pct,
-        coverage_weight=TIER1_WEIGHTS["lipid_apob"],
-        cost_to_close="$30-50/yr (Quest lipid + ApoB add-on)",
-        note="ApoB > LDL-C for risk prediction" if not apob_has_data and lipid_has_data else "",
-    ))
-
-    # --- Metabolic Panel ---
-    met_values = [profile.fasting_glucose, profile.hba1c, profile.fasting_insulin]
-    met_has_data = any(v is not None for v in met_values)
+    Metric("Lipid Panel + ApoB", tier=1, rank=2, weight="lipid_apob",
+           coverage=("ldl_c", "hdl_c", "triglycerides", "apob"),
+           sources=(("apob", "mg/dL (ApoB)"), ("ldl_c", "mg/dL (LDL-C)")),
+           cost_to_close="$30-50/yr (Quest lipid + ApoB add-on)",
+           note="ApoB > LDL-C for risk prediction", note_when="fallback"),
     # Score on fasting insulin if available (catches IR earliest), else HbA1c, else glucose
-    if profile.fasting_insulin is not None:
-        met_standing, met_pct = assess(profile.fasting_insulin, FASTING_INSULIN, demo, nhanes_key="fasting_insulin")
-        met_val, met_unit = profile.fasting_insulin, "µIU/mL (fasting insulin)"
-    elif profile.hba1c is not None:
-        met_standing, met_pct = assess(profile.hba1c, HBA1C, demo, nhanes_key="hba1c")
-        met_val, met_unit = profile.hba1c, "% (HbA1c)"
-    elif profile.fasting_glucose is not None:
-        met_standing, met_pct = assess(profile.fasting_glucose, FASTING_GLUCOSE, demo, nhanes_key="fasting_glucose")
-        met_val, met_unit = profile.fasting_glucose, "mg/dL (glucose)"
-    else:
-        met_standing, met_pct = Standing.UNKNOWN, None
-        met_val, met_unit = None, ""
-
-    results.append(MetricResult(
-        name="Metabolic Panel",
-        tier=1, rank=3,
-        has_data=met_has_data,
-        value=met_val,
-        unit=met_unit,
-        standing=met_standing,
-        percentile_approx=met_pct,
-        coverage_weight=TIER1_WEIGHTS["metabolic"],
-        cost_to_close="$40-60/yr (glucose + HbA1c + insulin)",
-        note="Fasting insulin catches IR 10-15 yrs before diagnosis" if profile.fasting_insulin is None and met_has_data else "",
-    ))
-
-    # --- Family History ---
-    fh_has_data = profile.has_family_history is not None
-    results.append(MetricResult(
-        name="Family History",
-        tier=1, rank=4,
-        has_data=fh_has_data,
-        standing=Standing.GOOD if fh_has_data else Standing.UNKNOWN,
-        coverage_weight=TIER1_WEIGHTS["family_history"],
-        cost_to_close="Free — 10 min conversation",
-        note="One-time. Parental CVD <60 doubles risk." if not fh_has_data else "",
-    ))
-
-    # --- Sleep ---
-    sleep_has_data = profile.sleep_regularity_stddev is not None or profile.sleep_duration_avg is not None
-    sleep_standing, sleep_pct = assess(profile.sleep_regularity_stddev, SLEEP_REGULARITY, demo)  # No NHANES data
-    results.append(MetricResult(
-        name="Sleep Regularity",
-        tier=1, rank=5,
-        has_data=sleep_has_data,
-        value=profile.sleep_regularity_stddev,
-        unit="min std dev (bedtime variability)",
-        standing=sleep_standing,
-        percentile_approx=sleep_pct,
-        coverage_weight=TIER1_WEIGHTS["sleep"],
-        cost_to_close="Free with any wearable",
-        note="Regularity predicts mortality > duration" if not sleep_has_data else "",
-    ))
-
-    # --- Daily Steps ---
-    steps_has_data = profile.daily_steps_avg is not None
-    steps_standing, steps_pct = assess(profile.daily_steps_avg, DAILY_STEPS, demo)  # No NHANES data
-    results.append(MetricResult(
-        name="Daily Steps",
-        tier=1, rank=6,
-        has_data=steps_has_data,
-        value=profile.daily_steps_avg,
-        unit="steps/day",
-        standing=steps_standing,
-        percentile_approx=steps_pct,
-        coverage_weight=TIER1_WEIGHTS["steps"],
-        cost_to_close="Free with phone",
-        note="Each +1K steps = ~15% lower mortality" if not steps_has_data else "",
-    ))
-
-    # --- Resting Heart Rate ---
-    rhr_has_data = profile.resting_hr is not None
-    rhr_standing, rhr_pct = assess(profile.resting_hr, RHR, demo, nhanes_key="rhr")
-    results.append(MetricResult(
-        name="Resting Heart Rate",
-        tier=1, rank=7,
-        has_data=rhr_has_data,
-        value=profile.resting_hr,
-        unit="bpm",
-        standing=rhr_standing,
-        percentile_approx=rhr_pct,
-        coverage_weight=TIER1_WEIGHTS["resting_hr"],
-        cost_to_close="Free with wearable",
-    ))
-
-    # --- Waist Circumference ---
-    waist_has_data = profile.waist_circumference is not None
-    waist_standing, waist_pct = assess(profile.waist_circumference, WAIST, demo, nhanes_key="waist")
-    results.append(MetricResult(
-        name="Waist Circumference",
-        tier=1, rank=8,
-        has_data=waist_has_data,
-        value=profile.waist_circumference,
-        unit="inches",
-        standing=waist_standing,
-        percentile_approx=waist_pct,
-        coverage_weight=TIER1_WEIGHTS["waist"],
-        cost_to_close="$3 tape measure",
-    ))
-
-    # --- Medication List ---
-    meds_has_data = profile.has_medication_list is not None
-    results.append(MetricResult(
-        name="Medication List",
-        tier=1, rank=9,
-        has_data=meds_has_data,
-        standing=Standing.GOOD if meds_has_data else Standing.UNKNOWN,
-        coverage_weight=TIER1_WEIGHTS["medications"],
-        cost_to_close="Free — 5 min entry",
-        note="Context for interpreting all other data" if not meds_has_data else "",
-    ))
-
-    # --- Lp(a) ---
-    lpa_has_data = profile.lpa is not None
-    lpa_standing, lpa_pct = assess(profile.lpa, LPA, demo, nhanes_key="lpa")
-    results.append(MetricResult(
-        name="Lp(a)",
-        tier=1, rank=10,
-        has_data=lpa_has_data,
-        value=profile.lpa,
-        unit="nmol/L",
-        standing=lpa_standing,
-        percentile_approx=lpa_pct,
-        coverage_weight=TIER1_WEIGHTS["lpa"],
-        cost_to_close="$30 — once in your lifetime",
-        note="20% of people have elevated Lp(a), invisible on standard panels" if not lpa_has_data else "",
-    ))
-
-    # --- Tier 2: VO2 Max ---
-    vo2_has = profile.vo2_max is not None
-    vo2_standing, vo2_pct = assess(profile.vo2_max, VO2_MAX, demo)  # No NHANES data, uses ACSM
-    results.append(MetricResult(
-        name="VO2 Max",
-        tier=2, rank=11,
-        has_data=vo2_has,
-        value=profile.vo2_max,
-        unit="mL/kg/min",
-        standing=vo2_standing,
-        percentile_approx=vo2_pct,
-        coverage_weight=TIER2_WEIGHTS["vo2_max"],
-        cost_to_close="Free with Garmin/Apple Watch (estimate)",
-        note="Strongest modifiable predictor of all-cause mortality" if not vo2_has else "",
-    ))
-
-    # --- Tier 2: HRV ---
-    hrv_has = profile.hrv_rmssd_avg is not None
-    hrv_standing, hrv_pct = assess(profile.hrv_rmssd_avg, HRV_RMSSD, demo)  # No NHANES data
-    results.append(MetricResult(
-        name="HRV (7-day avg)",
-        tier=2, rank=12,
-        has_data=hrv_has,
-        value=profile.hrv_rmssd_avg,
-        unit="ms RMSSD",
-        standing=hrv_standing,
-        percentile_approx=hrv_pct,
-        coverage_weight=TIER2_WEIGHTS["hrv"],
-        cost_to_close="Free with wearable",
-        note="Use 7-day rolling avg, not single readings" if not hrv_has else "",
-    ))
-
-    # --- Tier 2: hs-CRP ---
-    crp_has = profile.hscrp is not None
-    crp_standing, crp_pct = assess(profile.hscrp, HSCRP, demo, nhanes_key="hscrp")
-    results.append(MetricResult(
-        name="hs-CRP",
-        tier=2, rank=13,
-        has_data=crp_has,
-        value=profile.hscrp,
-        unit="mg/L",
-        standing=crp_standing,
-        percentile_approx=crp_pct,
-        coverage_weight=TIER2_WEIGHTS["hscrp"],
-        cost_to_close="$20/year (add to lab order)",
-        note="Adds CVD risk stratification beyond lipids" if not crp_has else "",
-    ))
-
-    # --- Tier 2: Liver Enzymes ---
-    liver_values = [profile.alt, profile.ggt]
-    liver_has = any(v is not None for v in liver_values)
+    Metric("Metabolic Panel", tier=1, rank=3, weight="metabolic",
+           coverage=("fasting_glucose", "hba1c", "fasting_insulin"),
+           sources=(("fasting_insulin", "µIU/mL (fasting insulin)"), ("hba1c", "% (HbA1c)"),
+                    ("fasting_glucose", "mg/dL (glucose)")),
+           cost_to_close="$40-60/yr (glucose + HbA1c + insulin)",
+           note="Fasting insulin catches IR 10-15 yrs before diagnosis", note_when="fallback"),
+    Metric("Family History", tier=1, rank=4, weight="family_history",
+           coverage=("has_family_history",),
+           cost_to_close="Free — 10 min conversation",
+           note="One-time. Parental CVD <60 doubles risk."),
+    Metric("Sleep Regularity", tier=1, rank=5, weight="sleep",
+           coverage=("sleep_regularity_stddev", "sleep_duration_avg"),
+           sources=(("sleep_regularity_stddev", "min std dev (bedtime variability)"),),
+           unit="min std dev (bedtime variability)",
+           cost_to_close="Free with any wearable",
+           note="Regularity predicts mortality > duration"),
+    Metric("Daily Steps", tier=1, rank=6, weight="steps",
+           coverage=("daily_steps_avg",), sources=(("daily_steps_avg", "steps/day"),), unit="steps/day",
+           cost_to_close="Free with phone",
+           note="Each +1K steps = ~15% lower mortality"),
+    Metric("Resting Heart Rate", tier=1, rank=7, weight="resting_hr",
+           coverage=("resting_hr",), sources=(("resting_hr", "bpm"),), unit="bpm",
+           cost_to_close="Free with wearable"),
+    Metric("Waist Circumference", tier=1, rank=8, weight="waist",
+           coverage=("waist_circumference",), sources=(("waist_circumference", "inches"),), unit="inches",
+           cost_to_close="$3 tape measure"),
+    Metric("Medication List", tier=1, rank=9, weight="medications",
+           coverage=("has_medication_list",),
+           cost_to_close="Free — 5 min entry",
+           note="Context for interpreting all other data"),
+    Metric("Lp(a)", tier=1, rank=10, weight="lpa",
+           coverage=("lpa",), sources=(("lpa", "nmol/L"),), unit="nmol/L",
+           cost_to_close="$30 — once in your lifetime",
+           note="20% of people have elevated Lp(a), invisible on standard panels"),
+    Metric("VO2 Max", tier=2, rank=11, weight="vo2_max",
+           coverage=("vo2_max",), sources=(("vo2_max", "mL/kg/min"),), unit="mL/kg/min",
+           cost_to_close="Free with Garmin/Apple Watch (estimate)",
+           note="Strongest modifiable predictor of all-cause mortality"),
+    Metric("HRV (7-day avg)", tier=2, rank=12, weight="hrv",
+           coverage=("hrv_rmssd_avg",), sources=(("hrv_rmssd_avg", "ms RMSSD"),), unit="ms RMSSD",
+           cost_to_close="Free with wearable",
+           note="Use 7-day rolling avg, not single readings"),
+    Metric("hs-CRP", tier=2, rank=13, weight="hscrp",
+           coverage=("hscrp",), sources=(("hscrp", "mg/L"),), unit="mg/L",
+           cost_to_close="$20/year (add to lab order)",
+           note="Adds CVD risk stratification beyond lipids"),
     # Score on GGT if available (independent CV predictor), else ALT
-    if profile.ggt is not None:
-        liver_standing, liver_pct = assess(profile.ggt, GGT, demo, nhanes_key="ggt")
-        liver_val, liver_unit = profile.ggt, "U/L (GGT)"
-    elif profile.alt is not None:
-        liver_standing, liver_pct = assess(profile.alt, ALT, demo, nhanes_key="alt")
-        liver_val, liver_unit = profile.alt, "U/L (ALT)"
-    else:
-        liver_standing, liver_pct = Standing.UNKNOWN, None
-        liver_val, liver_unit = None, ""
-    results.append(MetricResult(
-        name="Liver Enzymes",
-        tier=2, rank=14,
-        has_data=liver_has,
-        value=liver_val,
-        unit=liver_unit,
-        standing=liver_standing,
-        percentile_approx=liver_pct,
-        coverage_weight=TIER2_WEIGHTS["liver"],
-        cost_to_close="Usually included in standard panels",
-        note="GGT independently predicts CV mortality + diabetes" if not liver_has else "",
-    ))
-
-    # --- Tier 2: CBC ---
-    cbc_values = [profile.hemoglobin, profile.wbc, profile.platelets]
-    cbc_has = any(v is not None for v in cbc_values)
+    Metric("Liver Enzymes", tier=2, rank=14, weight="liver",
+           coverage=("alt", "ggt"), sources=(("ggt", "U/L (GGT)"), ("alt", "U/L (ALT)")),
+           cost_to_close="Usually included in standard panels",
+           note="GGT independently predicts CV mortality + diabetes"),
     # Score on hemoglobin as the primary CBC marker
-    if profile.hemoglobin is not None:
-        cbc_standing, cbc_pct = assess(profile.hemoglobin, HEMOGLOBIN, demo, nhanes_key="hemoglobin")
-        cbc_val, cbc_unit = profile.hemoglobin, "g/dL (Hgb)"
-    else:
-        cbc_standing, cbc_pct = Standing.UNKNOWN, None
-        cbc_val, cbc_unit = None, ""
-    results.append(MetricResult(
-        name="CBC",
-        tier=2, rank=15,
-        has_data=cbc_has,
-        value=cbc_val,
-        unit=cbc_unit,
-        standing=cbc_standing,
-        percentile_approx=cbc_pct,
-        coverage_weight=TIER2_WEIGHTS["cbc"],
-        cost_to_close="Usually included in standard panels",
-        note="Safety net screening — RDW predicts all-cause mortality" if not cbc_has else "",
-    ))
-
-    # --- Tier 2: Thyroid ---
-    thyroid_has = profile.tsh is not None
+    Metric("CBC", tier=2, rank=15, weight="cbc",
+           coverage=("hemoglobin", "wbc", "platelets"), sources=(("hemoglobin", "g/dL (Hgb)"),),
+           cost_to_close="Usually included in standard panels",
+           note="Safety net screening — RDW predicts all-cause mortality"),
     # TSH is bidirectional — too low is also bad. Handle the <0.4 case
-    if profile.tsh is not None and profile.tsh < 0.4:
-        thyroid_standing = Standing.CONCERNING
-        thyroid_pct = 10
-    elif profile.tsh is not None and profile.tsh <= 2.5:
-        thyroid_standing = Standing.OPTIMAL
-        thyroid_pct = 90
-    else:
-        thyroid_standing, thyroid_pct = assess(profile.tsh, TSH, demo, nhanes_key="tsh")
-    results.append(MetricResult(
-        name="Thyroid (TSH)",
-        tier=2, rank=16,
-        has_data=thyroid_has,
-        value=profile.tsh,
-        unit="mIU/L",
-        standing=thyroid_standing,
-        percentile_approx=thyroid_pct,
-        coverage_weight=TIER2_WEIGHTS["thyroid"],
-        cost_to_close="$20/year",
-        note="12% lifetime prevalence. Highly treatable." if not thyroid_has else "",
-    ))
-
-    # --- Tier 2: Vitamin D + Ferritin ---
-    vd_fer_values = [profile.vitamin_d, profile.ferritin]
-    vd_fer_has = any(v is not None for v in vd_fer_values)
+    Metric("Thyroid (TSH)", tier=2, rank=16, weight="thyroid",
+           coverage=("tsh",), sources=(("tsh", "mIU/L"),), unit="mIU/L",
+           bands=(("<", 0.4, Standing.CONCERNING, 10), ("<=", 2.5, Standing.OPTIMAL, 90)),
+           cost_to_close="$20/year",
+           note="12% lifetime prevalence. Highly treatable."),
     # Score on Vitamin D as primary (more actionable, wider deficiency)
-    if profile.vitamin_d is not None:
-        vd_standing, vd_pct = assess(profile.vitamin_d, VITAMIN_D, demo, nhanes_key="vitamin_d")
-        vd_val, vd_unit = profile.vitamin_d, "ng/mL (Vit D)"
-    elif profile.ferritin is not None:
-        vd_standing, vd_pct = assess(profile.ferritin, FERRITIN, demo, nhanes_key="ferritin")
-        vd_val, vd_unit = profile.ferritin, "ng/mL (Ferritin)"
-    else:
-        vd_standing, vd_pct = Standing.UNKNOWN, None
-        vd_val, vd_unit = None, ""
-    results.append(MetricResult(
-        name="Vitamin D + Ferritin",
-        tier=2, rank=17,
-        has_data=vd_fer_has,
-        value=vd_val,
-        unit=vd_unit,
-        standing=vd_standing,
-        percentile_approx=vd_pct,
-        coverage_weight=TIER2_WEIGHTS["vitamin_d_ferritin"],
-        cost_to_close="$40-60 baseline lab add-on",
-        note="42% of US adults Vit D deficient. Cheap to fix." if not vd_fer_has else "",
-    ))
-
-    # --- Tier 2: Weight Trends ---
-    weight_has = profile.weight_lbs is not None
-    results.append(MetricResult(
-        name="Weight Trends",
-        tier=2, rank=18,
-        has_data=weight_has,
-        standing=Standing.GOOD if weight_has else Standing.UNKNOWN,
-        coverage_weight=TIER2_WEIGHTS["weight_trends"],
-        cost_to_close="$20-50 (smart scale)",
-        note="Progressive drift is the signal, not absolute weight" if not weight_has else "",
-    ))
-
-    # --- Tier 2: PHQ-9 ---
-    phq9_has = profile.phq9_score is not None
-    results.append(MetricResult(
-        name="PHQ-9 (Depression)",
-        tier=2, rank=19,
-        has_data=phq9_has,
-        standing=Standing.GOOD if phq9_has else Standing.UNKNOWN,
-        coverage_weight=TIER2_WEIGHTS["phq9"],
-        cost_to_close="Free — 3 min questionnaire",
-        note="Depression independently raises CVD risk 80%" if not phq9_has else "",
-    ))
-
-    # --- Tier 2: Zone 2 Cardio ---
-    z2_has = profile.zone2_min_per_week is not None
-    results.append(MetricResult(
-        name="Zone 2 Cardio",
-        tier=2, rank=20,
-        has_data=z2_has,
-        standing=Standing.GOOD if z2_has else Standing.UNKNOWN,
-        coverage_weight=TIER2_WEIGHTS["zone2"],
-        cost_to_close="Free with HR wearable",
-        note="150-300 min/week = largest mortality reduction" if not z2_has else "",
-    ))
+    Metric("Vitamin D + Ferritin", tier=2, rank=17, weight="vitamin_d_ferritin",
+           coverage=("vitamin_d", "ferritin"), sources=(("vitamin_d", "ng/mL (Vit D)"), ("ferritin", "ng/mL (Ferritin)")),
+           cost_to_close="$40-60 baseline lab add-on",
+           note="42% of US adults Vit D deficient. Cheap to fix."),
+    Metric("Weight Trends", tier=2, rank=18, weight="weight_trends",
+           coverage=("weight_lbs",),
+           cost_to_close="$20-50 (smart scale)",
+           note="Progressive drift is the signal, not absolute weight"),
+    Metric("PHQ-9 (Depression)", tier=2, rank=19, weight="phq9",
+           coverage=("phq9_score",),
+           cost_to_close="Free — 3 min questionnaire",
+           note="Depression independently raises CVD risk 80%"),
+    Metric("Zone 2 Cardio", tier=2, rank=20, weight="zone2",
+           coverage=("zone2_min_per_week",),
+           cost_to_close="Free with HR wearable",
+           note="150-300 min/week = largest mortality reduction"),
+)
+
+
+# ---------------------------------------------------------------------------
+# Execution plan — METRICS compiled once at import into flat tuples:
+# profile field indices, table references, fallback order and weights.
+# ---------------------------------------------------------------------------
+
+PROFILE_FIELDS = tuple(f.name for f in fields(UserProfile) if f.name != "demographics")
+BOOL_FIELDS = frozenset(f.name for f in fields(UserProfile) if f.type == "bool | None")  # annotations are strings
+FIELD_INDEX = {name: i for i, name in enumerate(PROFILE_FIELDS)}
+profile_row = attrgetter(*PROFILE_FIELDS)  # UserProfile → tuple of field values
+
+_BAND_OPS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+PlanStep = namedtuple("PlanStep", (
+    "index",             # position in METRICS
+    "name",
+    "tier",
+    "rank",
+    "weight",
+    "coverage",          # field indices
+    "sources",           # ((field index, table, nhanes_key, unit label), ...) in fallback order
+    "unit",
+    "unit_detail",       # field index or None
+    "bands",             # ((op, threshold, Standing, pct), ...)
+    "cost_to_close",
+    "note",
+    "note_on_fallback",
+))
+
+
+def compile_plan(metrics=None) -> tuple:
+    """Compile metric names (default: all of METRICS) into a tuple of PlanSteps."""
+    weights = {**TIER1_WEIGHTS, **TIER2_WEIGHTS}
+    wanted = None if metrics is None else set(metrics)
+    unknown = (wanted or set()) - {m.name for m in METRICS}
+    if unknown:
+        raise KeyError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+    plan = []
+    for i, m in enumerate(METRICS):
+        if wanted is not None and m.name not in wanted:
+            continue
+        sources = tuple(
+            (FIELD_INDEX[f], BIOMARKERS[f].table, BIOMARKERS[f].nhanes_key, unit)
+            for f, unit in m.sources
+        )
+        plan.append(PlanStep(
+            index=i, name=m.name, tier=m.tier, rank=m.rank,
+            weight=weights[m.weight],
+            coverage=tuple(FIELD_INDEX[f] for f in m.coverage),
+            sources=sources,
+            unit=m.unit,
+            unit_detail=FIELD_INDEX[m.unit_detail] if m.unit_detail else None,
+            bands=tuple((_BAND_OPS[op], t, s, p) for op, t, s, p in m.bands),
+            cost_to_close=m.cost_to_close,
+            note=m.note,
+            note_on_fallback=m.note_when == "fallback",
+        ))
+    return tuple(plan)
+
+
+PLAN = compile_plan()
+
+
+# ---------------------------------------------------------------------------
+# Scoring engine
+# ---------------------------------------------------------------------------
+
+def evaluate_metrics(profile: UserProfile, metrics=None) -> list[MetricResult]:
+    """Evaluate a profile against the plan. metrics: optional subset of metric names."""
+    plan = PLAN if metrics is None else compile_plan(metrics)
+    return run_plan(plan, profile_row(profile), profile.demographics)
+
+
+def run_plan(plan: tuple, row: tuple, demo: Demographics) -> list[MetricResult]:
+    """Tight evaluation loop over compiled PlanSteps for one profile row."""
+    results = []
+    for step in plan:
+        has_data = False
+        for i in step.coverage:
+            if row[i] is not None:
+                has_data = True
+                break
+
+        if not step.sources:
+            # Coverage-only metric
+            results.append(MetricResult(
+                name=step.name, tier=step.tier, rank=step.rank,
+                has_data=has_data,
+                standing=Standing.GOOD if has_data else Standing.UNKNOWN,
+                coverage_weight=step.weight,
+                cost_to_close=step.cost_to_close,
+                note=step.note if not has_data else "",
+            ))
+            continue
+
+        # Fallback chain: first present source is scored
+        value, unit, used = None, step.unit, None
+        for pos, (i, table, nhanes_key, src_unit) in enumerate(step.sources):
+            if row[i] is not None:
+                value, unit, used = row[i], src_unit, pos
+                break
+
+        standing, pct = Standing.UNKNOWN, None
+        if used is not None:
+            for op, threshold, band_standing, band_pct in step.bands:
+                if op(value, threshold):
+                    standing, pct = band_standing, band_pct
+                    break
+            else:
+                _, table, nhanes_key, _ = step.sources[used]
+                standing, pct = assess(value, table, demo, nhanes_key=nhanes_key)
+
+        if step.unit_detail is not None:
+            detail = row[step.unit_detail]
+            unit += f"/{int(detail)}" if detail else ""
+
+        if step.note_on_fallback:
+            show_note = has_data and used != 0
+        else:
+            show_note = not has_data
+        results.append(MetricResult(
+            name=step.name, tier=step.tier, rank=step.rank,
+            has_data=has_data,
+            value=value,
+            unit=unit,
+            standing=standing,
+            percentile_approx=pct,
+            coverage_weight=step.weight,
+            cost_to_close=step.cost_to_close,
+            note=step.note if show_note else "",
+        ))
+    return results
+
+
+def score_profile(profile: UserProfile) -> dict:
+    """Score a user profile and return coverage + assessment results."""
+    demo = profile.demographics
+    results = run_plan(PLAN, profile_row(profile), demo)
 
     # --- Compute scores ---
     total_weight = sum(TIER1_WEIGHTS.values()) + sum(TIER2_WEIGHTS.values())
     covered_weight = sum(r.coverage_weight for r in results if r.has_data)
-    coverage_pct = round(covered_weight / total_weight * 100)
+    coverage_pct = round_half_up(covered_weight / total_weight * 100)
 
     # Tier-level sub-scores
     tier1_results = [r for r in results if r.tier == 1]
@@ -991,12 +1158,12 @@ def score_profile(profile: UserProfile) -> dict:
     t2_total = sum(TIER2_WEIGHTS.values())
     t1_covered = sum(r.coverage_weight for r in tier1_results if r.has_data)
     t2_covered = sum(r.coverage_weight for r in tier2_results if r.has_data)
-    t1_pct = round(t1_covered / t1_total * 100)
-    t2_pct = round(t2_covered / t2_total * 100)
+    t1_pct = round_half_up(t1_covered / t1_total * 100)
+    t2_pct = round_half_up(t2_covered / t2_total * 100)
 
     # Assessment score: average standing of metrics that have data + values
     assessed = [r for r in results if r.percentile_approx is not None]
-    avg_percentile = round(sum(r.percentile_approx for r in assessed) / len(assessed)) if assessed else None
+    avg_percentile = round_half_up(sum(r.percentile_approx for r in assessed) / len(assessed)) if assessed else None
 
     # Gaps
     gaps = [r for r in results if not r.has_data]
@@ -1018,6 +1185,270 @@ def score_profile(profile: UserProfile) -> dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# Incremental re-scoring — patch a previous result from changed fields
+# ---------------------------------------------------------------------------
+
+# Field index → positions in PLAN of the metrics that read it
+FIELD_STEPS = {}
+for _pos, _step in enumerate(PLAN):
+    _reads = {*_step.coverage, *(src[0] for src in _step.sources)}
+    if _step.unit_detail is not None:
+        _reads.add(_step.unit_detail)
+    for _i in _reads:
+        FIELD_STEPS.setdefault(_i, []).append(_pos)
+del _pos, _step, _reads, _i
+
+_TIER_TOTALS = {1: sum(TIER1_WEIGHTS.values()), 2: sum(TIER2_WEIGHTS.values())}
+_TIER_SIZES = {t: sum(1 for step in PLAN if step.tier == t) for t in _TIER_TOTALS}
+
+
+class _ScoreState:
+    """Last results for one profile plus the running sums score_profile derives from them."""
+
+    __slots__ = ("row", "demo", "results", "covered", "counts", "pct_sum", "n_assessed", "gaps")
+
+    def __init__(self, row, demo: Demographics):
+        self.row = list(row)
+        self.demo = demo
+        self.results = run_plan(PLAN, self.row, demo)
+        self.covered = {1: 0, 2: 0}   # tier → covered weight
+        self.counts = {1: 0, 2: 0}    # tier → metrics with data
+        self.pct_sum = 0
+        self.n_assessed = 0
+        self.gaps = []                # sorted (-weight, position): weight desc, report order within ties
+        for pos, r in enumerate(self.results):
+            self._tally(pos, r, 1)
+
+    def _tally(self, pos: int, r: MetricResult, sign: int):
+        if r.has_data:
+            self.covered[r.tier] += sign * r.coverage_weight
+            self.counts[r.tier] += sign
+        elif sign > 0:
+            insort(self.gaps, (-r.coverage_weight, pos))
+        else:
+            del self.gaps[bisect_left(self.gaps, (-r.coverage_weight, pos))]
+        if r.percentile_approx is not None:
+            self.pct_sum += sign * r.percentile_approx
+            self.n_assessed += sign
+
+    def patch(self, pos: int):
+        self._tally(pos, self.results[pos], -1)
+        r = run_plan((PLAN[pos],), self.row, self.demo)[0]
+        self.results[pos] = r
+        self._tally(pos, r, 1)
+
+    def output(self) -> dict:
+        demo = self.demo
+        t1, t2 = self.covered[1], self.covered[2]
+        t1_total, t2_total = _TIER_TOTALS[1], _TIER_TOTALS[2]
+        return {
+            "demographics": f"{demo.age}{demo.sex}, {demo.ethnicity}",
+            "coverage_score": round_half_up((t1 + t2) / (t1_total + t2_total) * 100),
+            "coverage_fraction": f"{self.counts[1] + self.counts[2]}/{len(self.results)}",
+            "tier1_pct": round_half_up(t1 / t1_total * 100),
+            "tier1_fraction": f"{self.counts[1]}/{_TIER_SIZES[1]}",
+            "tier1_weight": f"{t1}/{t1_total}",
+            "tier2_pct": round_half_up(t2 / t2_total * 100),
+            "tier2_fraction": f"{self.counts[2]}/{_TIER_SIZES[2]}",
+            "tier2_weight": f"{t2}/{t2_total}",
+            "avg_percentile": round_half_up(self.pct_sum / self.n_assessed) if self.n_assessed else None,
+            "results": self.results,
+            "gaps": [self.results[pos] for _, pos in self.gaps],
+        }
+
+
+class IncrementalScorer:
+    """Keeps the last score_profile result per profile and re-scores from field deltas.
+
+    Only the metrics that read a changed field are re-evaluated; coverage,
+    tier sub-scores, avg_percentile and the sorted gaps are patched from
+    running sums. Output is identical to score_profile. The returned
+    "results" list is owned by the scorer and patched in place by later
+    updates — copy it to keep a snapshot.
+
+    Usage:
+        scorer = IncrementalScorer()
+        scorer.score("andrew", profile)                 # first call: full score
+        scorer.update("andrew", {"resting_hr": 52})     # re-evaluates RHR only
+        scorer.score("andrew", reloaded_profile)        # diffs fields, patches changes
+    """
+
+    def __init__(self):
+        self._states = {}
+        _scorers.add(self)  # cleared with the assess cache when percentiles reload
+
+    def __contains__(self, key) -> bool:
+        return key in self._states
+
+    def score(self, key, profile: UserProfile) -> dict:
+        """Score a full profile, reusing the previous result for key when demographics match."""
+        state = self._states.get(key)
+        row = profile_row(profile)
+        if state is None or state.demo != profile.demographics:
+            state = self._states[key] = _ScoreState(row, profile.demographics)
+            return state.output()
+        changes = {
+            PROFILE_FIELDS[i]: new for i, (old, new) in enumerate(zip(state.row, row))
+            if old != new or type(old) is not type(new)
+        }
+        return self.update(key, changes)
+
+    def update(self, key, changes: dict) -> dict:
+        """Apply {field: new value} (None clears a field) to a previously scored profile."""
+        state = self._states[key]
+        touched = set()
+        for name, value in changes.items():
+            i = FIELD_INDEX.get(name)
+            if i is None:
+                raise KeyError(f"Unknown profile field: {name}")
+            state.row[i] = value
+            touched.update(FIELD_STEPS.get(i, ()))
+        for pos in touched:
+            state.patch(pos)
+        return state.output()
+
+    def forget(self, key):
+        self._states.pop(key, None)
+
+    def clear(self):
+        """Forget every profile: the next score() is a full re-score."""
+        self._states.clear()
+
+
+_scorers = weakref.WeakSet()  # live IncrementalScorers
+
+
+def score_many(profiles):
+    """Score many profiles at once with NumPy column arrays.
+
+    Same results as looping score_profile, returned as a cohort.ScoreFrame
+    (array columns; frame[i] reads like a score_profile dict).
+    """
+    from cohort import score_many as _score_many
+    return _score_many(profiles)
+
+
+# ---------------------------------------------------------------------------
+# Targets — assess() run backwards: the value that reaches a percentile.
+# NHANES metrics invert the continuous-age curve; manual tables only resolve
+# to bands, so their target is the cutoff that opens the band.
+# ---------------------------------------------------------------------------
+
+STANDING_BOUNDARIES = (
+    (Standing.OPTIMAL, 85),
+    (Standing.GOOD, 65),
+    (Standing.AVERAGE, 35),
+    (Standing.BELOW_AVG, 15),
+)
+_CUTOFF_FOR = {Standing.OPTIMAL: 0, Standing.GOOD: 1, Standing.AVERAGE: 2, Standing.BELOW_AVG: 3}  # lower is better
+_OP_SYMBOLS = {op: symbol for symbol, op in _BAND_OPS.items()}
+
+
+def value_at_percentile(metric: str, pct: float, demo: Demographics) -> float | None:
+    """The value of a biomarker (a BIOMARKERS field) that scores percentile `pct` for demo, or None.
+
+    Values on the better side of it score at least pct. On NHANES curves
+    this is the exact inverse of assess(); for manual tables it is the
+    cutoff opening the band percentile_to_standing(pct) falls in (None below
+    15, where any value qualifies).
+    """
+    b = BIOMARKERS[metric]
+    target = _target(pct, b.table, demo, b.nhanes_key)
+    return target[0] if target else None
+
+
+def _target(pct: float, table: dict, demo: Demographics, nhanes_key: str = None):
+    """(value, comparison, source) reaching pct, or None. comparison is the operator a value must
+    satisfy against it: "<=" / ">=", or "<" / ">" where the value itself falls short."""
+    lower_is_better = table["lower_is_better"]
+    if NHANES_AVAILABLE and nhanes_key and nhanes_key in NHANES_KEY_MAP:
+        key = NHANES_KEY_MAP[nhanes_key]
+        value = nhanes_value_at_percentile(key, pct, demo.age, demo.sex, demo.ethnicity)
+        if value is not None:
+            # On a flat stretch of the curve the tied value scores its top end,
+            # which for lower-is-better metrics is the worse side
+            reached = nhanes_percentile_at_age(key, value, demo.age, demo.sex, demo.ethnicity) >= min(pct, 99)
+            if lower_is_better:
+                return value, "<=" if reached else "<", "nhanes"
+            return value, ">=" if reached else ">", "nhanes"
+
+    cutoffs = resolve_cutoffs(table)[0].get((age_bucket(demo.age), demo.sex)) or table["cutoffs"].get("universal")
+    standing = percentile_to_standing(pct)
+    if not cutoffs or standing not in _CUTOFF_FOR:
+        return None
+    if lower_is_better:
+        return cutoffs[_CUTOFF_FOR[standing]], "<=", "cutoffs"
+    return cutoffs[3 - _CUTOFF_FOR[standing]], ">", "cutoffs"
+
+
+def _looser(a: tuple, b: tuple, lower_is_better: bool) -> bool:
+    """True if target a admits every value target b does, and more."""
+    if a[0] != b[0]:
+        return (a[0] > b[0]) == lower_is_better
+    return len(a[1]) > len(b[1])  # "<=" admits the boundary itself, "<" doesn't
+
+
+def standing_targets(profile: UserProfile, metrics=None) -> list[dict]:
+    """Thresholds for every Standing boundary (STANDING_BOUNDARIES) on each scored metric.
+
+    One entry per metric with reference data, in report order, for the
+    source that is scored (the first present; the preferred one if none is):
+        {"metric", "field", "unit", "value", "standing", "percentile", "lower_is_better",
+         "targets": [{"standing", "percentile", "value", "comparison", "source"}, ...],
+         "bands":   [{"comparison", "value", "standing"}, ...]}
+    A target reads "value <comparison> target value reaches that standing or
+    better", so targets never tighten from Optimal down to Below Average.
+    Bands (TSH) are checked before the reference table, as in scoring: a
+    band that opens a boundary standing in the metric's direction is folded
+    into the targets; the rest are listed under "bands", which override them. metrics: optional subset
+    of metric names.
+    """
+    plan = PLAN if metrics is None else compile_plan(metrics)
+    row = profile_row(profile)
+    demo = profile.demographics
+    out = []
+    for step, result in zip(plan, run_plan(plan, row, demo)):
+        if not step.sources:
+            continue
+        i, table, nhanes_key, unit = next((src for src in step.sources if row[src[0]] is not None),
+                                          step.sources[0])
+        lower_is_better = table["lower_is_better"]
+        along = ("<", "<=") if lower_is_better else (">", ">=")
+        band_targets, overrides = {}, []
+        for op, threshold, standing, _ in step.bands:
+            if _OP_SYMBOLS[op] in along and standing in _CUTOFF_FOR:
+                band_targets[standing] = threshold, _OP_SYMBOLS[op], "band"
+            else:
+                overrides.append({"comparison": _OP_SYMBOLS[op], "value": threshold, "standing": standing.value})
+
+        targets, loosest = [], None
+        for standing, pct in STANDING_BOUNDARIES:
+            target = band_targets.get(standing) or _target(pct, table, demo, nhanes_key)
+            # Reaching a better standing reaches this one too
+            if loosest is not None and (target is None or _looser(loosest, target, lower_is_better)):
+                target = loosest
+            loosest = target
+            value, comparison, source = target or (None, None, None)
+            targets.append({"standing": standing.value, "percentile": pct, "value": value,
+                            "comparison": comparison, "source": source})
+        if loosest is None:
+            continue
+
+        out.append({
+            "metric": step.name,
+            "field": PROFILE_FIELDS[i],
+            "unit": unit,
+            "value": row[i],
+            "standing": result.standing.value,
+            "percentile": result.percentile_approx,
+            "lower_is_better": lower_is_better,
+            "targets": targets,
+            "bands": overrides,
+        })
+    return out
+
+
 # ---------------------------------------------------------------------------
 # Output
 # ---------------------------------------------------------------------------
@@ -1135,13 +1566,82 @@ def print_report(output: dict):
 # Main — Andrew's profile as test case
 # ---------------------------------------------------------------------------
 
-def main():
+def run_batch(path: str, output: str | None = None):
+    """Score a JSONL (or .csv) cohort file, writing one JSON summary per profile."""
+    import time
+    from cohort import ProfileTable
+
+    if str(path).endswith(".csv"):
+        table = ProfileTable.from_csv(path)
+    else:
+        table = ProfileTable.from_jsonl(path)
+
+    start = time.perf_counter()
+    scores = score_many(table)
+    elapsed = time.perf_counter() - start
+
+    out = open(output, "w") if output else sys.stdout
+    try:
+        for i in range(len(table)):
+            out.write(json.dumps(scores.summary(i)) + "\n")
+    finally:
+        if output:
+            out.close()
+
+    rate = len(table) / elapsed if elapsed > 0 else float("inf")
+    print(f"Scored {len(table)} profiles in {elapsed:.3f}s ({rate:,.0f} profiles/s)", file=sys.stderr)
+
+
+def profile_from_dict(data: dict) -> UserProfile:
+    """Build a UserProfile from profile JSON ({"demographics": {...}, <field>: value, ...})."""
+    data = dict(data)
+    demo_data = data.pop("demographics", {})
+    return UserProfile(demographics=Demographics(**demo_data), **data)
+
+
+def load_profile_json(path: str) -> UserProfile:
+    with open(path) as f:
+        return profile_from_dict(json.load(f))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # One-shot fast path: `score.py profile.json` (or no args) skips argparse,
+    # which costs more to import than scoring the profile does.
+    if len(argv) <= 1 and not any(a.startswith("-") for a in argv):
+        if argv:
+            andrew = load_profile_json(argv[0])
+        else:
+            andrew = UserProfile(demographics=Demographics(age=35, sex="M", ethnicity="white"))
+        print_report(score_profile(andrew))
+        return
+
     import argparse
 
     parser = argparse.ArgumentParser(description="Baseline health coverage scoring")
     parser.add_argument("profile", nargs="?", help="Path to profile JSON file")
     parser.add_argument("--draws", help="Path to longitudinal draws JSON file (auto-generates profile)")
-    args = parser.parse_args()
+    parser.add_argument("--batch", help="Path to a JSONL cohort file (one profile per line) or a CSV with a header row")
+    parser.add_argument("--output", help="With --batch: write JSONL results here instead of stdout")
+    parser.add_argument("--serve", action="store_true", help="Run the scoring daemon on a Unix socket (see score_daemon.py)")
+    parser.add_argument("--client", action="store_true",
+                        help="Score the profile via the running daemon; scores in-process if none is running")
+    parser.add_argument("--socket", help="Daemon socket path for --serve/--client (default: $BASELINE_SOCKET or $TMPDIR)")
+    args = parser.parse_args(argv)
+
+    if args.serve or args.client:
+        import score_daemon
+        path = args.socket or score_daemon.SOCKET_PATH
+        if args.serve:
+            score_daemon.serve(path)
+        else:
+            score_daemon.client_main(args.profile, path)
+        return
+
+    if args.batch:
+        run_batch(args.batch, args.output)
+        return
 
     if args.draws:
         # Auto-generate profile snapshot from longitudinal draws
@@ -1154,13 +1654,7 @@ def main():
             **{k: v for k, v in data.items() if hasattr(UserProfile, k)},
         )
     elif args.profile:
-        with open(args.profile) as f:
-            data = json.load(f)
-            demo_data = data.pop("demographics", {})
-            andrew = UserProfile(
-                demographics=Demographics(**demo_data),
-                **data,
-            )
+        andrew = load_profile_json(args.profile)
     else:
         # Default: empty profile
         andrew = UserProfile(
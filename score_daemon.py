@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Baseline — Scoring Daemon
+
+Long-lived scoring process for interactive tools. `score.py --serve` keeps
+the compiled metric plan, cutoff tables and NHANES curves in memory (plus a
+warm assess() cache) and scores JSON profiles sent over a Unix domain
+socket. `score.py --client` sends a profile to it and prints the report,
+scoring in-process instead when no daemon is listening.
+
+Protocol: newline-delimited JSON, one request per line, answered in order
+on the same connection. Errors come back as {"id": ..., "error": "..."} and
+leave the connection open.
+    {"id": 1, "profile": {...}}                      → {"id": 1, "result": {...}}
+    {"id": 2, "profile": {...}, "format": "report"}  → {"id": 2, "report": "..."}
+    {"id": 3, "op": "stats"}                         → {"id": 3, "stats": {...}}
+"result" is the score_profile output with results/gaps as MetricResult.to_dict()
+rows; "report" is the print_report text. Profile values must be JSON numbers
+(true/false for has_* fields) and come back as floats (see profile_from_json).
+
+Requests from every connection funnel into one scoring thread, which takes
+everything queued at that moment as one batch: small batches run through
+score_profile, large ones through the vectorized cohort.score_many.
+
+Usage:
+    python3 score.py --serve [--socket PATH]
+    python3 score.py --client profile.json [--socket PATH]
+    python3 score_daemon.py profile.json       # same client, without importing score unless it falls back
+
+    from score_daemon import Client
+    with Client() as client:
+        output = client.score(profile_dict)
+"""
+
+import json
+import os
+import queue
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+SOCKET_PATH = os.environ.get("BASELINE_SOCKET") or os.path.join(
+    os.environ.get("TMPDIR", "/tmp"), f"baseline-score-{os.getuid()}.sock")
+
+MAX_BATCH = 1024  # requests scored per pass of the scoring thread
+VECTOR_MIN = 64   # batches at least this large go through cohort.score_many (needs numpy)
+CLIENT_TIMEOUT = 10.0
+
+
+def output_to_json(output) -> dict:
+    """score_profile output (or a cohort.ProfileScore view) as a JSON-serializable dict."""
+    data = dict(output)
+    data["results"] = [r.to_dict() for r in output["results"]]
+    data["gaps"] = [r.to_dict() for r in output["gaps"]]
+    return data
+
+
+def profile_from_json(data):
+    """UserProfile from a request's profile JSON, checked and normalized once.
+
+    Numeric fields must be JSON numbers and become floats, which is how
+    cohort.score_many reads them, so a profile gets the same reply whether it
+    is scored alone or in a vectorized batch ("value": 120 comes back as
+    120.0 either way). Boolean fields must be true/false. Anything else is a
+    ValueError naming the field.
+    """
+    from score import BOOL_FIELDS, PROFILE_FIELDS, profile_from_dict
+
+    if not isinstance(data, dict):
+        raise ValueError(f"profile must be a JSON object, not {type(data).__name__}")
+    data = dict(data)
+    demo = data.get("demographics")
+    age = demo.get("age") if isinstance(demo, dict) else None
+    if age is not None and (isinstance(age, bool) or not isinstance(age, (int, float))):
+        raise ValueError(f"demographics.age must be a number, not {age!r}")
+    for f in PROFILE_FIELDS:
+        v = data.get(f)
+        if v is None:
+            continue
+        if f in BOOL_FIELDS:
+            if not isinstance(v, bool):
+                raise ValueError(f"{f} must be true or false, not {v!r}")
+        elif isinstance(v, bool) or not isinstance(v, (int, float)):
+            raise ValueError(f"{f} must be a number, not {v!r}")
+        else:
+            data[f] = float(v)
+    return profile_from_dict(data)
+
+
+def render_report(output) -> str:
+    """print_report text for a score_profile output."""
+    import contextlib
+    import io
+    from score import print_report
+
+    buf = io.StringIO()
+    with contextlib.redirect_stdout(buf):
+        print_report(output)
+    return buf.getvalue()
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class _Pending:
+    """One queued profile; the connection thread waits on `done` for its reply."""
+
+    __slots__ = ("profile", "report", "done", "reply")
+
+    def __init__(self, profile, report: bool):
+        self.profile = profile
+        self.report = report
+        self.done = threading.Event()
+        self.reply = None
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                reply = self.server.handle_request_line(line)
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class ScoringServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix-socket scoring server: a thread per connection, one batching scoring thread."""
+
+    daemon_threads = True
+    request_queue_size = 128  # listen backlog; bursts of clients connect at once
+
+    def __init__(self, path: str = SOCKET_PATH, max_batch: int = MAX_BATCH, cache_size: int = 65536):
+        import score
+        score.enable_assess_cache(cache_size)
+        try:
+            import numpy  # noqa: F401
+            self.vectorized = True
+        except ImportError:
+            self.vectorized = False
+        self.max_batch = max_batch
+        self.pending = queue.SimpleQueue()
+        self.started = time.time()
+        self.counts = {"requests": 0, "errors": 0, "batches": 0, "vectorized_batches": 0, "largest_batch": 0}
+        self._counts_lock = threading.Lock()  # counts are bumped from connection threads too
+        super().__init__(path, _Handler)
+        threading.Thread(target=self._score_loop, name="scorer", daemon=True).start()
+
+    # -- connection threads ------------------------------------------------
+
+    def _count(self, key: str, n: int = 1):
+        with self._counts_lock:
+            self.counts[key] += n
+
+    def handle_request_line(self, line: bytes) -> dict:
+        """Reply to one request line. Never raises: a bad request gets an "error" reply."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            self._count("errors")
+            return {"id": None, "error": f"Invalid JSON: {e}"}
+        if not isinstance(request, dict):
+            self._count("errors")
+            return {"id": None, "error": f"Request must be a JSON object, not {type(request).__name__}"}
+        reply = {"id": request.get("id")}
+        if request.get("op") == "stats":
+            reply["stats"] = self.stats()
+            return reply
+        if "profile" not in request:
+            reply["error"] = "Request needs a 'profile' (or 'op': 'stats')"
+            return reply
+        try:
+            profile = profile_from_json(request["profile"])
+        except Exception as e:  # any malformed profile: TypeError, ValueError, KeyError, ...
+            self._count("errors")
+            reply["error"] = f"Invalid profile: {type(e).__name__}: {e}"
+            return reply
+
+        item = _Pending(profile, request.get("format") == "report")
+        self.pending.put(item)
+        item.done.wait()
+        reply.update(item.reply)
+        return reply
+
+    def stats(self) -> dict:
+        import score
+        cache = score._assess_cache
+        with self._counts_lock:
+            counts = dict(self.counts)
+        return {
+            **counts,
+            "uptime_s": round(time.time() - self.started, 1),
+            "assess_cache": cache.info() if cache is not None else None,
+        }
+
+    # -- scoring thread ----------------------------------------------------
+
+    def _score_loop(self):
+        pending = self.pending
+        while True:
+            batch = [pending.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            self._score_batch(batch)
+
+    def _score_batch(self, batch: list):
+        import score
+
+        with self._counts_lock:
+            counts = self.counts
+            counts["requests"] += len(batch)
+            counts["batches"] += 1
+            counts["largest_batch"] = max(counts["largest_batch"], len(batch))
+
+        outputs = None
+        if self.vectorized and len(batch) >= VECTOR_MIN:
+            try:
+                frame = score.score_many([item.profile for item in batch])
+                outputs = [frame[i] for i in range(len(batch))]
+                self._count("vectorized_batches")
+            except Exception:
+                outputs = None  # a malformed profile — score one by one so only it fails
+
+        for i, item in enumerate(batch):
+            try:
+                output = outputs[i] if outputs is not None else score.score_profile(item.profile)
+                if item.report:
+                    item.reply = {"report": render_report(output)}
+                else:
+                    item.reply = {"result": output_to_json(output)}
+            except Exception as e:
+                self._count("errors")
+                item.reply = {"error": f"{type(e).__name__}: {e}"}
+            item.done.set()
+
+
+def _listening(path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def serve(path: str = SOCKET_PATH, max_batch: int = MAX_BATCH):
+    """Run the scoring daemon on `path` until interrupted."""
+    if os.path.exists(path):
+        if _listening(path):
+            print(f"A scoring daemon is already listening on {path}", file=sys.stderr)
+            sys.exit(1)
+        os.unlink(path)  # stale socket from a daemon that didn't shut down cleanly
+
+    import signal
+    server = ScoringServer(path, max_batch=max_batch)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Scoring daemon listening on {path} (batch up to {max_batch}, "
+          f"{'vectorized' if server.vectorized else 'per-profile'} for batches ≥{VECTOR_MIN})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+        print(f"Scoring daemon stopped ({server.counts['requests']} requests, "
+              f"{server.counts['batches']} batches)", file=sys.stderr)
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class DaemonError(RuntimeError):
+    """The daemon answered a request with an error."""
+
+
+class Client:
+    """Connection to a running scoring daemon. Raises OSError if none is listening."""
+
+    def __init__(self, path: str = SOCKET_PATH, timeout: float = CLIENT_TIMEOUT):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.rfile = self.sock.makefile("rb")
+        self._next_id = 0
+
+    def request(self, payload: dict) -> dict:
+        self._next_id += 1
+        payload = {"id": self._next_id, **payload}
+        self.sock.sendall(json.dumps(payload).encode() + b"\n")
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("Scoring daemon closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise DaemonError(reply["error"])
+        return reply
+
+    def score(self, profile: dict) -> dict:
+        """score_profile output as JSON (see output_to_json)."""
+        return self.request({"profile": profile})["result"]
+
+    def report(self, profile: dict) -> str:
+        return self.request({"profile": profile, "format": "report"})["report"]
+
+    def stats(self) -> dict:
+        return self.request({"op": "stats"})["stats"]
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def score_json(profile: dict, path: str = SOCKET_PATH) -> dict:
+    """Score via the daemon if one is running, else in-process. Same JSON either way:
+    both go through profile_from_json, and a profile it rejects raises
+    DaemonError from the daemon or ValueError in-process."""
+    try:
+        with Client(path) as client:
+            return client.score(profile)
+    except OSError:
+        from score import score_profile
+        return output_to_json(score_profile(profile_from_json(profile)))
+
+
+def client_main(profile_path: str = None, path: str = SOCKET_PATH):
+    """Print the report for a profile JSON file (default: the empty profile) via the daemon,
+    falling back to in-process scoring when it isn't running."""
+    if profile_path:
+        with open(profile_path) as f:
+            profile = json.load(f)
+    else:
+        profile = {"demographics": {"age": 35, "sex": "M", "ethnicity": "white"}}
+    try:
+        with Client(path) as client:
+            text = client.report(profile)
+    except OSError:
+        from score import print_report, score_profile
+        print_report(score_profile(profile_from_json(profile)))
+        return
+    except DaemonError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    sys.stdout.write(text)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    socket_path = SOCKET_PATH
+    if "--socket" in args:
+        i = args.index("--socket")
+        socket_path = args[i + 1]
+        del args[i:i + 2]
+    client_main(args[0] if args else None, socket_path)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Baseline — Strength Log Store
+
+The strength log as an SQLite table (strength_log.db) with an (exercise,
+date) index for per-lift range queries and a unique (source, seq) identity
+per set, so de-duplicating an append is an index probe instead of a
+re-read of the whole history:
+
+    Garmin sets   source = garmin:<activity>|date|exercise|weight|reps,
+                  seq = which identical set within that activity
+    other rows    source = csv|<the whole row>, seq = which copy of that row
+
+A Garmin set is first matched on (date, exercise, weight_lbs, reps) against
+the rows already stored, whatever their source: it is new only beyond the
+matching rows there are — so a set logged by hand and then pulled from
+Garmin is stored once, and re-pulling an activity adds nothing. Identical
+sets are still all kept: two 5 x 225 sets in one Garmin session, or the
+same line logged twice by hand, as the CSV always kept them.
+
+strength_log.csv stays the human-readable export view: new sets are
+appended to it as they're stored (never rewritten), and rows added to the
+CSV by hand are imported on the next open — the store only rescans the CSV
+when its size or mtime has changed since it last wrote it. The CSV can
+always be regenerated with --export.
+
+strength_recent.csv is a second, bounded view for the dashboard: the last
+RECENT_DAYS of sets plus every set from each exercise's latest session
+(tracked per exercise in the `latest` table). Appends add their rows to it;
+it is rewritten only when the window moves (a new day), when hand-added CSV
+rows are imported, or when an exercise's latest session falls outside the
+window — at most about once a day.
+
+Usage:
+    python3 strength_store.py                         # sets per exercise
+    python3 strength_store.py --history squat --since 2026-01-01
+    python3 strength_store.py --export                # rewrite strength_log.csv from the store
+"""
+
+import csv
+import os
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+
+STRENGTH_CSV = Path(__file__).parent / "strength_log.csv"
+STRENGTH_DB = Path(__file__).parent / "strength_log.db"
+RECENT_CSV = Path(__file__).parent / "strength_recent.csv"
+RECENT_DAYS = 180
+
+FIELDS = ["date", "exercise", "weight_lbs", "reps", "rpe", "notes"]
+
+SCHEMA_VERSION = 2  # PRAGMA user_version; an older store is rebuilt from the CSV
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sets (
+    id         INTEGER PRIMARY KEY,  -- insertion order = CSV order
+    date       TEXT NOT NULL,
+    exercise   TEXT NOT NULL,
+    weight_lbs TEXT NOT NULL,
+    reps       TEXT NOT NULL,
+    rpe        TEXT NOT NULL DEFAULT '',
+    notes      TEXT NOT NULL DEFAULT '',
+    source     TEXT NOT NULL,
+    seq        INTEGER NOT NULL,
+    UNIQUE (source, seq)
+);
+CREATE INDEX IF NOT EXISTS sets_exercise_date ON sets (exercise, date);
+CREATE INDEX IF NOT EXISTS sets_date ON sets (date);
+CREATE TABLE IF NOT EXISTS latest (exercise TEXT PRIMARY KEY, date TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _stat(path: Path):
+    try:
+        st = path.stat()
+        return f"{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        return None
+
+
+def set_source(row: dict) -> str:
+    """A set's identity, less its seq: Garmin sets by activity, everything else by content."""
+    if row["notes"].startswith("garmin:"):
+        return "|".join([row["notes"], row["date"], row["exercise"], row["weight_lbs"], row["reps"]])
+    return "csv|" + "|".join(row[k] for k in FIELDS)
+
+
+class StrengthLog:
+    """Indexed strength log backed by SQLite, mirrored to an append-only CSV."""
+
+    def __init__(self, path=STRENGTH_DB, csv_path=STRENGTH_CSV, recent_path=RECENT_CSV, today: date = None):
+        self.csv_path = Path(csv_path)
+        self.recent_path = Path(recent_path) if recent_path else None
+        self.today = today or date.today()
+        self._db = sqlite3.connect(str(path))
+        self._db.row_factory = sqlite3.Row
+        if self._db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with self._db:
+                self._db.executescript("DROP TABLE IF EXISTS sets; DROP TABLE IF EXISTS latest;"
+                                       "DROP TABLE IF EXISTS meta;")
+                self._db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._db.executescript(SCHEMA)
+        imported = self.sync_csv()
+        self.refresh_recent(force=imported > 0)
+
+    def close(self):
+        self._db.close()
+
+    def _meta(self, key: str):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value):
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    # --- Storing ------------------------------------------------------------
+
+    def _insert(self, rows, seqs) -> list:
+        """INSERT OR IGNORE each row with its seq; the ones that were new, in order."""
+        added = []
+        with self._db:
+            for row, seq in zip(rows, seqs):
+                cur = self._db.execute(
+                    "INSERT OR IGNORE INTO sets (date, exercise, weight_lbs, reps, rpe, notes, source, seq) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [row[k] for k in FIELDS] + [set_source(row), seq])
+                if cur.rowcount:
+                    added.append(row)
+                    self._db.execute(
+                        "INSERT INTO latest VALUES (?, ?) ON CONFLICT (exercise) DO UPDATE "
+                        "SET date = excluded.date WHERE excluded.date > latest.date",
+                        (row["exercise"], row["date"]))
+        return added
+
+    @staticmethod
+    def _occurrences(rows) -> list:
+        """Each row's seq: how many rows before it in `rows` share its source."""
+        seen = {}
+        seqs = []
+        for row in rows:
+            source = set_source(row)
+            seqs.append(seen.get(source, 0))
+            seen[source] = seqs[-1] + 1
+        return seqs
+
+    def _count(self, where: str, *args) -> int:
+        return self._db.execute(f"SELECT COUNT(*) FROM sets WHERE {where}", args).fetchone()[0]
+
+    def sync_csv(self) -> int:
+        """Import CSV rows the store hasn't seen, if the CSV changed outside the store. Returns rows added."""
+        stat = _stat(self.csv_path)
+        if stat is None or stat == self._meta("csv_stat"):
+            return 0
+        with open(self.csv_path, newline="") as f:
+            rows = [{k: (r.get(k) or "") for k in FIELDS} for r in csv.DictReader(f)]
+        # The CSV is the whole log, so a row's seq is its copy number in the file
+        added = self._insert(rows, self._occurrences(rows))
+        self._set_meta("csv_stat", stat)
+        return len(added)
+
+    def append(self, rows) -> list:
+        """Store sets (dicts with FIELDS, string values) and append the new ones to both CSV views.
+
+        Garmin sets (notes "garmin:<activity>") are matched against stored sets
+        with the same date, exercise, weight and reps, so pass each activity's
+        sets together; any other row is always added. Returns the rows that were new.
+        """
+        rows = list(rows)
+        keep, seqs = [], []
+        stored = {}  # counts before this append: (date, exercise, weight, reps) and source -> rows
+        for row, seq in zip(rows, self._occurrences(rows)):
+            source = set_source(row)
+            if source not in stored:
+                stored[source] = self._count("source = ?", source)
+            if row["notes"].startswith("garmin:"):
+                key = tuple(row[k] for k in FIELDS[:4])
+                if key not in stored:
+                    stored[key] = self._count("date = ? AND exercise = ? AND weight_lbs = ? AND reps = ?", *key)
+                if seq < stored[key]:
+                    continue  # the same set as one already stored
+                seq += stored[source] - stored[key]
+            else:
+                seq += stored[source]
+            keep.append(row)
+            seqs.append(seq)
+        latest_before = dict(self._db.execute("SELECT exercise, date FROM latest").fetchall())
+        new_rows = self._insert(keep, seqs)
+        if not new_rows:
+            return []
+        if self.csv_path.exists():
+            with open(self.csv_path, "a", newline="") as f:
+                csv.DictWriter(f, fieldnames=FIELDS).writerows(new_rows)
+            self._set_meta("csv_stat", _stat(self.csv_path))
+        else:
+            self.export_csv()  # CSV deleted or never written: regenerate it whole
+        self._append_recent(new_rows, latest_before)
+        return new_rows
+
+    # --- CSV views ----------------------------------------------------------
+
+    def export_csv(self, path=None) -> int:
+        """Rewrite the full CSV from the store (atomically). Returns rows written."""
+        path = Path(path or self.csv_path)
+        rows = [dict(r) for r in self._db.execute(f"SELECT {', '.join(FIELDS)} FROM sets ORDER BY id")]
+        _write_csv(path, rows)
+        if path == self.csv_path:
+            self._set_meta("csv_stat", _stat(self.csv_path))
+        return len(rows)
+
+    def _since(self) -> str:
+        return (self.today - timedelta(days=RECENT_DAYS)).isoformat()
+
+    def refresh_recent(self, force: bool = False) -> bool:
+        """Rewrite strength_recent.csv if the window has moved since it was written (or `force`)."""
+        if not self.recent_path:
+            return False
+        if not force and self.recent_path.exists() and self._meta("recent_since") == self._since():
+            return False
+        self.export_recent()
+        return True
+
+    def export_recent(self) -> int:
+        """Write the dashboard view: the last RECENT_DAYS of sets plus each exercise's latest session."""
+        if not self.recent_path:
+            return 0
+        since = self._since()
+        # Both halves are index range scans (sets_date, then sets_exercise_date per stale exercise)
+        rows = [dict(r) for r in self._db.execute(f"""
+            SELECT id, {', '.join(FIELDS)} FROM sets WHERE date >= ?
+            UNION ALL
+            SELECT s.id, {', '.join('s.' + k for k in FIELDS)} FROM latest l
+            JOIN sets s ON s.exercise = l.exercise AND s.date = l.date
+            WHERE l.date < ?
+            ORDER BY id
+        """, (since, since))]
+        for r in rows:
+            del r["id"]
+        _write_csv(self.recent_path, rows)
+        self._set_meta("recent_since", since)
+        return len(rows)
+
+    def _append_recent(self, new_rows, latest_before: dict):
+        """Add newly stored rows to the recent view, or rewrite it if appending can't keep it exact."""
+        if self.refresh_recent():
+            return  # window moved: rewritten from the store, new rows included
+        since = self._since()
+        # An exercise whose previous latest session was outside the window has just been superseded
+        if any(latest_before.get(r["exercise"], "") < since and r["date"] > latest_before.get(r["exercise"], "")
+               for r in new_rows if r["exercise"] in latest_before):
+            self.export_recent()
+            return
+        latest = dict(self._db.execute("SELECT exercise, date FROM latest").fetchall())
+        keep = [r for r in new_rows if r["date"] >= since or r["date"] == latest.get(r["exercise"])]
+        if keep:
+            with open(self.recent_path, "a", newline="") as f:
+                csv.DictWriter(f, fieldnames=FIELDS).writerows(keep)
+
+    # --- Queries ------------------------------------------------------------
+
+    def history(self, exercise: str, start: str = None, end: str = None) -> list:
+        """Sets for one exercise between ISO dates (inclusive), oldest first."""
+        rows = self._db.execute(
+            f"SELECT {', '.join(FIELDS)} FROM sets WHERE exercise = ? AND date BETWEEN ? AND ? ORDER BY date, id",
+            (exercise, start or "", end or "9999-12-31"))
+        return [dict(r) for r in rows]
+
+    def exercises(self) -> list:
+        """[(exercise, sets, first date, last date), ...]"""
+        return [tuple(r) for r in self._db.execute(
+            "SELECT exercise, COUNT(*), MIN(date), MAX(date) FROM sets GROUP BY exercise ORDER BY exercise")]
+
+
+def _write_csv(path: Path, rows):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Query and export the strength log store")
+    parser.add_argument("--history", metavar="EXERCISE", help="List one exercise's sets")
+    parser.add_argument("--since", help="With --history: first ISO date")
+    parser.add_argument("--until", help="With --history: last ISO date")
+    parser.add_argument("--export", action="store_true", help="Rewrite strength_log.csv and strength_recent.csv")
+    args = parser.parse_args()
+
+    log = StrengthLog()
+    if args.export:
+        print(f"Wrote {log.export_csv()} sets to {log.csv_path.name}, "
+              f"{log.export_recent()} to {log.recent_path.name}")
+    elif args.history:
+        for r in log.history(args.history, args.since, args.until):
+            rpe = f" RPE {r['rpe']}" if r["rpe"] else ""
+            print(f"  {r['date']} {r['weight_lbs']}lbs x{r['reps']}{rpe}")
+    else:
+        for exercise, count, first, last in log.exercises():
+            print(f"  {exercise:<20} {count:>5} sets   {first} → {last}")
+    log.close()
+
+
+if __name__ == "__main__":
+    main()
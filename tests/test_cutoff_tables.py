@@ -0,0 +1,59 @@
+"""Ad-hoc cutoff tables passed to assess() / assess_many() are never confused by id()."""
+
+import pytest
+
+import score
+from score import Demographics, Standing
+
+DEMO = Demographics(age=40, sex="M")
+
+
+def _reused_id_pair():
+    """Two ad-hoc tables with different cutoffs that CPython placed at the same address."""
+    first = {"cutoffs": {"universal": [10, 20, 30, 40]}, "lower_is_better": False}
+    first_id = id(first)
+    before = score.assess(50, first, DEMO)
+    cutoffs = {"universal": [100, 200, 300, 400]}  # allocated first, so only the outer dict is freed/reused
+    del first
+    second = {"cutoffs": cutoffs, "lower_is_better": False}
+    if id(second) != first_id:
+        pytest.skip("allocator did not reuse the freed table's id")
+    return before, second
+
+
+@pytest.fixture(params=[False, True], ids=["uncached", "assess_cache"])
+def assess_cache(request):
+    if request.param:
+        score.enable_assess_cache()
+    yield
+    score.disable_assess_cache()
+
+
+def test_reused_id_gets_its_own_cutoffs(assess_cache):
+    before, second = _reused_id_pair()
+    assert before == (Standing.OPTIMAL, 90)
+    assert score.assess(50, second, DEMO) == (Standing.CONCERNING, 10)
+
+
+def test_reused_id_in_assess_many():
+    np = pytest.importorskip("numpy")
+    import cohort
+    _, second = _reused_id_pair()
+    standing, pct = cohort.assess_many(np.array([50.0]), second, np.array([1]), np.array([0]))
+    assert cohort.STANDINGS[standing[0]] == Standing.CONCERNING and pct[0] == 10
+
+
+def test_ad_hoc_tables_are_not_retained(assess_cache):
+    resolved = len(score.module_cutoffs())
+    for i in range(200):
+        table = {"cutoffs": {"universal": [i, i + 1, i + 2, i + 3]}, "lower_is_better": True}
+        score.assess(i + 1.5, table, DEMO)
+    assert len(score.module_cutoffs()) == resolved
+    if score._assess_cache is not None:
+        assert len(score._assess_cache._entries) == 0
+
+
+def test_module_tables_resolve_once():
+    assert score.resolve_cutoffs(score.LDL_C)[0] is score.resolve_cutoffs(score.LDL_C)[0]
+    assert score.module_table_name(score.LDL_C) == "LDL_C"
+    assert score.module_table_name(dict(score.LDL_C)) is None
@@ -0,0 +1,33 @@
+"""garmin_import.pull_workouts hands workouts over a page at a time, to be saved as they arrive."""
+
+import garmin_import
+import garmin_replay
+from garmin_fetch import Fetcher
+
+
+def _client():
+    return Fetcher(garmin_replay.ReplayGarmin(garmin_replay.synthetic_account(years=1)), rate=None)
+
+
+def test_pages_arrive_before_the_pull_finishes(capsys):
+    pages = garmin_import.pull_workouts(_client(), days=365, known=())
+    first = next(pages)
+    assert first and "Found" not in capsys.readouterr().out  # later pages not fetched yet
+    rest = list(pages)
+    assert len(rest) > 1
+    ids = [w["activity_id"] for page in [first] + rest for w in page]
+    assert len(ids) == len(set(ids))
+
+
+def test_saving_page_by_page_keeps_every_workout(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_import, "STRENGTH_LOG", tmp_path / "strength_log.csv")
+    monkeypatch.setattr(garmin_import, "WORKOUT_DIR", tmp_path / "workouts")
+    monkeypatch.setattr(garmin_import, "WORKOUTS_JSON", tmp_path / "garmin_workouts.json")
+    client = _client()
+    pulled = 0
+    for page in garmin_import.pull_workouts(client, days=365):  # as main() does
+        garmin_import.append_strength_log(page)
+        garmin_import.save_workouts(page)
+        pulled += len(page)
+    assert len(garmin_import.workout_store()) == pulled
+    assert list(garmin_import.pull_workouts(client, days=365)) == []  # every activity is now known
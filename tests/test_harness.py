@@ -0,0 +1,23 @@
+"""benchmarks.harness.measure times slow calls one per sample and batches only fast ones."""
+
+import time
+
+from benchmarks.harness import PER_CALL_MIN, measure
+
+
+def _spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_slow_calls_are_timed_per_call():
+    calls = iter([PER_CALL_MIN * 2] * 30 + [PER_CALL_MIN * 40] + [PER_CALL_MIN * 2] * 1000)
+    r = measure(lambda: _spin(next(calls)), min_time=0, min_samples=90)
+    assert r["inner"] == 1 and r["samples"] == 90
+    assert r["p99_us"] >= PER_CALL_MIN * 40 * 1e6  # the one slow call is the p99, not averaged away
+
+
+def test_fast_calls_are_batched():
+    r = measure(lambda: None, min_time=0, min_samples=5)
+    assert r["inner"] > 1
@@ -0,0 +1,96 @@
+"""Percentiles and integer rounding match the web app (app/nhanes.js, Math.round in app/score.js)."""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import score
+from nhanes import percentile_lookup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NHANES_JS = os.path.join(ROOT, "app", "nhanes.js")
+
+# Reads [[metric, value, bucket, sex], ...] and [x, ...] on stdin, prints
+# [getPercentile(...), ...] and [Math.round(x), ...]
+NODE_SCRIPT = """
+import { readFileSync } from "node:fs";
+import { pathToFileURL } from "node:url";
+const { setNhanesData, getPercentile } = await import(pathToFileURL(process.argv[1]).href);
+setNhanesData(JSON.parse(readFileSync(process.argv[2], "utf8")));
+const { lookups, halves } = JSON.parse(readFileSync(0, "utf8"));
+console.log(JSON.stringify({
+  percentiles: lookups.map(([metric, value, bucket, sex]) => getPercentile(metric, value, bucket, sex)),
+  rounded: halves.map(Math.round),
+}));
+"""
+
+
+def _lookups():
+    """Every curve value (ties included), segment midpoints and both clamped ends, per group."""
+    with open(percentile_lookup.DATA_PATH) as f:
+        data = json.load(f)
+    lookups = []
+    for metric, spec in data["metrics"].items():
+        for group_key, group in spec["groups"].items():
+            bucket, sex = group_key.split("|") if "|" in group_key else ("30-39", "M")
+            curve = sorted(group["percentiles"].values())
+            values = set(curve)
+            values.update((a + b) / 2 for a, b in zip(curve, curve[1:]))
+            values.update((curve[0] - 1, curve[-1] + 1))
+            lookups += [[metric, v, bucket, sex] for v in sorted(values)]
+    return lookups
+
+
+@pytest.fixture(scope="module")
+def app():
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node is not installed")
+    lookups = _lookups()
+    halves = [k + 0.5 for k in range(100)]
+    out = subprocess.run(
+        [node, "--input-type=module", "-e", NODE_SCRIPT, NHANES_JS, percentile_lookup.DATA_PATH],
+        input=json.dumps({"lookups": lookups, "halves": halves}), capture_output=True, text=True, check=False,
+    )
+    if out.returncode != 0:
+        pytest.fail(out.stderr)
+    return lookups, halves, json.loads(out.stdout)
+
+
+def test_get_percentile_matches_app(app):
+    lookups, _, js = app
+    mismatches = [
+        (lookup, expected, percentile_lookup.get_percentile(*lookup))
+        for lookup, expected in zip(lookups, js["percentiles"])
+        if percentile_lookup.get_percentile(*lookup) != expected
+    ]
+    assert not mismatches, mismatches[:10]
+
+
+def test_get_percentiles_matches_app(app):
+    np = pytest.importorskip("numpy")
+    lookups, _, js = app
+    for metric in {m for m, *_ in lookups}:
+        rows = [(lookup, expected) for lookup, expected in zip(lookups, js["percentiles"]) if lookup[0] == metric]
+        values = np.array([lookup[1] for lookup, _ in rows])
+        buckets = [lookup[2] for lookup, _ in rows]
+        sexes = [lookup[3] for lookup, _ in rows]
+        got = percentile_lookup.get_percentiles(metric, values, buckets, sexes)
+        np.testing.assert_array_equal(got, [expected for _, expected in rows], err_msg=metric)
+
+
+def test_tied_value_scores_bottom_of_run(app):
+    # HbA1c 5.4 is the 70th, 75th and 80th percentile point for 20-29 women: the
+    # app takes the 70th (30 once inverted), not the 80th (20)
+    assert percentile_lookup.get_percentile("hba1c", 5.4, "20-29", "F") == 30.0
+
+
+def test_integer_rounding_is_half_up(app):
+    np = pytest.importorskip("numpy")
+    import cohort
+    _, halves, js = app
+    assert [score.round_half_up(x) for x in halves] == js["rounded"]
+    assert cohort._round_half_up(np.array(halves)).tolist() == js["rounded"]
@@ -0,0 +1,26 @@
+"""ProfileTable refuses a missing or non-numeric age instead of storing a garbage int16."""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+from cohort import ProfileTable  # noqa: E402  (needs numpy)
+
+
+@pytest.mark.parametrize("demographics", [{"sex": "M"}, {"age": None, "sex": "M"}, {"age": float("nan"), "sex": "M"},
+                                          {"age": 1e6, "sex": "M"}, {"age": "forty", "sex": "M"}])
+def test_bad_age_in_records(demographics):
+    records = [{"demographics": {"age": 40, "sex": "F"}}, {"demographics": demographics}]
+    with pytest.raises(ValueError, match="age"):
+        ProfileTable.from_records(records)
+
+
+def test_blank_age_in_csv(tmp_path):
+    path = tmp_path / "cohort.csv"
+    path.write_text("age,sex,ldl_c\n40,F,110\n,M,95\n")
+    with pytest.raises(ValueError, match="rows 1"):
+        ProfileTable.from_csv(path)
+
+
+def test_good_ages_load():
+    table = ProfileTable.from_records([{"demographics": {"age": 40, "sex": "F"}}, {"demographics": {"age": "52", "sex": "M"}}])
+    assert table.age.tolist() == [40, 52]
@@ -0,0 +1,44 @@
+"""score_daemon replies the same for a profile scored alone or in a vectorized batch."""
+
+import pytest
+
+import score_daemon
+from score_daemon import VECTOR_MIN, ScoringServer, _Pending, profile_from_json
+
+PROFILE = {
+    "demographics": {"age": 42, "sex": "M"},
+    "systolic": 122, "diastolic": 78, "ldl_c": 118, "hdl_c": 52.5, "hba1c": 5.5,
+    "resting_hr": 62, "daily_steps_avg": 7500, "has_family_history": False,
+}
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ScoringServer(str(tmp_path / "score.sock"))
+    yield server
+    server.server_close()
+
+
+def _replies(server, profiles):
+    batch = [_Pending(profile_from_json(p), False) for p in profiles]
+    server._score_batch(batch)
+    return [item.reply for item in batch]
+
+
+def test_alone_and_batched_replies_match(server):
+    if not server.vectorized:
+        pytest.skip("numpy is not installed")
+    alone = _replies(server, [PROFILE])[0]
+    batched = _replies(server, [PROFILE] * VECTOR_MIN)
+    assert server.counts["vectorized_batches"] == 1
+    assert batched[0] == alone
+    assert alone["result"]["results"][0]["value"] == 122.0
+    assert isinstance(alone["result"]["results"][0]["value"], float)
+
+
+@pytest.mark.parametrize("field, value", [("ldl_c", "130"), ("ldl_c", True), ("has_family_history", 1)])
+def test_bad_value_is_rejected_on_every_path(server, field, value):
+    reply = server.handle_request_line(score_daemon.json.dumps({"id": 7, "profile": {**PROFILE, field: value}}))
+    assert reply["id"] == 7 and reply["error"].startswith(f"Invalid profile: ValueError: {field} must be")
+    with pytest.raises(ValueError, match=field):
+        score_daemon.score_json({**PROFILE, field: value}, path="/nonexistent/score.sock")
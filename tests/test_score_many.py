@@ -0,0 +1,53 @@
+"""score_many gives exactly what looping score_profile gives, for every input layout."""
+
+import random
+
+import pytest
+
+import score
+from score import Demographics, UserProfile
+
+np = pytest.importorskip("numpy")
+import cohort  # noqa: E402  (needs numpy)
+
+# Values sitting exactly on cutoffs hit every band edge; the rest are spread wide
+CUTOFF_VALUES = sorted({c for table in score.cutoff_tables().values()
+                        for cutoffs in table["cutoffs"].values() for c in cutoffs})
+
+
+def _random_profile(rng: random.Random) -> UserProfile:
+    data = {}
+    for f in score.PROFILE_FIELDS:
+        r = rng.random()
+        if r < 0.3:
+            continue
+        if f in score.BOOL_FIELDS:
+            data[f] = rng.random() < 0.5
+        elif r < 0.5:
+            data[f] = rng.choice(CUTOFF_VALUES)
+        elif r < 0.6:
+            data[f] = rng.choice([0, 0.3, 0.4, 1.0, 2.5])
+        else:
+            data[f] = round(rng.uniform(0.1, 250), rng.choice([0, 1, 2]))
+    demo = Demographics(age=rng.randint(18, 95), sex=rng.choice("MMFFX"), ethnicity=rng.choice(["white", "black"]))
+    return UserProfile(demographics=demo, **data)
+
+
+def _as_json(output: dict) -> dict:
+    out = dict(output)
+    out["results"] = [r.to_dict() for r in output["results"]]
+    out["gaps"] = [r.to_dict() for r in output["gaps"]]
+    return out
+
+
+@pytest.fixture(scope="module")
+def profiles():
+    rng = random.Random(1)
+    return [_random_profile(rng) for _ in range(1500)]
+
+
+@pytest.mark.parametrize("layout", ["profiles", "table"])
+def test_matches_score_profile(profiles, layout):
+    frame = score.score_many(profiles if layout == "profiles" else cohort.ProfileTable.from_profiles(profiles))
+    mismatches = [i for i, p in enumerate(profiles) if _as_json(frame[i]) != _as_json(score.score_profile(p))]
+    assert not mismatches, f"{len(mismatches)} of {len(profiles)} differ, first {mismatches[:5]}"
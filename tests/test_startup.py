@@ -0,0 +1,19 @@
+"""`import score` stays cheap: an -X importtime budget and no eager heavy imports."""
+
+import os
+
+from benchmarks.startup import DEFERRED_MODULES, IMPORT_BUDGET_MS, import_profile
+
+# Budgets are machine-specific; CI runners can override
+BUDGET_MS = float(os.environ.get("BASELINE_IMPORT_BUDGET_MS", IMPORT_BUDGET_MS))
+
+
+def test_score_defers_heavy_modules():
+    imports, _ = import_profile("score")
+    assert [name for name in DEFERRED_MODULES if name in imports] == []
+
+
+def test_import_score_within_budget():
+    # Best of three: the budget is about what the import costs, not scheduler noise
+    best_ms = min(import_profile("score")[0]["score"] for _ in range(3)) / 1000
+    assert best_ms <= BUDGET_MS, f"import score took {best_ms:.1f}ms (budget {BUDGET_MS:g}ms)"
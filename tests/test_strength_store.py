@@ -0,0 +1,42 @@
+"""strength_store de-duplication: Garmin sets match stored sets, repeated sets keep their count."""
+
+import csv
+
+from strength_store import FIELDS, StrengthLog
+
+
+def _set(notes="", reps="5", date="2026-10-10"):
+    return {"date": date, "exercise": "squat", "weight_lbs": "225", "reps": reps, "rpe": "", "notes": notes}
+
+
+def _open(tmp_path, csv_text=None):
+    if csv_text is not None:
+        (tmp_path / "log.csv").write_text(",".join(FIELDS) + "\n" + csv_text)
+    return StrengthLog(tmp_path / "log.db", tmp_path / "log.csv", tmp_path / "recent.csv")
+
+
+def _csv_rows(tmp_path):
+    with open(tmp_path / "log.csv", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_garmin_set_matches_hand_logged_row(tmp_path):
+    log = _open(tmp_path, "2026-10-10,squat,225,5,,\n")
+    assert log.append([_set("garmin:111")]) == []
+    assert len(_csv_rows(tmp_path)) == 1
+
+
+def test_garmin_adds_only_sets_beyond_the_stored_ones(tmp_path):
+    log = _open(tmp_path, "2026-10-10,squat,225,5,,\n")
+    added = log.append([_set("garmin:111"), _set("garmin:111"), _set("garmin:111", reps="3")])
+    assert [r["reps"] for r in added] == ["5", "3"]
+    assert log.append([_set("garmin:111"), _set("garmin:111"), _set("garmin:111", reps="3")]) == []
+    assert len(log.history("squat")) == 3
+
+
+def test_repeated_hand_rows_are_kept(tmp_path):
+    log = _open(tmp_path, "2026-10-10,squat,225,5,,\n2026-10-10,squat,225,5,,\n")
+    assert len(log.history("squat")) == 2
+    assert len(log.append([_set()])) == 1
+    log.close()
+    assert len(_open(tmp_path).history("squat")) == 3  # reopening rescans nothing new
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Baseline — Workout Store
+
+Garmin workouts (garmin_import.pull_workouts output) kept as an append-only
+store partitioned by month, instead of one garmin_workouts.json that is
+loaded, merged, re-sorted and rewritten on every pull:
+
+    workouts/2026-10.jsonl        current month: one workout per line
+    workouts/2026-09.jsonl.gz     closed months, gzip-compressed
+    workouts/index.tsv            activity ID → month, append-only
+
+Saving appends each new workout to its month's file and the index, so a
+pull costs O(new workouts). Months before the current one are compressed
+once they close; a late-synced workout for a closed month is appended as a
+further gzip member (gzip readers treat the members as one stream).
+
+Readers stream a date range partition by partition, holding one month in
+memory at a time. export_json writes the old single-file format (a JSON
+list, newest first, indent=2) for dashboards that still read it. On first
+use, an existing garmin_workouts.json is imported.
+
+Usage:
+    python3 workout_store.py                                # workouts per month
+    python3 workout_store.py --range 2026-01-01 2026-03-31  # list a date range
+    python3 workout_store.py --export                       # write garmin_workouts.json
+"""
+
+import gzip
+import json
+import os
+import textwrap
+from datetime import date
+from pathlib import Path
+
+WORKOUT_DIR = Path(__file__).parent / "workouts"
+LEGACY_JSON = Path(__file__).parent / "garmin_workouts.json"
+
+
+class WorkoutStore:
+    """Month-partitioned JSON Lines workout store with an activity-ID index."""
+
+    def __init__(self, root=WORKOUT_DIR, legacy=LEGACY_JSON):
+        self.root = Path(root)
+        self.index_path = self.root / "index.tsv"
+        self.index = {}  # activity ID -> "YYYY-MM"
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                for line in f:
+                    activity_id, _, month = line.rstrip("\n").partition("\t")
+                    self.index[json.loads(activity_id)] = month
+        elif legacy and Path(legacy).exists():
+            self._import_legacy(Path(legacy))
+
+    def _import_legacy(self, path: Path):
+        try:
+            with open(path) as f:
+                workouts = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        self.add(workouts)
+
+    def ids(self) -> set:
+        return set(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    # --- Partitions -----------------------------------------------------------
+
+    def _open_path(self, month: str) -> Path:
+        return self.root / f"{month}.jsonl"
+
+    def _closed_path(self, month: str) -> Path:
+        return self.root / f"{month}.jsonl.gz"
+
+    def months(self) -> list:
+        """Months with a partition, oldest first."""
+        if not self.root.exists():
+            return []
+        return sorted({p.name[:7] for p in self.root.glob("????-??.jsonl*")})
+
+    def _read_month(self, month: str) -> list:
+        path = self._closed_path(month)
+        opener = gzip.open if path.exists() else open
+        if not path.exists():
+            path = self._open_path(month)
+            if not path.exists():
+                return []
+        with opener(path, "rt") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    # --- Writing ----------------------------------------------------------------
+
+    def add(self, workouts) -> list:
+        """Append workouts whose activity ID isn't stored yet. Returns the ones added."""
+        by_month = {}
+        for w in workouts:
+            activity_id = w.get("activity_id")
+            if activity_id in self.index or not w.get("date"):
+                continue
+            by_month.setdefault(w["date"][:7], []).append(w)
+            self.index[activity_id] = w["date"][:7]
+        if not by_month:
+            return []
+
+        self.root.mkdir(exist_ok=True)
+        added = []
+        for month, rows in by_month.items():
+            closed = self._closed_path(month)
+            lines = "".join(json.dumps(w, separators=(",", ":")) + "\n" for w in rows)
+            if closed.exists():
+                with gzip.open(closed, "at") as f:  # one more gzip member
+                    f.write(lines)
+            else:
+                with open(self._open_path(month), "a") as f:
+                    f.write(lines)
+            added.extend(rows)
+        with open(self.index_path, "a") as f:
+            f.writelines(f"{json.dumps(w['activity_id'])}\t{w['date'][:7]}\n" for w in added)
+        return added
+
+    def compact(self, today: date = None) -> list:
+        """Gzip every month before the current one that is still plain JSON Lines. Returns the months closed."""
+        current = (today or date.today()).isoformat()[:7]
+        closed = []
+        for month in self.months():
+            plain = self._open_path(month)
+            if month >= current or not plain.exists():
+                continue
+            tmp = self.root / f"{month}.jsonl.gz.tmp"
+            with open(plain, "rb") as src, gzip.open(tmp, "wb") as dst:
+                dst.write(src.read())
+            os.replace(tmp, self._closed_path(month))
+            plain.unlink()
+            closed.append(month)
+        return closed
+
+    # --- Reading ----------------------------------------------------------------
+
+    def read(self, start: str = None, end: str = None):
+        """Yield workouts dated between ISO dates `start` and `end` (inclusive), newest first."""
+        lo, hi = start or "", end or "9999-12-31"
+        for month in reversed(self.months()):
+            if month < lo[:7] or month > hi[:7]:
+                continue
+            rows = [w for w in self._read_month(month) if lo <= w["date"] <= hi]
+            rows.sort(key=lambda w: w["date"], reverse=True)  # stable: same-day workouts in save order
+            yield from rows
+
+    def get(self, activity_id):
+        """One workout by activity ID, reading only its month."""
+        month = self.index.get(activity_id)
+        if month is None:
+            return None
+        return next((w for w in self._read_month(month) if w.get("activity_id") == activity_id), None)
+
+    def export_json(self, path=LEGACY_JSON) -> int:
+        """Write every workout to the old single-file format, streaming. Returns the count."""
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        count = 0
+        with open(tmp, "w") as f:
+            for w in self.read():
+                f.write("[\n" if count == 0 else ",\n")
+                f.write(textwrap.indent(json.dumps(w, indent=2), "  "))
+                count += 1
+            f.write("\n]" if count else "[]")
+        os.replace(tmp, path)
+        return count
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Inspect and export the month-partitioned workout store")
+    parser.add_argument("--range", nargs=2, metavar=("START", "END"), help="List workouts between ISO dates")
+    parser.add_argument("--export", nargs="?", const=str(LEGACY_JSON), metavar="PATH",
+                        help="Write the old single-file JSON (default: garmin_workouts.json)")
+    args = parser.parse_args()
+
+    store = WorkoutStore()
+    if args.export:
+        print(f"Exported {store.export_json(args.export)} workouts to {args.export}")
+    elif args.range:
+        for w in store.read(*args.range):
+            print(f"  {w['date']} {w['name']} ({w['type']}, {len(w.get('strength_sets', []))} sets)")
+    else:
+        counts = {}
+        for month in store.index.values():
+            counts[month] = counts.get(month, 0) + 1
+        for month in store.months():
+            kind = "gz" if store._closed_path(month).exists() else "open"
+            print(f"  {month}  {counts.get(month, 0):>4} workouts  ({kind})")
+        print(f"{len(store)} workouts in {store.root}")
+
+
+if __name__ == "__main__":
+    main()